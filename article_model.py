@@ -0,0 +1,49 @@
+from typing import Any, Dict, Iterator, List
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from article_store import ArticleStore
+
+
+class ArticleListModel(QAbstractListModel):
+    """List model over a view (list of IDs) into an ArticleStore.
+
+    Qt only asks for the rows that are visible, so switching filters is a
+    model reset over an ID list rather than creating one widget item per article.
+    """
+
+    def __init__(self, store: ArticleStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._ids: List[int] = []
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._ids):
+            return None
+        article = self.store.get(self._ids[index.row()])
+        if role == Qt.DisplayRole:
+            return article['title']
+        if role == Qt.ToolTipRole:
+            return article.get('url')
+        if role == Qt.UserRole:
+            return article['id']
+        return None
+
+    def set_ids(self, ids: List[int]):
+        self.beginResetModel()
+        self._ids = list(ids)  # the store's posting lists must not be mutated by append_id
+        self.endResetModel()
+
+    def append_id(self, article_id: int):
+        row = len(self._ids)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._ids.append(article_id)
+        self.endInsertRows()
+
+    def article_at(self, row: int) -> Dict[str, Any] | None:
+        return self.store.get(self._ids[row]) if 0 <= row < len(self._ids) else None
+
+    def articles(self) -> Iterator[Dict[str, Any]]:
+        return (self.store.get(article_id) for article_id in self._ids)
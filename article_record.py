@@ -0,0 +1,83 @@
+from typing import Any, Dict, Iterator, List
+
+
+class ArticleRecord:
+    """Compact, dict-compatible article.
+
+    Fixed fields live in __slots__ instead of a per-article dict, and the
+    full text can be dropped with release_content() once the summary,
+    keywords and category exist, which is all the GUI and the exporters
+    read. A field set to None counts as absent, so article.get('summary',
+    'N/A') behaves as it does for a plain dict. Keys outside the fixed set
+    go to a small overflow dict.
+    """
+
+    __slots__ = ('url', 'title', 'content', 'date', 'author', 'summary', 'keywords', 'category',
+                 'duplicate_urls', 'id', 'extra')
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, url: str, title: str | None = None, content: str | None = None, **fields):
+        self.url, self.title, self.content = url, title, content
+        for name in self.FIELDS[3:]:
+            setattr(self, name, None)
+        self.extra: Dict[str, Any] | None = None
+        self.update(fields)
+
+    @classmethod
+    def from_dict(cls, article: Dict[str, Any]) -> 'ArticleRecord':
+        return cls(**article)
+
+    def release_content(self):
+        self.content = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def keys(self) -> List[str]:
+        keys = [name for name in self.FIELDS if getattr(self, name) is not None]
+        return keys + list(self.extra) if self.extra else keys
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, other: Dict[str, Any] | None = None, **fields):
+        for source in (other or {}, fields):
+            for key, value in source.items():
+                self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __repr__(self) -> str:
+        return f"ArticleRecord({self.url!r}, title={self.title!r})"
@@ -0,0 +1,81 @@
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+class ArticleStore:
+    """In-memory article collection with stable IDs and lookup indexes.
+
+    IDs are assigned in insertion order and never reused, so every posting
+    list is already sorted and category/keyword filters return without
+    scanning or sorting. Full-text search intersects token posting sets.
+    """
+
+    def __init__(self):
+        self._articles: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 0
+        self._by_category: Dict[str, List[int]] = defaultdict(list)
+        self._by_keyword: Dict[str, List[int]] = defaultdict(list)
+        self._by_token: Dict[str, set] = defaultdict(set)
+
+    def add(self, article: Dict[str, Any]) -> int:
+        article_id = self._next_id
+        self._next_id += 1
+        article['id'] = article_id
+        self._articles[article_id] = article
+        self._by_category[article.get('category', '기타')].append(article_id)
+        for keyword in dict.fromkeys(article.get('keywords', [])):
+            self._by_keyword[keyword].append(article_id)
+        text = ' '.join([article.get('title', ''), article.get('summary', ''), *article.get('keywords', [])])
+        for token in set(tokenize(text)):
+            self._by_token[token].add(article_id)
+        return article_id
+
+    def extend(self, articles: Iterable[Dict[str, Any]]) -> List[int]:
+        return [self.add(article) for article in articles]
+
+    def get(self, article_id: int) -> Dict[str, Any] | None:
+        return self._articles.get(article_id)
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._articles.values())
+
+    def ids(self) -> List[int]:
+        return list(self._articles)
+
+    def categories(self) -> List[str]:
+        return sorted(category for category, ids in self._by_category.items() if ids)
+
+    def by_category(self, category: str) -> List[int]:
+        return self._by_category.get(category, [])
+
+    def by_keyword(self, keyword: str) -> List[int]:
+        return self._by_keyword.get(keyword, [])
+
+    def search(self, query: str) -> List[int]:
+        # Articles containing every query token (title, summary and keywords are indexed).
+        postings = [self._by_token.get(token, set()) for token in set(tokenize(query))]
+        if not postings:
+            return self.ids()
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return sorted(result)
+
+    def clear(self):
+        self._articles.clear()
+        self._by_category.clear()
+        self._by_keyword.clear()
+        self._by_token.clear()
@@ -0,0 +1,120 @@
+"""Record/replay archive: crawled pages and LLM replies from one run, in one SQLite file.
+
+RecordingCrawler and RecordingLLMHandler write every response they get
+into an Archive; benchmarks.stub_server.make_replay_app and
+benchmarks.fake_openai.make_openai_app serve them back, so the same crawl
+can be re-run offline as often as needed (see benchmarks/bench.py).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, List, Tuple
+
+import aiohttp
+from yarl import URL
+
+from llm_handler import LLMHandler
+from news_crawler import NewsCrawler
+
+DEFAULT_ARCHIVE_PATH = os.path.join('.cache', 'replay.db')
+
+
+def request_key(messages: List[Dict[str, str]], response_format: Dict | None = None) -> str:
+    # The model is left out so an archive can be replayed against a handler configured with another one.
+    payload = json.dumps({'messages': messages, 'response_format': response_format},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class Archive:
+    def __init__(self, path: str = DEFAULT_ARCHIVE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, status INTEGER NOT NULL, content_type TEXT, encoding TEXT,"
+            " body BLOB NOT NULL, recorded_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS replies ("
+            " key TEXT PRIMARY KEY, response TEXT NOT NULL, recorded_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        self.conn.commit()
+
+    def put_page(self, url: str, status: int, content_type: str | None, body: bytes, encoding: str | None):
+        self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                          (url, status, content_type, encoding, zlib.compress(body), time.time()))
+        self.conn.commit()
+
+    def pages(self) -> Dict[str, Tuple[int, str | None, str | None, bytes]]:
+        # url -> (status, content_type, encoding, body)
+        return {url: (status, content_type, encoding, zlib.decompress(body))
+                for url, status, content_type, encoding, body in
+                self.conn.execute("SELECT url, status, content_type, encoding, body FROM pages")}
+
+    def put_reply(self, key: str, response: Dict[str, Any]):
+        self.conn.execute("INSERT OR REPLACE INTO replies VALUES (?, ?, ?)",
+                          (key, json.dumps(response, ensure_ascii=False), time.time()))
+        self.conn.commit()
+
+    def replies(self) -> Dict[str, Dict[str, Any]]:
+        return {key: json.loads(response) for key, response in self.conn.execute("SELECT key, response FROM replies")}
+
+    def set_sites(self, sites: Dict[str, Dict]):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('sites', ?)", (json.dumps(sites, ensure_ascii=False),))
+        self.conn.commit()
+
+    def sites(self) -> Dict[str, Dict]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'sites'").fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def stats(self) -> Dict[str, int]:
+        pages, page_bytes = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM pages").fetchone()
+        replies = self.conn.execute("SELECT COUNT(*) FROM replies").fetchone()[0]
+        return {'pages': pages, 'compressed_bytes': page_bytes, 'replies': replies}
+
+    def close(self):
+        self.conn.close()
+
+
+def replay_key(url: str) -> Tuple[str, str]:
+    # (host[:port], path + query) as they appear on the wire, which is what the replay server sees.
+    parsed = URL(url)
+    return parsed.raw_authority, parsed.raw_path_qs
+
+
+class RecordingCrawler(NewsCrawler):
+    """A NewsCrawler that archives every response it reads, including errors and skipped content types.
+
+    Give it no url_store or http_cache, so every page is fetched in full.
+    """
+
+    def __init__(self, archive: Archive, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.archive = archive
+
+    async def _read_body(self, url: str, response: aiohttp.ClientResponse, content_types):
+        try:
+            result = await super()._read_body(url, response, content_types)
+        except aiohttp.ClientResponseError:
+            self.archive.put_page(url, response.status, response.content_type, b'', None)
+            raise
+        body, encoding = result or (b'', None)
+        self.archive.put_page(url, response.status, response.content_type, body, encoding)
+        return result
+
+
+class RecordingLLMHandler(LLMHandler):
+    # Archives each successful chat completion under its request_key; run it without an LLMCache.
+    def __init__(self, archive: Archive, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.archive = archive
+
+    async def _chat_with_retries(self, model, messages, task: str, **kwargs):
+        response = await super()._chat_with_retries(model, messages, task, **kwargs)
+        self.archive.put_reply(request_key(messages, kwargs.get('response_format')), response.model_dump())
+        return response
@@ -0,0 +1,267 @@
+"""End-to-end benchmark: crawl + analysis replayed offline from a recorded archive.
+
+    python -m benchmarks.bench record                          # live SITE_CONFIG sites and OpenAI -> .cache/replay.db
+    python -m benchmarks.bench record --stub 300               # the stub site and fake LLM instead, no network needed
+    python -m benchmarks.bench run                             # replay it: throughput, latency percentiles, memory
+    python -m benchmarks.bench run --latency 0.1 --error-rate 0.02 --throttle-rate 0.05 --llm-throttle-rate 0.05
+    python -m benchmarks.bench run --json after.json --baseline before.json
+
+`run` drives the same Pipeline the GUI and NewsCrawler.crawl use, with
+analysis, against servers that replay the archive: every recorded origin
+gets its own loopback address (127.0.0.2, 127.0.0.3, ... - Linux routes
+all of 127/8 to lo), so per-host limits behave as they did live, and links
+inside archived pages are rewritten to point there. LLM requests are
+answered with the recorded completions. Crawl and LLM rate limits are off
+by default so the numbers track the code, not the politeness settings;
+pass --per-host-rate 5 --rpm 500 for production ones. The replay servers
+run in the benchmark process, so peak RSS is for comparing runs only.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import resource
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from llm_handler import LLMHandler
+from metrics import METRICS
+from news_crawler import NewsCrawler, SITE_CONFIG
+from parsing import ParserPool
+from pipeline import Pipeline
+from scheduler import CrawlScheduler
+from benchmarks.archive import DEFAULT_ARCHIVE_PATH, Archive, RecordingCrawler, RecordingLLMHandler, replay_key
+from benchmarks.fake_openai import make_openai_app
+from benchmarks.stub_server import make_news_app, make_replay_app, start_app
+
+STAGES = ('fetch', 'parse', 'analyze')
+# Compared against --baseline; for all of them but articles_per_second, lower is better.
+HEADLINE = ('articles_per_second', 'seconds', 'first_article_seconds', 'peak_rss_mb')
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+async def record(args):
+    archive = Archive(args.archive)
+    runners = []
+    try:
+        if args.stub:
+            os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+            site_runner, site_url = await start_app(make_news_app(args.stub, latency=0.0, jitter=0.0))
+            llm_runner, llm_url = await start_app(make_openai_app(0.0))
+            runners += [site_runner, llm_runner]
+            sites = {site_url: {'article_link_selector': 'a.sa_item_title'}}
+            # Local servers: no point in being polite.
+            crawler = RecordingCrawler(archive, CrawlScheduler(per_host_rate=0))
+            handler_kwargs = {'base_url': llm_url + 'v1', 'requests_per_minute': 1e9, 'tokens_per_minute': 1e12}
+        else:
+            sites = SITE_CONFIG
+            crawler = RecordingCrawler(archive)
+            handler_kwargs = {'base_url': args.llm_url}
+        archive.set_sites(sites)
+        handler = None if args.no_llm else RecordingLLMHandler(archive, **handler_kwargs)
+        count = 0
+        try:
+            async for _ in Pipeline(crawler, sites, llm_handler=handler).run():
+                count += 1
+        finally:
+            crawler.parser.close()
+        stats = archive.stats()
+        print(f"Recorded {stats['pages']} pages ({stats['compressed_bytes'] / 1e6:.1f} MB compressed) and "
+              f"{stats['replies']} LLM replies for {count} articles into {args.archive}")
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+        archive.close()
+
+
+async def start_replay(archive: Archive, args):
+    # One replay server per recorded host, then every archived link and site URL is pointed at them.
+    by_host: Dict[str, Dict] = {}
+    for url, page in archive.pages().items():
+        host, path = replay_key(url)
+        by_host.setdefault(host, {})[path] = page
+    if not by_host:
+        # Replaying with nothing to serve would quietly crawl the live sites instead.
+        raise SystemExit(f"{args.archive} has no recorded pages")
+    runners, bases = [], {}
+    for i, (host, pages) in enumerate(sorted(by_host.items())):
+        app = make_replay_app(pages, args.latency, args.jitter, args.error_rate, args.throttle_rate)
+        runner, base_url = await start_app(app, host=f'127.0.0.{i + 2}')
+        runners.append(runner)
+        bases[host] = base_url.rstrip('/')
+    pattern = '(?:https?:)?//(' + '|'.join(re.escape(host) for host in bases) + r')(?![\w.-])'
+    text_pattern, bytes_pattern = re.compile(pattern), re.compile(pattern.encode())
+    for pages in by_host.values():
+        for path, (status, content_type, encoding, body) in pages.items():
+            body = bytes_pattern.sub(lambda m: bases[m.group(1).decode()].encode(), body)
+            pages[path] = (status, content_type, encoding, body)
+
+    def rewrite(url: str) -> str:
+        return text_pattern.sub(lambda m: bases[m.group(1)], url)
+
+    sites = {}
+    for site_url, config in archive.sites().items():
+        config = dict(config)
+        if config.get('feeds'):
+            config['feeds'] = [rewrite(feed) for feed in config['feeds']]
+        sites[rewrite(site_url)] = config
+    return runners, sites
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'p50': float(p50), 'p90': float(p90), 'p99': float(p99), 'max': float(max(values))}
+
+
+def latencies() -> Dict[str, Dict[str, float]]:
+    # From the per-article traces, so percentiles are exact rather than histogram-bucket estimates.
+    durations = {stage: [] for stage in STAGES}
+    end_to_end = []
+    for spans in METRICS.traces.values():
+        for name, _, duration in spans:
+            if name in durations:
+                durations[name].append(duration)
+        if any(name == 'analyze' for name, _, _ in spans):
+            # First fetch started -> analysis finished.
+            end_to_end.append(max(offset + duration for _, offset, duration in spans))
+    results = {stage: percentiles(values) for stage, values in durations.items()}
+    results['end_to_end'] = percentiles(end_to_end)
+    return results
+
+
+async def run(args) -> Dict:
+    random.seed(args.seed)
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+    archive = Archive(args.archive)
+    try:
+        if not archive.sites():
+            raise SystemExit(f"{args.archive} has nothing recorded; run 'python -m benchmarks.bench record' first")
+        runners, sites = await start_replay(archive, args)
+        archive_stats = archive.stats()
+        llm_app = make_openai_app(args.llm_latency, replies=archive.replies(), error_rate=args.llm_error_rate,
+                                  throttle_rate=args.llm_throttle_rate)
+    finally:
+        archive.close()
+    llm_runner, llm_url = await start_app(llm_app)
+    runners.append(llm_runner)
+
+    METRICS.reset()
+    METRICS.enable()
+    METRICS.max_traces = 10 ** 7
+    crawler = NewsCrawler(CrawlScheduler(per_host_concurrency=args.per_host, per_host_rate=args.per_host_rate),
+                          parser=ParserPool(workers=args.parse_workers))
+    handler = LLMHandler(base_url=llm_url + 'v1', max_concurrency=args.llm_concurrency,
+                         requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    count, first = 0, None
+    start = time.perf_counter()
+    try:
+        async for _ in Pipeline(crawler, sites, llm_handler=handler, llm_workers=args.llm_concurrency).run():
+            count += 1
+            if first is None:
+                first = time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+    finally:
+        crawler.parser.close()
+        for runner in runners:
+            await runner.cleanup()
+
+    site_stats = [runner.app['stats'] for runner in runners[:-1]]
+    llm_stats = llm_app['stats']
+    return {
+        'archive': {'pages': archive_stats['pages'], 'replies': archive_stats['replies']},
+        'articles': count,
+        'seconds': elapsed,
+        'articles_per_second': count / elapsed if elapsed else 0.0,
+        'first_article_seconds': first,
+        'peak_rss_mb': peak_rss_mb(),
+        'latency': latencies(),
+        'sites': {key: sum(stats[key] for stats in site_stats) for key in ('requests', 'errors', 'throttled', 'missing')},
+        'llm': {'requests': llm_stats['requests'], 'errors': llm_stats['errors'],
+                'throttled': llm_stats['rate_limited'], 'replay_misses': llm_stats['missed'],
+                'failed_after_retries': METRICS.total('llm_errors_total')},
+        'fetch_errors': METRICS.total('fetch_errors_total'),
+    }
+
+
+def report(results: Dict, baseline: Dict | None = None):
+    first = results['first_article_seconds']
+    print(f"Replayed {results['archive']['pages']} pages / {results['archive']['replies']} LLM replies: "
+          f"{results['articles']} articles in {results['seconds']:.2f}s "
+          f"({results['articles_per_second']:.1f}/s), first after {first or 0:.2f}s, "
+          f"peak RSS {results['peak_rss_mb']:.0f} MB\n")
+    print(f"{'stage':<12}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for stage, values in results['latency'].items():
+        if values:
+            print(f"{stage:<12}" + ''.join(f"{values[key] * 1000:>9.1f}" for key in ('p50', 'p90', 'p99', 'max')))
+    sites, llm = results['sites'], results['llm']
+    print(f"\nsites: {sites['requests']} requests, {sites['errors']} injected 503s, {sites['throttled']} 429s, "
+          f"{sites['missing']} not in archive, {results['fetch_errors']:g} fetches failed")
+    print(f"llm:   {llm['requests']} completions, {llm['errors']} injected 500s, {llm['throttled']} 429s, "
+          f"{llm['replay_misses']} not in archive, {llm['failed_after_retries']:g} calls failed")
+    if baseline:
+        print(f"\n{'vs baseline':<24}{'before':>10}{'after':>10}{'change':>9}")
+        rows = [(key, baseline.get(key), results.get(key)) for key in HEADLINE]
+        rows += [(f"{stage} p{q}", baseline['latency'].get(stage, {}).get(f'p{q}'), values.get(f'p{q}'))
+                 for stage, values in results['latency'].items() for q in (50, 99)]
+        for name, before, after in rows:
+            if before and after is not None:
+                print(f"{name:<24}{before:>10.3f}{after:>10.3f}{(after - before) / before:>+9.1%}")
+
+
+async def main(args):
+    if args.command == 'record':
+        logging.disable(logging.WARNING)
+        await record(args)
+        return
+    # Injected faults are counted in the report instead of logged one by one.
+    logging.disable(logging.ERROR)
+    results = await run(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    report(results, baseline)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record a crawl into an archive, or replay one as a benchmark.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="crawl and analyze once, archiving every response")
+    record_parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH)
+    record_parser.add_argument('--stub', type=int, default=0, metavar='N',
+                               help="record N articles from the local stub site and fake LLM instead of live sites")
+    record_parser.add_argument('--llm-url', default=None, help="OpenAI-compatible base URL (default: the real API)")
+    record_parser.add_argument('--no-llm', action='store_true', help="record pages only")
+
+    run_parser = commands.add_parser('run', help="replay an archive end-to-end and report the numbers")
+    run_parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH)
+    run_parser.add_argument('--latency', type=float, default=0.05, help="seconds per page request")
+    run_parser.add_argument('--jitter', type=float, default=0.02)
+    run_parser.add_argument('--error-rate', type=float, default=0.0, help="share of page requests answered 503")
+    run_parser.add_argument('--throttle-rate', type=float, default=0.0, help="share of page requests answered 429")
+    run_parser.add_argument('--llm-latency', type=float, default=0.3)
+    run_parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    run_parser.add_argument('--llm-throttle-rate', type=float, default=0.0)
+    run_parser.add_argument('--per-host', type=int, default=8)
+    run_parser.add_argument('--per-host-rate', type=float, default=0.0, help="0 disables the per-host token bucket")
+    run_parser.add_argument('--parse-workers', type=int, default=None)
+    run_parser.add_argument('--llm-concurrency', type=int, default=8)
+    run_parser.add_argument('--rpm', type=float, default=1e9)
+    run_parser.add_argument('--tpm', type=float, default=1e12)
+    run_parser.add_argument('--seed', type=int, default=0, help="seeds latency jitter and fault injection")
+    run_parser.add_argument('--json', default=None, help="write the results here")
+    run_parser.add_argument('--baseline', default=None, help="results JSON of an earlier run to compare against")
+    asyncio.run(main(parser.parse_args()))
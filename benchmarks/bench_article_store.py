@@ -0,0 +1,79 @@
+"""Filter/lookup latency of ArticleStore (and its Qt model) at GUI scale.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_article_store --articles 50000
+"""
+import argparse
+import random
+import time
+
+from article_store import ArticleStore
+from llm_handler import CATEGORIES
+
+WORDS = "반도체 투자 정부 금리 물가 수출 인공지능 스타트업 규제 정책 산업 기술 경제".split()
+
+
+def synthetic_articles(n: int, seed: int = 3):
+    rng = random.Random(seed)
+    for i in range(n):
+        keywords = rng.sample(WORDS, 3)
+        yield {
+            'title': f"{' '.join(keywords)} 기사 {i}",
+            'summary': ' '.join(rng.choice(WORDS) for _ in range(30)),
+            'keywords': keywords,
+            'category': rng.choice(CATEGORIES),
+            'url': f"https://news.example.com/{i}",
+        }
+
+
+def timed(label: str, func, repeat: int = 20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    ms = (time.perf_counter() - start) / repeat * 1000
+    print(f"{label:<34}{ms:>10.3f} ms   ({len(result) if hasattr(result, '__len__') else result} rows)")
+
+
+def main(args):
+    store = ArticleStore()
+    start = time.perf_counter()
+    store.extend(synthetic_articles(args.articles))
+    print(f"indexed {len(store)} articles in {time.perf_counter() - start:.2f}s\n")
+
+    timed('lookup by id', lambda: [store.get(i) for i in range(0, len(store), 997)])
+    timed('filter category', lambda: store.by_category(CATEGORIES[0]))
+    timed('filter keyword', lambda: store.by_keyword(WORDS[0]))
+    timed('search 1 token', lambda: store.search(WORDS[1]))
+    timed('search 2 tokens', lambda: store.search(f"{WORDS[1]} {WORDS[2]}"))
+    timed('linear scan (old filter)', lambda: [a for a in store if a['category'] == CATEGORIES[0]], repeat=5)
+
+    try:
+        from PyQt5.QtWidgets import QApplication, QListView
+        from article_model import ArticleListModel
+    except ImportError:
+        print("\nPyQt5 not installed; skipping model/view timings")
+        return
+    app = QApplication.instance() or QApplication([])
+    model = ArticleListModel(store)
+    view = QListView()
+    view.setUniformItemSizes(True)
+    view.setLayoutMode(QListView.Batched)
+    view.setModel(model)
+    view.resize(800, 600)
+    view.show()
+
+    def switch(ids):
+        model.set_ids(ids)
+        app.processEvents()  # includes the repaint of visible rows
+        return ids
+
+    print()
+    timed('model: show all + repaint', lambda: switch(store.ids()))
+    timed('model: category + repaint', lambda: switch(store.by_category(CATEGORIES[1])))
+    timed('model: search + repaint', lambda: switch(store.search(WORDS[3])))
+    timed('model: click (article_at)', lambda: [model.article_at(row) for row in range(0, 1000, 10)])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=50_000)
+    main(parser.parse_args())
@@ -0,0 +1,107 @@
+"""Local category classifier: accuracy against LLM labels, prediction throughput, and classify_batch vs the LLM alone.
+
+    python -m benchmarks.bench_classifier                              # synthetic labeled corpus
+    python -m benchmarks.bench_classifier --cache .cache/llm_cache.db  # labels recorded from real LLM runs
+
+The synthetic corpus mixes per-category topic words with shared filler,
+some cross-category vocabulary and a few "wrong" labels, so accuracy is
+well below 100%; the real-label numbers are the ones to trust.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+
+from classifier import DEFAULT_THRESHOLD, CategoryClassifier, evaluate, split
+from llm_cache import LLMCache
+from llm_handler import CATEGORIES, LLMHandler
+from benchmarks.fake_openai import make_openai_app
+from benchmarks.stub_server import WORDS, start_app
+
+TOPICS = {
+    '기술': "반도체 인공지능 소프트웨어 클라우드 데이터센터 스마트폰 알고리즘 로봇 배터리 통신망 칩 개발자 오픈소스 보안 서버",
+    '경제': "금리 물가 환율 성장률 기준금리 인플레이션 채권 가계부채 고용지표 소비자물가 무역수지 경기 재정 세수 한국은행",
+    '정치': "국회 여당 야당 대통령 선거 법안 의원 국정감사 개헌 정당 총선 청와대 장관 탄핵 여론조사",
+    '비즈니스': "매출 영업이익 인수합병 상장 실적 투자유치 스타트업 주가 배당 경영진 구조조정 신사업 계열사 분기 점유율",
+    '사회': "경찰 사고 교육 학교 복지 의료 병원 환경 날씨 재난 노동 청년 저출산 주거 범죄",
+    '국제': "미국 중국 일본 유럽연합 정상회담 외교 유엔 전쟁 제재 대사관 협정 러시아 중동 동맹 해외",
+    '문화': "영화 음악 드라마 공연 전시 배우 가수 축제 도서 작가 박물관 한류 콘서트 예술 방송",
+}
+
+
+def synthetic_corpus(n: int, seed: int = 0, words: int = 80, noise: float = 0.03):
+    rng = random.Random(seed)
+    vocab = {category: words_.split() for category, words_ in TOPICS.items()}
+    texts, labels = [], []
+    for _ in range(n):
+        label = rng.choice(CATEGORIES)
+        other = rng.choice(CATEGORIES)
+        tokens = []
+        for _ in range(words):
+            r = rng.random()
+            source = vocab[label] if r < 0.2 else vocab[other] if r < 0.3 else WORDS
+            tokens.append(rng.choice(source) + rng.choice(('', '은', '는', '이', '가', '을', '를', '의', '에서')))
+        texts.append(' '.join(tokens) + '.')
+        # An LLM doesn't agree with itself 100% of the time either.
+        labels.append(rng.choice(CATEGORIES) if rng.random() < noise else label)
+    return texts, labels
+
+
+def throughput(model: CategoryClassifier, texts, batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        model.predict(texts[i:i + batch_size])
+    return len(texts) / (time.perf_counter() - start)
+
+
+async def compare_with_llm(model: CategoryClassifier, texts, args):
+    runner, base_url = await start_app(make_openai_app(args.llm_latency))
+    try:
+        print(f"\nclassify_batch on {len(texts)} articles, fake LLM latency {args.llm_latency * 1000:.0f} ms")
+        print(f"{'mode':<22}{'LLM calls':>10}{'secs':>8}{'ms/article':>12}")
+        for label, classifier in (('LLM only', None), (f'local @ {args.threshold:.2f}', model)):
+            handler = LLMHandler(base_url=base_url + 'v1', requests_per_minute=1e9, tokens_per_minute=1e12,
+                                 classifier=classifier, classifier_threshold=args.threshold)
+            start = time.perf_counter()
+            await handler.classify_batch(texts)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<22}{handler.usage['requests']:>10}{elapsed:>8.2f}{elapsed / len(texts) * 1000:>12.2f}")
+    finally:
+        await runner.cleanup()
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+    if args.cache:
+        examples = LLMCache(args.cache).labels()
+        texts, labels = [text for text, _ in examples], [label for _, label in examples]
+        print(f"{len(texts)} labeled articles from {args.cache}")
+    else:
+        texts, labels = synthetic_corpus(args.articles)
+        print(f"{len(texts)} synthetic articles")
+    (train_texts, train_labels), (test_texts, test_labels) = split(texts, labels)
+
+    start = time.perf_counter()
+    model = CategoryClassifier.fit(train_texts, train_labels)
+    print(f"trained on {len(train_texts)} in {time.perf_counter() - start:.2f}s\n")
+    print(evaluate(model, test_texts, test_labels))
+
+    print(f"\n{'batch size':<12}{'articles/s':>12}{'ms/article':>12}")
+    for batch_size in (1, 32, 1024):
+        rate = throughput(model, test_texts, batch_size)
+        print(f"{batch_size:<12}{rate:>12.0f}{1000 / rate:>12.3f}")
+
+    await compare_with_llm(model, test_texts[:args.llm_articles], args)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cache', default=None, help="LLM cache whose recorded labels to use instead of synthetic data")
+    parser.add_argument('--articles', type=int, default=5000)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--llm-articles', type=int, default=200)
+    parser.add_argument('--llm-latency', type=float, default=0.3)
+    asyncio.run(main(parser.parse_args()))
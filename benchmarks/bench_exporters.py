@@ -0,0 +1,59 @@
+"""Peak memory and time to export synthetic articles, per format.
+
+Peak memory comes from tracemalloc, which sees Python allocations only, so
+Arrow's native buffers are not included in the Parquet figure.
+
+    python -m benchmarks.bench_exporters --articles 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from exporters import Exporters, pq
+
+
+def synthetic_articles(n: int):
+    for i in range(n):
+        yield {
+            'title': f"기사 제목 {i}",
+            'category': "기술",
+            'keywords': ["반도체", "투자", f"키워드{i % 100}"],
+            'summary': "정부는 올해 하반기 반도체 산업 지원을 위해 대규모 예산을 편성한다고 밝혔다. " * 3,
+            'url': f"https://news.example.com/article/{i}",
+        }
+
+
+def measure(label: str, run) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    path = run()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<22}{elapsed:>8.2f}{peak / 2**20:>12.1f}{os.path.getsize(path) / 2**20:>11.1f}")
+
+
+def main(args):
+    formats = ['csv', 'txt', 'jsonl'] + (['parquet'] if pq is not None else [])
+    print(f"{'mode':<22}{'secs':>8}{'peak MiB':>12}{'file MiB':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        def materialized():
+            # The old path: the whole result set is built as a list first.
+            path = os.path.join(tmp, 'list.csv')
+            Exporters.to_csv(list(synthetic_articles(args.articles)), path)
+            return path
+        measure('csv (materialized)', materialized)
+        for file_format in formats:
+            def streamed(file_format=file_format):
+                path = os.path.join(tmp, f"stream.{file_format}")
+                Exporters.export(synthetic_articles(args.articles), path, file_format)
+                return path
+            measure(f"{file_format} (streamed)", streamed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=100_000)
+    main(parser.parse_args())
@@ -0,0 +1,51 @@
+"""Measure what conditional GETs save over repeated section-page polls.
+
+    python -m benchmarks.bench_http_cache --cycles 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from http_cache import HttpCache
+from news_crawler import NewsCrawler
+from scheduler import CrawlScheduler
+from benchmarks.stub_server import make_news_app, start_app
+
+
+async def poll(crawler: NewsCrawler, cycles: int, n_links: int) -> dict:
+    app = make_news_app(n_links, latency=0.01, validators=True)
+    runner, base_url = await start_app(app)
+    try:
+        start = time.perf_counter()
+        async with crawler.scheduler.make_session() as session:
+            for _ in range(cycles):
+                await crawler.fetch_page(session, base_url)
+        elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+    return {'seconds': elapsed, 'bytes_sent': app['stats']['bytes_sent'], 'not_modified': app['stats']['not_modified']}
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(os.path.join(tmp, 'http_cache.db'))
+        # No per-host rate limit, so the timings show the fetch itself.
+        plain = await poll(NewsCrawler(CrawlScheduler(per_host_rate=0)), args.cycles, args.links)
+        cached = await poll(NewsCrawler(CrawlScheduler(per_host_rate=0), http_cache=cache), args.cycles, args.links)
+        stats = cache.stats
+        cache.close()
+    print(f"{'mode':<10}{'secs':>8}{'ms/poll':>10}{'bytes on wire':>16}{'304s':>6}")
+    for label, r in (('plain', plain), ('cached', cached)):
+        print(f"{label:<10}{r['seconds']:>8.2f}{r['seconds'] / args.cycles * 1000:>10.1f}"
+              f"{r['bytes_sent']:>16}{r['not_modified']:>6}")
+    print(f"cache: hits={stats['hits']} misses={stats['misses']} "
+          f"bytes_saved={stats['bytes_saved']} stored_bytes={stats['stored_bytes']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cycles', type=int, default=20)
+    parser.add_argument('--links', type=int, default=2000, help="links on the polled section page")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,66 @@
+"""Tokens and wall time: three calls per article vs. analyze_article vs. analyze_batch.
+
+    python -m benchmarks.bench_llm --articles 30
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from llm_handler import LLMHandler
+from benchmarks.fake_openai import make_openai_app
+from benchmarks.stub_server import start_app
+
+SENTENCE = "정부는 올해 하반기 반도체 산업 지원을 위해 대규모 예산을 편성한다고 밝혔다. "
+
+
+def synthetic_articles(n: int, sentences: int):
+    return [f"기사 {i}. " + SENTENCE * sentences for i in range(n)]
+
+
+async def three_calls(handler: LLMHandler, texts):
+    for text in texts:
+        await handler.summarize_text(text)
+        await handler.extract_keywords(text)
+        await handler.classify_category(text)
+
+
+async def single_call(handler: LLMHandler, texts):
+    for text in texts:
+        await handler.analyze_article(text)
+
+
+async def batched(handler: LLMHandler, texts, budget: int):
+    await handler.analyze_batch(texts, token_budget=budget)
+
+
+async def main(args):
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+    runner, base_url = await start_app(make_openai_app(args.latency, args.per_token_latency))
+    texts = synthetic_articles(args.articles, args.sentences)
+    modes = [
+        ('3 calls/article', lambda h: three_calls(h, texts)),
+        ('analyze_article', lambda h: single_call(h, texts)),
+        ('analyze_batch', lambda h: batched(h, texts, args.budget)),
+    ]
+    print(f"{'mode':<18}{'requests':>10}{'prompt tok':>12}{'compl tok':>11}{'secs':>8}")
+    try:
+        for label, run in modes:
+            handler = LLMHandler(base_url=base_url + 'v1')
+            start = time.perf_counter()
+            await run(handler)
+            elapsed = time.perf_counter() - start
+            u = handler.usage
+            print(f"{label:<18}{u['requests']:>10}{u['prompt_tokens']:>12}{u['completion_tokens']:>11}{elapsed:>8.2f}")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=30)
+    parser.add_argument('--sentences', type=int, default=6, help="article length")
+    parser.add_argument('--latency', type=float, default=0.2, help="fixed seconds per request")
+    parser.add_argument('--per-token-latency', type=float, default=0.0002)
+    parser.add_argument('--budget', type=int, default=3000, help="batch input token budget")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,48 @@
+"""Cold vs. warm analysis of the same articles through the LLM result cache.
+
+    python -m benchmarks.bench_llm_cache --articles 100
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from llm_cache import LLMCache
+from llm_handler import LLMHandler
+from benchmarks.bench_llm import synthetic_articles
+from benchmarks.fake_openai import make_openai_app
+from benchmarks.stub_server import start_app
+
+
+async def main(args):
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+    app = make_openai_app(args.latency)
+    runner, base_url = await start_app(app)
+    articles = [{'content': text} for text in synthetic_articles(args.articles, 6)]
+    print(f"{'run':<8}{'secs':>8}{'api requests':>14}{'hit ratio':>11}{'tokens saved':>14}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'llm_cache.db')
+            for label in ('cold', 'warm'):
+                # A fresh handler and cache object each run, as after an app restart.
+                cache = LLMCache(path)
+                handler = LLMHandler(base_url=base_url + 'v1', cache=cache)
+                before = app['stats']['requests']
+                start = time.perf_counter()
+                async for _ in handler.analyze_stream(articles):
+                    pass
+                elapsed = time.perf_counter() - start
+                stats = cache.stats
+                print(f"{label:<8}{elapsed:>8.2f}{app['stats']['requests'] - before:>14}"
+                      f"{stats['hit_ratio']:>11.2f}{stats['tokens_saved']:>14}")
+                cache.close()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,61 @@
+"""Articles/min through analyze_stream against a rate-limited fake endpoint.
+
+    python -m benchmarks.bench_llm_concurrency --articles 60 --rpm 300
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from llm_handler import LLMHandler
+from benchmarks.bench_llm import synthetic_articles
+from benchmarks.fake_openai import make_openai_app
+from benchmarks.stub_server import start_app
+
+
+async def sequential(handler: LLMHandler, articles):
+    for article in articles:
+        await handler.analyze_article(article['content'])
+        yield article
+
+
+async def run_mode(label, make_handler, consume, articles, args):
+    app = make_openai_app(args.latency, rpm_limit=args.rpm, window=args.window)
+    runner, base_url = await start_app(app)
+    handler = make_handler(base_url + 'v1')
+    first = None
+    start = time.perf_counter()
+    try:
+        async for _ in consume(handler, articles):
+            first = first or time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+    print(f"{label:<26}{len(articles) / elapsed * 60:>12.1f}{first:>10.2f}{elapsed:>8.2f}"
+          f"{app['stats']['rate_limited']:>7}")
+
+
+async def main(args):
+    logging.disable(logging.WARNING)  # one warning per 429 otherwise
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+    articles = [{'content': text} for text in synthetic_articles(args.articles, 6)]
+    print(f"{'mode':<26}{'articles/min':>12}{'first s':>10}{'secs':>8}{'429s':>7}")
+    await run_mode('sequential (old)', lambda url: LLMHandler(base_url=url, max_concurrency=1),
+                   sequential, articles, args)
+    await run_mode('stream, no client budget', lambda url: LLMHandler(
+        base_url=url, max_concurrency=args.concurrency, requests_per_minute=1e9, tokens_per_minute=1e12),
+        lambda h, a: h.analyze_stream(a), articles, args)
+    await run_mode(f'stream, rpm={args.rpm:g}', lambda url: LLMHandler(
+        base_url=url, max_concurrency=args.concurrency, requests_per_minute=args.rpm, tokens_per_minute=1e12),
+        lambda h, a: h.analyze_stream(a), articles, args)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rpm', type=float, default=300, help="server-side and client-side RPM limit")
+    parser.add_argument('--window', type=float, default=5.0, help="server rate-limit window in seconds")
+    asyncio.run(main(parser.parse_args()))
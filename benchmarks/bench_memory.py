@@ -0,0 +1,99 @@
+"""Peak RSS of a full crawl + analysis that keeps every article in an ArticleStore, as the GUI does.
+
+    python -m benchmarks.bench_memory --articles 10000
+
+"unbounded" approximates the previous behaviour: bodies are read whole
+whatever their size, and articles are kept as plain dicts with their full
+text. "bounded" is the default crawler: bodies capped at max_body_bytes
+and ArticleRecords that release their text once analyzed. Non-HTML
+responses are skipped unread in both modes. Each mode runs in a fresh subprocess so the peaks
+don't mask each other. The stub site pads every --large-every-th article
+to --large-mb MB (streamed without Content-Length) and serves every
+--pdf-every-th one as a PDF.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import sys
+import time
+
+from article_store import ArticleStore
+from llm_handler import LLMHandler
+from metrics import METRICS
+from news_crawler import NewsCrawler
+from parsing import ParserPool
+from pipeline import Pipeline
+from scheduler import CrawlScheduler
+from benchmarks.fake_openai import make_openai_app
+from benchmarks.stub_server import make_news_app, start_app
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+async def child(args):
+    logging.disable(logging.WARNING)
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+    METRICS.enable()
+    bounded = args.child == 'bounded'
+    crawler = NewsCrawler(CrawlScheduler(per_host_concurrency=args.fetch_workers, per_host_rate=0),
+                          parser=ParserPool(workers=args.parse_workers),
+                          max_body_bytes=args.max_body_mb * 1024 * 1024 if bounded else None)
+    handler = LLMHandler(base_url=args.llm_url, max_concurrency=args.llm_workers,
+                         requests_per_minute=1e9, tokens_per_minute=1e12)
+    store = ArticleStore()
+    start = time.perf_counter()
+    try:
+        sites = {args.site_url: {'article_link_selector': 'a.sa_item_title'}}
+        pipeline = Pipeline(crawler, sites, llm_handler=handler, fetch_workers=args.fetch_workers,
+                            llm_workers=args.llm_workers, keep_content=not bounded)
+        async for article in pipeline.run():
+            store.add(article if bounded else article.to_dict())
+    finally:
+        crawler.parser.close()
+    skipped = ', '.join(f"{dict(key)['reason']} {value:g}"
+                        for key, value in METRICS.counters.get('fetch_skipped_total', {}).items())
+    elapsed = time.perf_counter() - start
+    print(f"{args.child:<11}{len(store):>10}{peak_rss_mb():>14.0f}{elapsed:>8.1f}   {skipped or '-'}")
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    site_runner, site_url = await start_app(make_news_app(
+        args.articles, latency=0.0, jitter=0.0, large_every=args.large_every,
+        large_bytes=args.large_mb * 1024 * 1024, pdf_every=args.pdf_every))
+    llm_runner, llm_url = await start_app(make_openai_app(0.0))
+    try:
+        print(f"{args.articles} articles, every {args.large_every}th {args.large_mb} MB, "
+              f"every {args.pdf_every}th a PDF\n")
+        print(f"{'mode':<11}{'articles':>10}{'peak RSS MB':>14}{'secs':>8}   skipped")
+        for mode in ('unbounded', 'bounded'):
+            command = [sys.executable, '-m', 'benchmarks.bench_memory', '--child', mode,
+                       '--site-url', site_url, '--llm-url', llm_url + 'v1',
+                       '--max-body-mb', str(args.max_body_mb), '--parse-workers', str(args.parse_workers),
+                       '--fetch-workers', str(args.fetch_workers), '--llm-workers', str(args.llm_workers)]
+            process = await asyncio.create_subprocess_exec(*command)
+            await process.wait()
+    finally:
+        await site_runner.cleanup()
+        await llm_runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=10_000)
+    parser.add_argument('--large-every', type=int, default=500)
+    parser.add_argument('--large-mb', type=int, default=20)
+    parser.add_argument('--pdf-every', type=int, default=333)
+    parser.add_argument('--max-body-mb', type=int, default=5)
+    parser.add_argument('--parse-workers', type=int, default=0, help="0 parses in-process, so parse trees count too")
+    parser.add_argument('--fetch-workers', type=int, default=32)
+    parser.add_argument('--llm-workers', type=int, default=16)
+    parser.add_argument('--child', choices=('unbounded', 'bounded'), help=argparse.SUPPRESS)
+    parser.add_argument('--site-url', help=argparse.SUPPRESS)
+    parser.add_argument('--llm-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    asyncio.run(child(args) if args.child else main(args))
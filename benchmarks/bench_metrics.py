@@ -0,0 +1,92 @@
+"""Instrumentation overhead: per-call cost of each recording method, and a full pipeline run with metrics off vs on.
+
+    python -m benchmarks.bench_metrics --calls 200000 --articles 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from llm_handler import LLMHandler
+from metrics import METRICS, Metrics
+from news_crawler import NewsCrawler
+from parsing import ParserPool
+from pipeline import Pipeline
+from scheduler import CrawlScheduler
+from benchmarks.fake_openai import make_openai_app
+from benchmarks.stub_server import make_news_app, start_app
+
+
+def per_call(metrics: Metrics, calls: int):
+    # The shapes used at the real call sites, including label dicts built per call.
+    def inc():
+        metrics.inc('fetch_responses_total', labels={'status': '200'})
+
+    def observe():
+        metrics.observe('fetch_bytes', 12345, {'host': 'news.example.com'})
+
+    def span():
+        with metrics.span('parse', trace='https://news.example.com/article/1'):
+            pass
+
+    def baseline():
+        pass
+
+    results = {}
+    for name, func in (('baseline', baseline), ('inc', inc), ('observe', observe), ('span', span)):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        results[name] = (time.perf_counter() - start) / calls
+    return results
+
+
+async def pipeline_run(sites, llm_url, args) -> float:
+    crawler = NewsCrawler(CrawlScheduler(per_host_rate=0), parser=ParserPool(workers=args.parse_workers))
+    handler = LLMHandler(base_url=llm_url, requests_per_minute=1e9, tokens_per_minute=1e12)
+    start = time.perf_counter()
+    try:
+        async for _ in Pipeline(crawler, sites, llm_handler=handler).run():
+            pass
+        return time.perf_counter() - start
+    finally:
+        crawler.parser.close()
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+
+    print(f"{'call':<10}{'disabled ns':>13}{'enabled ns':>12}")
+    disabled, enabled = per_call(Metrics(), args.calls), per_call(Metrics(enabled=True), args.calls)
+    for name in disabled:
+        print(f"{name:<10}{disabled[name] * 1e9:>13.0f}{enabled[name] * 1e9:>12.0f}")
+
+    site_runner, site_url = await start_app(make_news_app(args.articles, latency=0.0))
+    llm_runner, llm_url = await start_app(make_openai_app(0.0))
+    sites = {site_url: {'article_link_selector': 'a.sa_item_title'}}
+    try:
+        print(f"\npipeline, {args.articles} articles, no network latency (best of {args.repeat})")
+        # Interleaved so warm-up and machine noise hit both modes alike.
+        best = {False: float('inf'), True: float('inf')}
+        for _ in range(args.repeat):
+            for on in best:
+                METRICS.enabled = on
+                METRICS.reset()
+                best[on] = min(best[on], await pipeline_run(sites, llm_url + 'v1', args))
+        for on, seconds in best.items():
+            print(f"  metrics {'enabled' if on else 'disabled':<9}{seconds:>7.3f}s")
+    finally:
+        METRICS.enabled = False
+        await site_runner.cleanup()
+        await llm_runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=200_000)
+    parser.add_argument('--articles', type=int, default=200)
+    parser.add_argument('--parse-workers', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,58 @@
+"""Near-duplicate clustering throughput and the LLM calls it avoids.
+
+    python -m benchmarks.bench_near_dup --stories 2000 --copies 3
+"""
+import argparse
+import random
+import time
+
+from near_dup import NearDupIndex
+
+WORDS = ("정부 반도체 예산 투자 기업 시장 금리 물가 수출 인공지능 스타트업 규제 "
+         "발표 전망 증가 감소 관계자 분석 정책 산업 기술 경제 사회 국제 문화").split()
+
+
+def story(rng: random.Random, n_words: int = 250) -> str:
+    return ' '.join(rng.choice(WORDS) + str(rng.randint(0, 999)) for _ in range(n_words))
+
+
+def syndicate(rng: random.Random, text: str, edits: int = 5) -> str:
+    # A portal's copy: a few words changed and a different byline appended.
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return ' '.join(words) + f" 기자 {rng.randint(0, 99)}"
+
+
+def main(args):
+    rng = random.Random(42)
+    articles = []
+    for i in range(args.stories):
+        text = story(rng)
+        articles.append({'url': f"https://a.example/{i}", 'title': f"story {i}", 'content': text, 'story': i})
+        for c in range(args.copies):
+            articles.append({'url': f"https://b{c}.example/{i}", 'title': f"story {i} ({c})",
+                             'content': syndicate(rng, text), 'story': i})
+    rng.shuffle(articles)
+
+    index = NearDupIndex()
+    start = time.perf_counter()
+    unique = index.dedup(articles)
+    elapsed = time.perf_counter() - start
+
+    stories_kept = {a['story'] for a in unique}
+    merged_wrongly = sum(1 for a in unique for url in a.get('duplicate_urls', [])
+                         if url.rsplit('/', 1)[1] != str(a['story']))
+    print(f"articles in        {len(articles)}")
+    print(f"representatives    {len(unique)}  (true stories: {args.stories}, covered: {len(stories_kept)})")
+    print(f"wrong merges       {merged_wrongly}")
+    print(f"throughput         {len(articles) / elapsed:.0f} articles/s ({elapsed:.2f}s)")
+    print(f"LLM calls avoided  {len(articles) - len(unique)} of {len(articles)} "
+          f"({(len(articles) - len(unique)) / len(articles):.0%})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stories', type=int, default=2000)
+    parser.add_argument('--copies', type=int, default=3, help="syndicated copies per story")
+    main(parser.parse_args())
@@ -0,0 +1,82 @@
+"""Articles/sec per parser backend, and event-loop lag inline vs. process pool.
+
+    python -m benchmarks.bench_parsing --articles 400
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+
+from parsing import ParserPool, available_backends, extract_article
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def load_fixtures():
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    return fixtures
+
+
+def fixture_urls():
+    # The URL each fixture is served under; it decides which site adapter applies.
+    with open(os.path.join(FIXTURES_DIR, 'expected.json'), encoding='utf-8') as f:
+        return {name: spec['url'] for name, spec in json.load(f).items()}
+
+
+def corpus(fixtures, n):
+    urls = fixture_urls()
+    return [(urls.get(name, name), html) for name, html in (fixtures[i % len(fixtures)] for i in range(n))]
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.005) -> list:
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+    return lags
+
+
+async def crawl_with(pool: ParserPool, docs) -> tuple:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(pool.extract_article(html, url) for url, html in docs))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lags = await ticker
+    return sum(1 for r in results if r), elapsed, max(lags, default=0.0)
+
+
+async def main(args):
+    fixtures = load_fixtures()
+    docs = corpus(fixtures, args.articles)
+
+    print(f"{'backend':<14}{'parsed':>8}{'articles/s':>12}")
+    for backend in available_backends():
+        start = time.perf_counter()
+        parsed = sum(1 for url, html in docs if extract_article(html, url, backend))
+        elapsed = time.perf_counter() - start
+        print(f"{backend:<14}{parsed:>8}{len(docs) / elapsed:>12.1f}")
+
+    print(f"\n{'mode':<24}{'articles/s':>12}{'max loop lag ms':>18}")
+    for backend in available_backends():
+        for label, workers in (('inline', 0), ('pool', args.workers)):
+            pool = ParserPool(workers=workers, backend=backend)
+            if workers:
+                await crawl_with(pool, docs[:len(fixtures)])  # warm up worker processes
+            parsed, elapsed, max_lag = await crawl_with(pool, docs)
+            pool.close()
+            print(f"{backend + ' ' + label:<24}{len(docs) / elapsed:>12.1f}{max_lag * 1000:>18.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=400)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    asyncio.run(main(parser.parse_args()))
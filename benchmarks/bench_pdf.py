@@ -0,0 +1,187 @@
+"""PDF export: the old multi_cell layout vs PdfWriter, at 1k and 10k articles.
+
+    python -m benchmarks.bench_pdf                       # fonts/NanumGothic.ttf, or a generated stand-in
+    python -m benchmarks.bench_pdf --articles 1000 10000 --font /path/to/NanumGothic.ttf
+
+Without the real font a stand-in TTF is generated with fontTools: blocky
+glyphs for ASCII and all 11,172 Hangul syllables, so parsing and subsetting
+cost about what NanumGothic does. "loop stall" is the longest an asyncio
+event loop (standing in for the Qt one) went without running while the
+export was in progress: the old export ran inline, the new one runs on a
+worker thread the way MainWindow does it. Peak memory is from tracemalloc
+in a separate run, with and without --per-file volumes.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+
+from fpdf import FPDF
+
+from exporters import PDF_FONT_PATH, Exporters, FontMetrics, PdfWriter
+from benchmarks.bench_exporters import synthetic_articles
+
+
+def standin_font(path: str):
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    codes = list(range(0x20, 0x7f)) + list(range(0xac00, 0xd7a4))
+    names = ['.notdef'] + [f'uni{code:04X}' for code in codes]
+    glyphs = {}
+    for i, name in enumerate(names):
+        pen = TTGlyphPen(None)
+        for k in range(4):
+            x = 50 + k * 200 + i % 7
+            pen.moveTo((x, 0))
+            pen.lineTo((x, 700))
+            pen.lineTo((x + 120, 700 - i % 11))
+            pen.lineTo((x + 120, 0))
+            pen.closePath()
+        glyphs[name] = pen.glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({code: f'uni{code:04X}' for code in codes})
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({name: (1000 if i > 95 else 500, 50) for i, name in enumerate(names)})
+    builder.setupHorizontalHeader(ascent=880, descent=-120)
+    builder.setupNameTable({'familyName': 'Standin Gothic', 'styleName': 'Regular'})
+    builder.setupOS2(sTypoAscender=880, usWinAscent=880, usWinDescent=120)
+    builder.setupPost()
+    builder.save(path)
+
+
+def legacy_pdf(articles, filepath: str, font_path: str):
+    # The previous Exporters.to_pdf, minus its bold title (no bold face was registered, so it always failed).
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.add_font('NanumGothic', '', font_path)
+    for article in articles:
+        pdf.set_font('NanumGothic', '', 14)
+        pdf.multi_cell(0, 10, article.get('title', 'N/A'), new_x='LMARGIN', new_y='NEXT')
+        pdf.set_font('NanumGothic', '', 10)
+        pdf.cell(0, 10, f"Category: {article.get('category', 'N/A')}", new_x='LMARGIN', new_y='NEXT')
+        pdf.cell(0, 10, f"Keywords: {', '.join(article.get('keywords', []))}", new_x='LMARGIN', new_y='NEXT')
+        pdf.cell(0, 10, f"URL: {article.get('url', 'N/A')}", new_x='LMARGIN', new_y='NEXT')
+        pdf.set_font('NanumGothic', '', 12)
+        pdf.multi_cell(0, 10, article.get('summary', 'N/A'), new_x='LMARGIN', new_y='NEXT')
+        pdf.ln(10)
+    pdf.output(filepath)
+
+
+def new_pdf(articles, filepath: str, font_path: str, per_file: int | None = None, progress=None):
+    with PdfWriter(filepath, font_path=font_path, bold_font_path=None, articles_per_file=per_file) as writer:
+        for article in articles:
+            writer.write(article)
+            if progress is not None and writer.count % 100 == 0:
+                progress(writer.count)
+
+
+async def timed(export, inline: bool):
+    # (seconds, longest event-loop stall) for one export, inline or on a worker thread.
+    loop = asyncio.get_running_loop()
+    stall, done = 0.0, False
+
+    async def watch():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    watcher = asyncio.create_task(watch())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    if inline:
+        export()
+    else:
+        await loop.run_in_executor(None, export)
+    elapsed = time.perf_counter() - start
+    done = True
+    await watcher
+    return elapsed, stall
+
+
+def peak_memory(export) -> float:
+    tracemalloc.start()
+    export()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+async def main(args):
+    warnings.simplefilter('ignore')  # fpdf2 deprecation chatter
+    with tempfile.TemporaryDirectory() as tmp:
+        font_path = args.font
+        if not os.path.exists(font_path):
+            font_path = os.path.join(tmp, 'standin.ttf')
+            standin_font(font_path)
+            print(f"{args.font} not found; using a generated stand-in font")
+        out = os.path.join(tmp, 'out.pdf')
+
+        start = time.perf_counter()
+        FontMetrics.load(font_path)
+        print(f"font metrics parsed once in {(time.perf_counter() - start) * 1000:.0f} ms, then reused by every export")
+        start = time.perf_counter()
+        FPDF().add_font('NanumGothic', '', font_path)
+        print(f"fpdf2 add_font (still per document, it embeds its own subset): "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+        print(f"{'articles':>9}  {'mode':<26}{'secs':>8}{'loop stall ms':>15}{'file MiB':>10}")
+        for n in args.articles:
+            articles = list(synthetic_articles(n))
+            modes = [('new, worker thread', lambda: new_pdf(articles, out, font_path), False)]
+            if not args.skip_legacy:
+                modes.insert(0, ('old multi_cell, inline', lambda: legacy_pdf(articles, out, font_path), True))
+            for label, export, inline in modes:
+                elapsed, stall = await timed(export, inline)
+                size = os.path.getsize(out) / 2 ** 20
+                print(f"{n:>9}  {label:<26}{elapsed:>8.2f}{stall * 1000:>15.0f}{size:>10.1f}")
+
+        print(f"\n{'articles':>9}  {'mode':<26}{'peak MiB':>10}")
+        for n in args.articles:
+            articles = list(synthetic_articles(n))
+            for label, per_file in (('one file', None), (f'volumes of {args.per_file}', args.per_file)):
+                peak = peak_memory(lambda: new_pdf(articles, out, font_path, per_file))
+                print(f"{n:>9}  {label:<26}{peak:>10.1f}")
+
+        # The GUI path end to end: Exporters.export on a worker thread, cancelled halfway through.
+        articles = list(synthetic_articles(args.articles[-1]))
+        cancel_after = len(articles) // 2
+        cancel = threading.Event()
+
+        def progress(count):
+            if count >= cancel_after:
+                cancel.set()
+
+        cancelled = os.path.join(tmp, 'cancelled.pdf')
+        start = time.perf_counter()
+        exported = await asyncio.get_running_loop().run_in_executor(
+            None, _export_with, articles, cancelled, font_path, progress, cancel)
+        print(f"\ncancelled at {cancel_after} of {len(articles)} after {time.perf_counter() - start:.2f}s; "
+              f"exported={exported}, partial file left: {os.path.exists(cancelled)}")
+
+def _export_with(articles, filepath, font_path, progress, cancel) -> int:
+    # Exporters.export with the benchmark's font instead of PDF_FONT_PATH.
+    original = Exporters.WRITERS['pdf']
+    Exporters.WRITERS['pdf'] = lambda path, append=False: PdfWriter(path, append, font_path, None)
+    try:
+        return Exporters.export(articles, filepath, 'pdf', progress=progress, cancel=cancel)
+    finally:
+        Exporters.WRITERS['pdf'] = original
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, nargs='+', default=[1000, 10_000])
+    parser.add_argument('--font', default=PDF_FONT_PATH)
+    parser.add_argument('--per-file', type=int, default=2000)
+    parser.add_argument('--skip-legacy', action='store_true', help="skip the slow multi_cell baseline")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""Time to first analyzed article and total wall time: batch crawl-then-analyze vs the streaming pipeline.
+
+    python -m benchmarks.bench_pipeline --sites 2 --articles 100
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from llm_handler import LLMHandler
+from news_crawler import NewsCrawler
+from parsing import ParserPool
+from pipeline import Pipeline
+from scheduler import CrawlScheduler
+from benchmarks.fake_openai import make_openai_app
+from benchmarks.stub_server import make_news_app, start_app
+
+
+async def batch(crawler: NewsCrawler, handler: LLMHandler, sites):
+    # The previous design: every site finishes crawling, then the whole batch is analyzed.
+    async with crawler.scheduler.make_session() as session:
+        results = await asyncio.gather(*(crawler.crawl_site(session, site, config) for site, config in sites.items()))
+    articles = crawler.near_dup.dedup([article for result in results for article in result])
+    async for article, analysis in handler.analyze_stream(articles):
+        article.update(analysis)
+        yield article
+
+
+def streaming(crawler: NewsCrawler, handler: LLMHandler, sites):
+    return Pipeline(crawler, sites, llm_handler=handler).run()
+
+
+async def run_mode(label, consume, sites, llm_url, args):
+    crawler = NewsCrawler(CrawlScheduler(per_host_concurrency=args.per_host, per_host_rate=args.per_host_rate),
+                          parser=ParserPool(workers=args.parse_workers))
+    handler = LLMHandler(base_url=llm_url, max_concurrency=args.llm_concurrency,
+                         requests_per_minute=1e9, tokens_per_minute=1e12)
+    count, first = 0, None
+    start = time.perf_counter()
+    try:
+        async for _ in consume(crawler, handler, sites):
+            count += 1
+            first = first or time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+    finally:
+        crawler.parser.close()
+    print(f"{label:<12}{count:>10}{first or 0:>10.2f}{elapsed:>8.2f}")
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+    runners, sites = [], {}
+    for i in range(args.sites):
+        runner, base_url = await start_app(make_news_app(args.articles, latency=args.site_latency,
+                                                         first_id=i * args.articles))
+        runners.append(runner)
+        sites[base_url] = {'article_link_selector': 'a.sa_item_title'}
+    llm_runner, llm_url = await start_app(make_openai_app(args.llm_latency))
+    try:
+        print(f"{'mode':<12}{'articles':>10}{'first s':>10}{'secs':>8}")
+        await run_mode('batch', batch, sites, llm_url + 'v1', args)
+        await run_mode('pipeline', streaming, sites, llm_url + 'v1', args)
+    finally:
+        for runner in runners + [llm_runner]:
+            await runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sites', type=int, default=2)
+    parser.add_argument('--articles', type=int, default=100, help="articles per site")
+    parser.add_argument('--site-latency', type=float, default=0.1)
+    parser.add_argument('--llm-latency', type=float, default=0.3)
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--per-host-rate', type=float, default=20.0)
+    parser.add_argument('--parse-workers', type=int, default=2)
+    parser.add_argument('--llm-concurrency', type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
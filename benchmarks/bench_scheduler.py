@@ -0,0 +1,84 @@
+"""Compare the scheduler against the old gather-everything crawl.
+
+    python -m benchmarks.bench_scheduler --articles 500 --max-inflight 32
+
+p95 is measured around `fetch_raw`, so it includes time spent waiting for a
+scheduler slot as well as the request itself.
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import aiohttp
+
+from news_crawler import NewsCrawler
+from scheduler import CrawlScheduler
+from benchmarks.stub_server import make_news_app, start_app
+
+
+def p95(values):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=20)[-1]
+
+
+async def run_once(label: str, crawler: NewsCrawler, session_factory, args) -> dict:
+    app = make_news_app(args.articles, latency=args.latency, max_inflight=args.max_inflight)
+    runner, base_url = await start_app(app)
+    latencies = []
+    fetch_raw = crawler.fetch_raw
+
+    async def timed_fetch(session, url, *args):
+        start = time.perf_counter()
+        result = await fetch_raw(session, url, *args)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    crawler.fetch_raw = timed_fetch
+    try:
+        start = time.perf_counter()
+        async with session_factory() as session:
+            articles = await crawler.crawl_site(session, base_url, {'article_link_selector': 'a.sa_item_title'})
+        elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+    stats = app['stats']
+    return {
+        'label': label,
+        'articles': len(articles),
+        'seconds': elapsed,
+        'pages_per_sec': len(articles) / elapsed if elapsed else 0.0,
+        'p95_ms': p95(latencies) * 1000,
+        'requests': stats['requests'],
+        'throttled': stats['throttled'],
+        'peak_inflight': stats['peak_inflight'],
+    }
+
+
+async def main(args):
+    logging.disable(logging.ERROR)  # the baseline logs one error per throttled page
+    # Baseline: unbounded, no retries, default connector -- the old behaviour.
+    legacy = CrawlScheduler(max_concurrency=100_000, per_host_concurrency=100_000,
+                            per_host_rate=0, max_retries=0)
+    scheduled = CrawlScheduler(max_concurrency=args.concurrency, per_host_concurrency=args.per_host,
+                               per_host_rate=args.rate, max_retries=3, backoff_base=0.2)
+    results = [
+        await run_once('gather-all', NewsCrawler(legacy), aiohttp.ClientSession, args),
+        await run_once('scheduler', NewsCrawler(scheduled), scheduled.make_session, args),
+    ]
+    print(f"{'mode':<12}{'ok':>6}{'secs':>8}{'pages/s':>10}{'p95 ms':>10}{'reqs':>7}{'429s':>7}{'peak':>6}")
+    for r in results:
+        print(f"{r['label']:<12}{r['articles']:>6}{r['seconds']:>8.2f}{r['pages_per_sec']:>10.1f}"
+              f"{r['p95_ms']:>10.1f}{r['requests']:>7}{r['throttled']:>7}{r['peak_inflight']:>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--max-inflight', type=int, default=32, help="stub server throttles above this")
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--per-host', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=0, help="per-host requests/sec, 0 = unlimited")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+"""Extraction accuracy and per-page parse time for every site adapter (and the generic fallback) on stored fixtures.
+
+    python -m benchmarks.bench_site_adapters --repeat 50
+    python -m benchmarks.bench_site_adapters --check     # exit 1 if any adapter field regresses
+
+Expected values live in benchmarks/fixtures/expected.json, one entry per
+fixture with the URL it is served under (which selects the adapter).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+from parsing import available_backends, extract_article, extract_feed_links, extract_generic, extract_links
+from site_adapters import load_registry
+from benchmarks.bench_parsing import FIXTURES_DIR, load_fixtures
+from benchmarks.stub_server import rss_xml, section_html
+
+FIELDS = ('title', 'date', 'author')
+
+
+def body_f1(expected: str, actual: str) -> float:
+    expected_tokens, actual_tokens = Counter(expected.split()), Counter(actual.split())
+    overlap = sum((expected_tokens & actual_tokens).values())
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / sum(actual_tokens.values()), overlap / sum(expected_tokens.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def timed(func, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def run_fixtures(expected, fixtures, repeat: int) -> bool:
+    registry = load_registry()
+    ok = True
+    print(f"{'backend':<12}{'fixture':<22}{'via':<9}{'title':>6}{'date':>6}{'author':>7}{'body F1':>9}{'ms/page':>9}")
+    for backend in available_backends():
+        for name, html in fixtures:
+            spec = expected[name]
+            adapter = registry.for_url(spec['url'])
+            modes = [(adapter.name if adapter else 'generic', lambda: extract_article(html, spec['url'], backend))]
+            if adapter:
+                # The same page through the fallback, to show what the adapter buys.
+                modes.append(('generic', lambda: extract_generic(html, spec['url'])))
+            for label, extract in modes:
+                article, seconds = timed(extract, repeat)
+                article = article or {}
+                hits = [article.get(field) == spec[field] for field in FIELDS]
+                f1 = body_f1(spec['content'], article.get('content', ''))
+                if label != 'generic' or not adapter:
+                    ok = ok and all(hits) and f1 == 1.0
+                print(f"{backend:<12}{name:<22}{label:<9}" + ''.join(f"{'ok' if hit else 'MISS':>{w}}" for hit, w in zip(hits, (6, 6, 7)))
+                      + f"{f1:>9.2f}{seconds * 1000:>9.2f}")
+    return ok
+
+
+def run_discovery(n_links: int, repeat: int):
+    base_url = 'https://news.example.com/'
+    section = section_html(n_links).encode('utf-8')
+    feed = rss_xml(n_links, base_url).encode('utf-8')
+    print(f"\nlink discovery, {n_links} links")
+    print(f"{'source':<24}{'bytes':>9}{'ms':>8}")
+    for backend in available_backends():
+        _, seconds = timed(lambda: extract_links(section, 'a.sa_item_title', base_url, backend), repeat)
+        print(f"{'section HTML (' + backend + ')':<24}{len(section):>9}{seconds * 1000:>8.2f}")
+    _, seconds = timed(lambda: extract_feed_links(feed), repeat)
+    print(f"{'RSS feed':<24}{len(feed):>9}{seconds * 1000:>8.2f}")
+
+
+def main(args):
+    with open(os.path.join(FIXTURES_DIR, 'expected.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+    fixtures = [(name, html) for name, html in load_fixtures() if name in expected]
+    ok = run_fixtures(expected, fixtures, args.repeat)
+    run_discovery(args.links, args.repeat)
+    if args.check and not ok:
+        print("\nREGRESSION: an adapter (or the generic extractor on an unknown site) missed an expected value")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--links', type=int, default=200)
+    parser.add_argument('--check', action='store_true')
+    main(parser.parse_args())
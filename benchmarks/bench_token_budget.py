@@ -0,0 +1,85 @@
+"""Prompt tokens and LLM latency per article with and without boilerplate stripping and budget fitting.
+
+    python -m benchmarks.bench_token_budget --long 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from llm_handler import LLMHandler
+from parsing import extract_article
+from text_budget import TASK_BUDGETS, count_tokens, split_sentences, tiktoken
+from benchmarks.bench_parsing import load_fixtures
+from benchmarks.fake_openai import make_openai_app
+from benchmarks.stub_server import start_app
+
+TASKS = ('analysis', 'summary', 'keywords', 'category')
+
+
+def lengthen(text: str, factor: int) -> str:
+    # A feature-length stand-in: the fixture's sentences repeated, each numbered so none is an exact repeat.
+    sentences = split_sentences(text)
+    return '\n'.join(' '.join(f"{s.rstrip('.')} ({r}-{j})." for j, s in enumerate(sentences)) for r in range(factor))
+
+
+def fixture_corpus(long_factor: int):
+    # Every fixture that parses (fixtures repeat sentences, which fitting also drops), plus a longer variant.
+    corpus = []
+    for name, html in load_fixtures():
+        article = extract_article(html, f"https://fixture.example/{name}", None, None)
+        if article:
+            corpus.append((name, article['content']))
+            corpus.append((f"{name} x{long_factor}", lengthen(article['content'], long_factor)))
+    return corpus
+
+
+async def time_tasks(handler: LLMHandler, text: str) -> dict:
+    calls = {'analysis': handler.analyze_article, 'summary': handler.summarize_text,
+             'keywords': handler.extract_keywords, 'category': handler.classify_category}
+    timings = {}
+    for task in TASKS:
+        start = time.perf_counter()
+        await calls[task](text)
+        timings[task] = time.perf_counter() - start
+    return timings
+
+
+async def main(args):
+    logging.disable(logging.WARNING)
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+    corpus = fixture_corpus(args.long)
+    print(f"tokenizer: {'tiktoken' if tiktoken else 'estimate_tokens'}   budgets: {TASK_BUDGETS}\n")
+
+    runner, base_url = await start_app(make_openai_app(args.latency, per_token_latency=args.per_token_latency))
+    try:
+        full = LLMHandler(base_url=base_url + 'v1', requests_per_minute=1e9, tokens_per_minute=1e12,
+                          token_budgets={task: None for task in TASKS})
+        fitted = LLMHandler(base_url=base_url + 'v1', requests_per_minute=1e9, tokens_per_minute=1e12)
+        print(f"{'article':<26}{'task':<10}{'tokens':>8}{'fitted':>8}{'saved':>7}{'ms':>8}{'fitted ms':>11}")
+        totals = {task: [0, 0, 0.0, 0.0] for task in TASKS}
+        for name, text in corpus:
+            before = await time_tasks(full, text)
+            after = await time_tasks(fitted, text)
+            for task in TASKS:
+                tokens = count_tokens(text)
+                kept = count_tokens(fitted.prepare(task, text))
+                totals[task] = [totals[task][0] + tokens, totals[task][1] + kept,
+                                totals[task][2] + before[task], totals[task][3] + after[task]]
+                print(f"{name:<26}{task:<10}{tokens:>8}{kept:>8}{1 - kept / tokens:>7.0%}"
+                      f"{before[task] * 1000:>8.0f}{after[task] * 1000:>11.0f}")
+        print("\nper article (mean)")
+        for task, (tokens, kept, before, after) in totals.items():
+            n = len(corpus)
+            print(f"  {task:<10} tokens saved {(tokens - kept) / n:>7.0f}   latency saved {(before - after) / n * 1000:>6.0f} ms")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--long', type=int, default=4, help="length multiplier for the long copy of each fixture")
+    parser.add_argument('--latency', type=float, default=0.1, help="fake API base latency (s)")
+    parser.add_argument('--per-token-latency', type=float, default=0.0002, help="fake API latency per prompt token (s)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""Trend queries as history accumulates: the ring-buffer TrendStore against rescanning stored articles.
+
+    python -m benchmarks.bench_trends --days 180
+
+Synthetic crawl: --articles-per-window analyzed articles every hour, keywords
+drawn from a Zipf-like vocabulary that keeps growing, plus a handful of
+keywords that burst for a few hours now and then. At each checkpoint the
+same "what is rising" question is answered twice: by TrendStore.trending()
+and by counting keywords of the stored articles inside the same windows,
+the way a filter over the article list would. Startup (refilling the buffer
+from SQLite) is timed too.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+from trends import TrendStore
+
+HOUR = 3600
+
+
+def make_window(rng: random.Random, window: int, n_articles: int, vocabulary: int, bursts):
+    articles = []
+    for _ in range(n_articles):
+        keywords = [f"kw{min(int(rng.paretovariate(1.1)) - 1, vocabulary)}" for _ in range(4)]
+        keywords.append(f"kw{rng.randrange(vocabulary)}")
+        for term, start in bursts:
+            if start <= window < start + 4 and rng.random() < 0.05:
+                keywords.append(term)
+        articles.append({'category': rng.choice(('기술', '경제', '정치', '사회')), 'keywords': keywords})
+    return articles
+
+
+def rescan_trending(history, latest: int, recent: int = 3, baseline: int = 24, min_count: int = 3):
+    # The same z-score, but from the stored articles: every query walks the list.
+    per_window = {}
+    for window, keywords in history:
+        if latest - recent - baseline < window <= latest:
+            per_window.setdefault(window, Counter()).update(set(keywords))
+    scores = []
+    for term in set().union(*per_window.values()):
+        past = np.array([per_window.get(w, {}).get(term, 0) for w in range(latest - recent - baseline + 1,
+                                                                            latest - recent + 1)], dtype=float)
+        total = sum(per_window.get(w, {}).get(term, 0) for w in range(latest - recent + 1, latest + 1))
+        z = (total / recent - past.mean()) / (past.std() + 1)
+        if total >= min_count and z > 0:
+            scores.append((z, term))
+    return sorted(scores, reverse=True)[:20]
+
+
+def db_size(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + '-wal') if os.path.exists(p))
+
+
+def best_of(function, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(args):
+    rng = random.Random(0)
+    checkpoints = sorted({d for d in (7, 30, 90, 180, 365) if d <= args.days} | {args.days})
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'trends.db')
+        store = TrendStore(path)
+        history = []
+        vocabulary = 2000
+        bursts = []
+        print(f"{args.articles_per_window} articles/hour, trending over 3h vs the 24h before\n")
+        print(f"{'days':>5}{'articles':>10}{'terms':>8}{'db MB':>7}{'add ms/h':>10}"
+              f"{'trending ms':>13}{'top ms':>8}{'rescan ms':>11}{'startup ms':>12}")
+        add_time, windows_added = 0.0, 0
+        for day in range(1, args.days + 1):
+            for hour in range(24):
+                window = day * 24 + hour
+                if rng.random() < 0.02:
+                    bursts.append((f"burst{len(bursts)}", window))
+                vocabulary += 20  # new names and topics keep appearing
+                articles = make_window(rng, window, args.articles_per_window, vocabulary, bursts[-5:])
+                history.extend((window, article['keywords']) for article in articles)
+                start = time.perf_counter()
+                store.add(articles, timestamp=window * HOUR)
+                add_time += time.perf_counter() - start
+                windows_added += 1
+            if day not in checkpoints:
+                continue
+            now = window * HOUR  # the synthetic history's "current" hour
+            trending = best_of(lambda: store.trending(now=now))
+            top = best_of(lambda: store.top(windows=24, now=now))
+            rescan = best_of(lambda: rescan_trending(history, store.latest), repeat=1)
+            startup = best_of(lambda: TrendStore(path).close(), repeat=1)
+            print(f"{day:>5}{len(history):>10}{len(store.terms):>8}{db_size(path) / 1e6:>7.1f}"
+                  f"{add_time / windows_added * 1000:>10.2f}{trending * 1000:>13.2f}{top * 1000:>8.2f}"
+                  f"{rescan * 1000:>11.0f}{startup * 1000:>12.0f}")
+            add_time, windows_added = 0.0, 0
+        rising = ', '.join(f"{trend['term']} (z {trend['z']:.1f})" for trend in store.trending(limit=5, now=now))
+        print(f"\ntop rising now: {rising}")
+        store.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--articles-per-window', type=int, default=100)
+    main(parser.parse_args())
@@ -0,0 +1,112 @@
+import asyncio
+import collections
+import json
+import random
+import re
+import time
+from typing import Any, Dict
+from aiohttp import web
+
+from llm_handler import CATEGORIES, estimate_tokens
+from benchmarks.archive import request_key
+
+BATCH_MARKER = re.compile(r'^### Article (\d+)$', re.MULTILINE)
+
+
+def _fake_analysis(n: int | None = None) -> dict:
+    result = {'summary': "가짜 요약 문장입니다. " * 3, 'keywords': ["반도체", "투자", "정부"],
+              'category': CATEGORIES[(n or 0) % len(CATEGORIES)]}
+    if n is not None:
+        result['id'] = n
+    return result
+
+
+def fake_reply(prompt: str, json_mode: bool) -> str:
+    if json_mode:
+        ids = [int(m) for m in BATCH_MARKER.findall(prompt)]
+        if ids:
+            return json.dumps({'results': [_fake_analysis(n) for n in ids]}, ensure_ascii=False)
+        return json.dumps(_fake_analysis(), ensure_ascii=False)
+    if prompt.startswith('Extract'):
+        return "반도체, 투자, 정부"
+    if prompt.startswith('Classify'):
+        return CATEGORIES[0]
+    return "가짜 요약 문장입니다. " * 3
+
+
+def make_openai_app(latency: float = 0.2, per_token_latency: float = 0.0,
+                    rpm_limit: float | None = None, window: float = 60.0,
+                    replies: Dict[str, Dict[str, Any]] | None = None, error_rate: float = 0.0,
+                    throttle_rate: float = 0.0, retry_after: float = 0.5) -> web.Application:
+    """Minimal OpenAI-compatible /v1/chat/completions endpoint.
+
+    Replies are canned but token usage is estimated from the real prompt, and
+    latency grows with prompt size so bigger requests cost more, like the real API.
+    With `rpm_limit`, at most rpm_limit * window / 60 requests are accepted in
+    any `window` seconds; the rest get a 429 with retry-after headers.
+    `replies` (archive.request_key -> recorded completion) replays a recorded
+    run; requests not in it fall back to the canned replies. A random
+    `error_rate` share of requests gets a 500 and a `throttle_rate` share a 429.
+    """
+    app = web.Application()
+    app['stats'] = {'requests': 0, 'prompt_tokens': 0, 'rate_limited': 0, 'errors': 0, 'replayed': 0, 'missed': 0}
+    accepted = collections.deque()
+
+    def rate_limited(wait: float) -> web.Response:
+        app['stats']['rate_limited'] += 1
+        return web.json_response(
+            {'error': {'message': 'Rate limit reached', 'type': 'requests', 'code': 'rate_limit_exceeded'}},
+            status=429, headers={'retry-after': str(max(1, round(wait))), 'retry-after-ms': str(int(wait * 1000))},
+        )
+
+    def throttle() -> web.Response | None:
+        if rpm_limit is None:
+            return None
+        now = time.monotonic()
+        while accepted and now - accepted[0] >= window:
+            accepted.popleft()
+        if len(accepted) >= max(1, int(rpm_limit * window / 60)):
+            return rate_limited(window - (now - accepted[0]))
+        accepted.append(now)
+        return None
+
+    async def completions(request: web.Request) -> web.Response:
+        limited = throttle()
+        if limited is not None:
+            return limited
+        roll = random.random()
+        if roll < error_rate:
+            app['stats']['errors'] += 1
+            return web.json_response({'error': {'message': 'Injected server error', 'type': 'server_error'}},
+                                     status=500)
+        if roll < error_rate + throttle_rate:
+            return rate_limited(retry_after)
+        payload = await request.json()
+        prompt = '\n'.join(m['content'] for m in payload['messages'])
+        json_mode = (payload.get('response_format') or {}).get('type') == 'json_object'
+        prompt_tokens = estimate_tokens(prompt)
+        await asyncio.sleep(latency + prompt_tokens * per_token_latency)
+        if replies is not None:
+            recorded = replies.get(request_key(payload['messages'], payload.get('response_format')))
+            request.app['stats']['replayed' if recorded else 'missed'] += 1
+            if recorded:
+                request.app['stats']['requests'] += 1
+                request.app['stats']['prompt_tokens'] += prompt_tokens
+                return web.json_response(recorded)
+        content = fake_reply(prompt, json_mode)
+        completion_tokens = estimate_tokens(content)
+        request.app['stats']['requests'] += 1
+        request.app['stats']['prompt_tokens'] += prompt_tokens
+        return web.json_response({
+            'id': f"chatcmpl-fake-{request.app['stats']['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'fake'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        })
+
+    app.router.add_post('/v1/chat/completions', completions)
+    return app
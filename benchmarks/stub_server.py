@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import random
+from aiohttp import web
+
+ARTICLE_TEMPLATE = """<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body><nav><a href="/">home</a></nav>
+<h1>{title}</h1>
+<article>{paragraphs}</article>
+<footer>Copyright stub</footer></body></html>"""
+
+
+WORDS = ("정부 반도체 예산 투자 기업 시장 금리 물가 수출 인공지능 스타트업 규제 "
+         "발표 전망 증가 감소 관계자 분석 정책 산업 기술 경제 사회 국제 문화").split()
+
+
+def article_html(i: int, paragraphs: int = 8) -> str:
+    # Seeded per article: stable across requests, distinct between articles (so
+    # near-duplicate detection doesn't fold the whole stub site into one story).
+    rng = random.Random(i)
+    body = ''.join(f"<p>Stub article {i} paragraph {j}. "
+                   + ' '.join(rng.choice(WORDS) + str(rng.randint(0, 99)) for _ in range(40)) + "</p>"
+                   for j in range(paragraphs))
+    return ARTICLE_TEMPLATE.format(title=f"Stub article {i}", paragraphs=body)
+
+
+def section_html(n_articles: int, link_class: str = 'sa_item_title', first_id: int = 0) -> str:
+    links = ''.join(f'<li><a class="{link_class}" href="/article/{i}">Article {i}</a></li>'
+                    for i in range(first_id, first_id + n_articles))
+    return f"<html><body><ul>{links}</ul></body></html>"
+
+
+def rss_xml(n_articles: int, base_url: str, first_id: int = 0) -> str:
+    items = ''.join(f"<item><title>Article {i}</title><link>{base_url}article/{i}</link></item>"
+                    for i in range(first_id, first_id + n_articles))
+    return f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>stub</title>{items}</channel></rss>'
+
+
+def make_news_app(n_articles: int = 200, latency: float = 0.05, jitter: float = 0.02,
+                  max_inflight: int | None = None, validators: bool = False,
+                  first_id: int = 0, large_every: int | None = None, large_bytes: int = 20_000_000,
+                  pdf_every: int | None = None) -> web.Application:
+    """A news site stand-in: a section page (and /rss.xml) linking to `n_articles` articles.
+
+    With `max_inflight` set, requests beyond that many concurrent ones get a
+    429 with Retry-After, the way a real portal throttles aggressive clients.
+    With `validators`, responses carry an ETag and honour If-None-Match.
+    Give each of several stub sites its own `first_id` so their stories differ.
+    Every `large_every`-th article is padded to about `large_bytes`, and every
+    `pdf_every`-th one is served as application/pdf, like attachments linked from a section.
+    """
+    app = web.Application()
+    app['stats'] = {'requests': 0, 'throttled': 0, 'inflight': 0, 'peak_inflight': 0,
+                    'not_modified': 0, 'bytes_sent': 0}
+
+    async def handle(request: web.Request, body: str, content_type: str = 'text/html') -> web.Response:
+        stats = request.app['stats']
+        stats['requests'] += 1
+        stats['inflight'] += 1
+        stats['peak_inflight'] = max(stats['peak_inflight'], stats['inflight'])
+        try:
+            if max_inflight is not None and stats['inflight'] > max_inflight:
+                stats['throttled'] += 1
+                return web.Response(status=429, headers={'Retry-After': '1'})
+            await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            headers = {}
+            if validators:
+                etag = '"' + hashlib.md5(body.encode('utf-8')).hexdigest() + '"'
+                if request.headers.get('If-None-Match') == etag:
+                    stats['not_modified'] += 1
+                    return web.Response(status=304, headers={'ETag': etag})
+                headers['ETag'] = etag
+            stats['bytes_sent'] += len(body.encode('utf-8'))
+            return web.Response(text=body, content_type=content_type, headers=headers)
+        finally:
+            stats['inflight'] -= 1
+
+    async def section(request: web.Request) -> web.Response:
+        return await handle(request, section_html(n_articles, first_id=first_id))
+
+    async def article(request: web.Request) -> web.Response:
+        i = int(request.match_info['i'])
+        if pdf_every and i % pdf_every == 0:
+            return web.Response(body=b'%PDF-1.4 ' + bytes(100_000), content_type='application/pdf')
+        if large_every and i % large_every == 0:
+            # Sent as a stream with no Content-Length, so only the reader's own cap can stop it.
+            response = web.StreamResponse(headers={'Content-Type': 'text/html; charset=utf-8'})
+            await response.prepare(request)
+            await response.write(article_html(i).encode('utf-8'))
+            padding = b'<!--' + b'x' * (1024 * 1024 - 7) + b'-->'
+            try:
+                for _ in range(large_bytes // len(padding)):
+                    await response.write(padding)
+            except ConnectionError:  # the client gave up on the body
+                pass
+            return response
+        return await handle(request, article_html(i))
+
+    async def rss(request: web.Request) -> web.Response:
+        base_url = f"{request.scheme}://{request.host}/"
+        return await handle(request, rss_xml(n_articles, base_url, first_id), 'application/rss+xml')
+
+    app.router.add_get('/', section)
+    app.router.add_get('/rss.xml', rss)
+    app.router.add_get('/article/{i}', article)
+    return app
+
+
+def make_replay_app(pages, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                    throttle_rate: float = 0.0, retry_after: float = 1.0) -> web.Application:
+    """Serves archived pages of one origin: `pages` maps raw path+query to (status, content_type, encoding, body).
+
+    Each request waits `latency` +/- `jitter` seconds; a random `error_rate`
+    share gets a 503 and a `throttle_rate` share a 429 with Retry-After.
+    Paths that were never recorded get a 404.
+    """
+    app = web.Application()
+    app['stats'] = {'requests': 0, 'missing': 0, 'errors': 0, 'throttled': 0, 'bytes_sent': 0}
+
+    async def replay(request: web.Request) -> web.Response:
+        stats = request.app['stats']
+        stats['requests'] += 1
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+        roll = random.random()
+        if roll < error_rate:
+            stats['errors'] += 1
+            return web.Response(status=503)
+        if roll < error_rate + throttle_rate:
+            stats['throttled'] += 1
+            return web.Response(status=429, headers={'Retry-After': f"{retry_after:g}"})
+        page = pages.get(request.raw_path)
+        if page is None:
+            stats['missing'] += 1
+            return web.Response(status=404)
+        status, content_type, encoding, body = page
+        stats['bytes_sent'] += len(body)
+        return web.Response(status=status, body=body, content_type=content_type or 'application/octet-stream',
+                            charset=encoding if encoding and content_type else None)
+
+    app.router.add_get('/{tail:.*}', replay)
+    return app
+
+
+async def start_app(app: web.Application, host: str = '127.0.0.1', port: int = 0):
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}/"
@@ -0,0 +1,233 @@
+"""Local category classifier trained on the LLM's own labels.
+
+Hashed character n-grams (TF-IDF weighted) feed a softmax regression, all
+in NumPy over whole batches. LLMHandler asks it first and only escalates
+to the LLM when its confidence is below a threshold.
+
+    python classifier.py --train        # fit on the labels in .cache/llm_cache.db and report accuracy
+"""
+import argparse
+import logging
+import os
+import re
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.path.join('.cache', 'category_model.npz')
+DEFAULT_THRESHOLD = 0.7
+HASH_BITS = 18
+NGRAM_RANGE = (1, 3)
+# Category is decided by the lead; more text costs time without changing the answer.
+MAX_CHARS = 2000
+
+_WHITESPACE = re.compile(r'\s+')
+_DIGITS = re.compile(r'\d')
+_MULTIPLIER = np.uint64(1000003)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+# (rows, cols, values): a sparse document-feature matrix as three aligned arrays, sorted by row.
+Sparse = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _normalize(text: str) -> str:
+    # Digits are folded so dates and figures don't become features of their own.
+    return _DIGITS.sub('0', _WHITESPACE.sub(' ', text.lower()))[:MAX_CHARS]
+
+
+def hash_ngrams(texts: Sequence[str], hash_bits: int = HASH_BITS,
+                ngram_range: Tuple[int, int] = NGRAM_RANGE) -> Sparse:
+    """Count hashed character n-grams of every text in one pass.
+
+    All texts are joined into a single code-point array (separated by 0), so
+    hashing is a handful of array operations no matter how many texts there
+    are. The hash is a fixed polynomial, stable across processes, so saved
+    models stay valid.
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if not texts:
+        return empty, empty, np.zeros(0)
+    encoded = [_normalize(text).encode('utf-32-le') + b'\0\0\0\0' for text in texts]
+    codes = np.frombuffer(b''.join(encoded), dtype=np.uint32).astype(np.uint64)
+    doc_of = np.repeat(np.arange(len(texts)), [len(e) // 4 for e in encoded])
+    separators = np.concatenate([[0], np.cumsum(codes == 0)])
+    keys = []
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        if len(codes) < n:
+            continue
+        starts = np.arange(len(codes) - n + 1)
+        valid = separators[starts + n] == separators[starts]  # no separator inside the window
+        h = codes[:len(starts)].copy()
+        for k in range(1, n):
+            h = h * _MULTIPLIER + codes[k:k + len(starts)]
+        h = ((h ^ np.uint64(n)) * _GOLDEN) >> np.uint64(64 - hash_bits)
+        keys.append(doc_of[starts[valid]].astype(np.int64) << hash_bits | h[valid].astype(np.int64))
+    if not keys:
+        return empty, empty, np.zeros(0)
+    unique, counts = np.unique(np.concatenate(keys), return_counts=True)
+    return unique >> hash_bits, unique & ((1 << hash_bits) - 1), counts.astype(np.float64)
+
+
+class CategoryClassifier:
+    def __init__(self, classes: List[str], weights: np.ndarray, bias: np.ndarray, idf: np.ndarray,
+                 hash_bits: int = HASH_BITS, ngram_range: Tuple[int, int] = NGRAM_RANGE):
+        self.classes = list(classes)
+        self.weights = weights  # (n_features, n_classes)
+        self.bias = bias
+        self.idf = idf
+        self.hash_bits = hash_bits
+        self.ngram_range = tuple(ngram_range)
+
+    @staticmethod
+    def _tfidf(counts: Sparse, n_docs: int, idf: np.ndarray) -> Sparse:
+        rows, cols, values = counts
+        values = (1 + np.log(values)) * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n_docs))
+        return rows, cols, values / np.maximum(norms[rows], 1e-12)
+
+    @staticmethod
+    def _scores(x: Sparse, n_docs: int, weights: np.ndarray, bias: np.ndarray) -> np.ndarray:
+        rows, cols, values = x
+        scores = np.empty((n_docs, weights.shape[1]))
+        for c in range(weights.shape[1]):
+            scores[:, c] = np.bincount(rows, weights=values * weights[cols, c], minlength=n_docs)
+        return scores + bias
+
+    @staticmethod
+    def _softmax(scores: np.ndarray) -> np.ndarray:
+        scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        counts = hash_ngrams(texts, self.hash_bits, self.ngram_range)
+        x = self._tfidf(counts, len(texts), self.idf)
+        return self._softmax(self._scores(x, len(texts), self.weights, self.bias))
+
+    def predict(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        # (label, confidence) per text; confidence is the winning class probability.
+        if not texts:
+            return []
+        probabilities = self.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        return [(self.classes[i], float(p)) for i, p in zip(best, probabilities[np.arange(len(texts)), best])]
+
+    @classmethod
+    def fit(cls, texts: Sequence[str], labels: Sequence[str], epochs: int = 30, learning_rate: float = 0.1,
+            l2: float = 1e-5, hash_bits: int = HASH_BITS, ngram_range: Tuple[int, int] = NGRAM_RANGE,
+            seed: int = 0) -> 'CategoryClassifier':
+        """Softmax regression by full-batch Adam on hashed TF-IDF features.
+
+        Training works on the columns that actually occur (typically a few
+        percent of the hash space) with class-major weights, so each step is
+        a handful of contiguous gathers and bincounts.
+        """
+        classes = sorted(set(labels))
+        y = np.array([classes.index(label) for label in labels])
+        n_docs, n_features, n_classes = len(texts), 1 << hash_bits, len(classes)
+        counts = hash_ngrams(texts, hash_bits, ngram_range)
+        document_frequency = np.bincount(counts[1], minlength=n_features)
+        idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+        rows, cols, values = cls._tfidf(counts, n_docs, idf)
+        used, cols = np.unique(cols, return_inverse=True)
+
+        weights = np.random.default_rng(seed).normal(0, 1e-3, (n_classes, len(used)))
+        bias = np.zeros(n_classes)
+        targets = np.eye(n_classes)[y]
+        moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+        beta1, beta2 = 0.9, 0.999
+        scores = np.empty((n_docs, n_classes))
+        for step in range(1, epochs + 1):
+            for c in range(n_classes):
+                scores[:, c] = np.bincount(rows, weights=values * weights[c][cols], minlength=n_docs)
+            error = ((cls._softmax(scores + bias) - targets) / n_docs).T.copy()
+            grad_weights = np.empty_like(weights)
+            for c in range(n_classes):
+                grad_weights[c] = np.bincount(cols, weights=values * error[c][rows], minlength=len(used))
+            grad_weights += l2 * weights
+            for i, (param, grad) in enumerate(((weights, grad_weights), (bias, error.sum(axis=1)))):
+                m, v = moments[2 * i], moments[2 * i + 1]
+                m *= beta1
+                m += (1 - beta1) * grad
+                v *= beta2
+                v += (1 - beta2) * grad ** 2
+                param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + 1e-8)
+        full_weights = np.zeros((n_features, n_classes), dtype=np.float32)
+        full_weights[used] = weights.T
+        return cls(classes, full_weights, bias, idf.astype(np.float32), hash_bits, ngram_range)
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, classes=np.array(self.classes), weights=self.weights, bias=self.bias,
+                            idf=self.idf, hash_bits=self.hash_bits, ngram_range=np.array(self.ngram_range))
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> 'CategoryClassifier':
+        with np.load(path) as data:
+            return cls([str(c) for c in data['classes']], data['weights'], data['bias'], data['idf'],
+                       int(data['hash_bits']), tuple(int(n) for n in data['ngram_range']))
+
+
+def load_classifier(path: str = DEFAULT_MODEL_PATH) -> CategoryClassifier | None:
+    # None until a model has been trained; callers then use the LLM for every article.
+    if not os.path.exists(path):
+        return None
+    return CategoryClassifier.load(path)
+
+
+def evaluate(model: CategoryClassifier, texts: Sequence[str], labels: Sequence[str],
+             thresholds: Sequence[float] = (0.0, 0.5, 0.6, 0.7, 0.8, 0.9)) -> str:
+    """Agreement with the LLM's labels, overall, per class, and at each escalation threshold."""
+    predictions = model.predict(texts)
+    predicted = np.array([label for label, _ in predictions])
+    confidence = np.array([p for _, p in predictions])
+    truth = np.array(labels)
+    lines = [f"accuracy vs LLM: {np.mean(predicted == truth):.1%} on {len(truth)} held-out articles", "",
+             f"{'category':<10}{'support':>9}{'precision':>11}{'recall':>8}"]
+    for label in model.classes:
+        support = int(np.sum(truth == label))
+        chosen = predicted == label
+        precision = np.mean(truth[chosen] == label) if chosen.any() else 0.0
+        recall = np.mean(predicted[truth == label] == label) if support else 0.0
+        lines.append(f"{label:<10}{support:>9}{precision:>11.1%}{recall:>8.1%}")
+    lines += ["", f"{'threshold':<10}{'handled locally':>17}{'local accuracy':>16}{'overall accuracy':>18}"]
+    for threshold in thresholds:
+        local = confidence >= threshold
+        local_accuracy = np.mean(predicted[local] == truth[local]) if local.any() else 0.0
+        # Escalated articles get the LLM's label, which is the reference here.
+        overall = (np.sum(predicted[local] == truth[local]) + np.sum(~local)) / len(truth)
+        lines.append(f"{threshold:<10.2f}{np.mean(local):>17.1%}{local_accuracy:>16.1%}{overall:>18.1%}")
+    return '\n'.join(lines)
+
+
+def split(texts: Sequence[str], labels: Sequence[str], test_fraction: float = 0.2, seed: int = 0):
+    order = np.random.default_rng(seed).permutation(len(texts))
+    n_test = max(1, int(len(texts) * test_fraction))
+    test, train = order[:n_test], order[n_test:]
+    return ([texts[i] for i in train], [labels[i] for i in train]), ([texts[i] for i in test], [labels[i] for i in test])
+
+
+def main(args):
+    from llm_cache import LLMCache
+
+    examples = LLMCache(args.cache).labels()
+    if len(examples) < args.min_examples:
+        logging.error(f"Only {len(examples)} labeled articles in {args.cache}; need at least {args.min_examples}. "
+                      f"Run the crawler with the LLM for a while first.")
+        return
+    texts, labels = [text for text, _ in examples], [label for _, label in examples]
+    (train_texts, train_labels), (test_texts, test_labels) = split(texts, labels)
+    print(evaluate(CategoryClassifier.fit(train_texts, train_labels), test_texts, test_labels))
+    # The saved model is refit on everything, held-out articles included.
+    CategoryClassifier.fit(texts, labels).save(args.model)
+    print(f"\nSaved model trained on {len(texts)} articles to {args.model}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the local category classifier from cached LLM labels.")
+    parser.add_argument('--train', action='store_true', required=True)
+    parser.add_argument('--cache', default=os.path.join('.cache', 'llm_cache.db'))
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--min-examples', type=int, default=200)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main(parser.parse_args())
@@ -1,75 +1,426 @@
 import csv
+import json
 import os
 import logging
-from fpdf import FPDF
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List
+
+from metrics import METRICS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for Parquet export
+    pa = None
+    pq = None
+
+try:
+    from fontTools.ttLib import TTFont
+    from fpdf import FPDF
+except ImportError:  # optional, only needed for PDF export (fpdf2 pulls in fontTools)
+    TTFont = None
+    FPDF = None
+
+PDF_REQUIRES = "PDF export requires fpdf2 (pip install fpdf2)."
+
+# 1 MiB write buffer: large exports issue few syscalls instead of one per row.
+WRITE_BUFFER = 1024 * 1024
+CSV_HEADER = ['Category', 'Title', 'Keywords', 'Summary', 'URL']
+# Korean-capable TTFs, from https://hangeul.naver.com/font; the bold face is optional.
+PDF_FONT_PATH = os.path.join('fonts', 'NanumGothic.ttf')
+PDF_BOLD_FONT_PATH = os.path.join('fonts', 'NanumGothicBold.ttf')
+PDF_FONT_FAMILY = 'NanumGothic'
+PDF_LINE_HEIGHT = 10
+# fpdf2 holds a whole document in memory until it is saved: ~25 MiB peak per 5000-article volume,
+# against ~75 MiB for 50k articles in one file.
+PDF_ARTICLES_PER_FILE = 5000
+PROGRESS_EVERY = 100
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_record(article: Dict[str, Any]) -> Dict[str, Any]:
+    # The fields every structured export carries, in a stable order.
+    return {
+        'category': article.get('category', 'N/A'),
+        'title': article.get('title', 'N/A'),
+        'keywords': list(article.get('keywords', [])),
+        'summary': article.get('summary', 'N/A'),
+        'url': article.get('url', 'N/A'),
+        'duplicate_urls': list(article.get('duplicate_urls', [])),
+    }
+
+
+class ArticleWriter(ABC):
+    """Incremental writer: articles are written one at a time as they arrive.
+
+    With `append=True` an existing file is extended instead of replaced, so a
+    long-running crawl can flush results as it goes.
+    """
+
+    def __init__(self, filepath: str, append: bool = False):
+        self.filepath = filepath
+        self.append = append
+        self.count = 0
+
+    @abstractmethod
+    def write(self, article: Dict[str, Any]):
+        ...
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def discard(self):
+        # A cancelled export leaves no partial file behind (an appended-to file keeps what it had).
+        self.close()
+        if not self.append and os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is ExportCancelled:
+            self.discard()
+        else:
+            self.close()
+
+
+class CsvWriter(ArticleWriter):
+    def __init__(self, filepath: str, append: bool = False):
+        super().__init__(filepath, append)
+        resuming = append and os.path.exists(filepath) and os.path.getsize(filepath) > 0
+        # The BOM (for Excel) only belongs at the very start of the file.
+        self.file = open(filepath, 'a' if append else 'w', newline='',
+                         encoding='utf-8' if resuming else 'utf-8-sig', buffering=WRITE_BUFFER)
+        self.writer = csv.writer(self.file)
+        if not resuming:
+            self.writer.writerow(CSV_HEADER)
+
+    def write(self, article: Dict[str, Any]):
+        self.writer.writerow([
+            article.get('category', 'N/A'),
+            article.get('title', 'N/A'),
+            ', '.join(article.get('keywords', [])),
+            article.get('summary', 'N/A'),
+            article.get('url', 'N/A')
+        ])
+        self.count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class TxtWriter(ArticleWriter):
+    def __init__(self, filepath: str, append: bool = False):
+        super().__init__(filepath, append)
+        self.file = open(filepath, 'a' if append else 'w', encoding='utf-8', buffering=WRITE_BUFFER)
+
+    def write(self, article: Dict[str, Any]):
+        self.file.write(
+            f"## {article.get('title', 'N/A')}\n"
+            f"- Category: {article.get('category', 'N/A')}\n"
+            f"- Keywords: {', '.join(article.get('keywords', []))}\n"
+            f"- URL: {article.get('url', 'N/A')}\n\n"
+            f"{article.get('summary', 'N/A')}\n"
+            + "-" * 20 + "\n\n"
+        )
+        self.count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlWriter(ArticleWriter):
+    def __init__(self, filepath: str, append: bool = False):
+        super().__init__(filepath, append)
+        self.file = open(filepath, 'a' if append else 'w', encoding='utf-8', buffering=WRITE_BUFFER)
+
+    def write(self, article: Dict[str, Any]):
+        self.file.write(json.dumps(export_record(article), ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter(ArticleWriter):
+    # Rows are buffered and written as one row group per `row_group_size` articles.
+    def __init__(self, filepath: str, append: bool = False, row_group_size: int = 10_000):
+        if pq is None:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow).")
+        if append:
+            # Parquet files can't be extended in place.
+            raise ValueError("Parquet export does not support append mode.")
+        super().__init__(filepath, append)
+        self.row_group_size = row_group_size
+        self.schema = pa.schema([
+            ('category', pa.string()), ('title', pa.string()), ('keywords', pa.list_(pa.string())),
+            ('summary', pa.string()), ('url', pa.string()), ('duplicate_urls', pa.list_(pa.string())),
+        ])
+        self.writer = pq.ParquetWriter(filepath, self.schema, compression='zstd')
+        self.rows = []
+
+    def write(self, article: Dict[str, Any]):
+        self.rows.append(export_record(article))
+        self.count += 1
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+class FontMetrics:
+    """Advance widths of one TTF, read once per file and shared by every PDF export.
+
+    fpdf2 measures text glyph by glyph each time multi_cell tries a line
+    break, which is where nearly all of a PDF export's time went; with the
+    widths in a dict, PdfWriter breaks lines itself in one pass per word.
+    """
+    _cache: Dict[str, 'FontMetrics'] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path: str):
+        if TTFont is None:
+            raise RuntimeError(PDF_REQUIRES)
+        font = TTFont(path, lazy=True)
+        try:
+            units = font['head'].unitsPerEm
+            advances = font['hmtx'].metrics
+            self.widths = {chr(code): advances[glyph][0] / units for code, glyph in font.getBestCmap().items()}
+            self.missing = advances['.notdef'][0] / units if '.notdef' in advances else 0.5
+        finally:
+            font.close()
+
+    @classmethod
+    def load(cls, path: str) -> 'FontMetrics':
+        with cls._lock:
+            metrics = cls._cache.get(path)
+            if metrics is None:
+                metrics = cls._cache[path] = cls(path)
+            return metrics
+
+    def width(self, text: str) -> float:
+        # In ems; multiply by the font size.
+        widths, missing = self.widths, self.missing
+        return sum(widths.get(c, missing) for c in text)
+
+    def wrap(self, text: str, max_ems: float) -> List[str]:
+        """Greedy word wrap like multi_cell's; words longer than a line are split between characters."""
+        lines = []
+        space = self.width(' ')
+        for paragraph in text.split('\n'):
+            line, line_width = [], 0.0
+            for word in paragraph.split(' '):
+                word_width = self.width(word)
+                if line and line_width + space + word_width > max_ems:
+                    lines.append(' '.join(line))
+                    line, line_width = [], 0.0
+                while word_width > max_ems and len(word) > 1:
+                    cut, cut_width = 1, self.width(word[0])
+                    while cut < len(word) and cut_width + self.width(word[cut]) <= max_ems:
+                        cut_width += self.width(word[cut])
+                        cut += 1
+                    lines.append(word[:cut])
+                    word, word_width = word[cut:], word_width - cut_width
+                line_width = line_width + space + word_width if line else word_width
+                line.append(word)
+            lines.append(' '.join(line))
+        return lines
+
+
+class PdfWriter(ArticleWriter):
+    """Lays out each article as it is written, wrapping lines with cached FontMetrics.
+
+    fpdf2 keeps a document's pages in memory until it is saved, so a large
+    export is split into volumes of `articles_per_file` (news.pdf,
+    news_2.pdf, ...) and memory stays bounded by one volume. None writes a
+    single file however large.
+    """
+
+    def __init__(self, filepath: str, append: bool = False, font_path: str = PDF_FONT_PATH,
+                 bold_font_path: str | None = PDF_BOLD_FONT_PATH,
+                 articles_per_file: int | None = PDF_ARTICLES_PER_FILE):
+        if FPDF is None:
+            raise RuntimeError(PDF_REQUIRES)
+        if append:
+            raise ValueError("PDF export does not support append mode.")
+        if not os.path.exists(font_path):
+            raise RuntimeError(f"Font file not found at {font_path}. Cannot export PDF with Korean characters. "
+                               f"Download NanumGothic from https://hangeul.naver.com/font into the 'fonts' directory.")
+        super().__init__(filepath, append)
+        self.font_path = font_path
+        # Without the bold face, titles use the regular one.
+        self.bold_font_path = bold_font_path if bold_font_path and os.path.exists(bold_font_path) else None
+        self.metrics = FontMetrics.load(font_path)
+        self.bold_metrics = FontMetrics.load(self.bold_font_path) if self.bold_font_path else self.metrics
+        self.articles_per_file = articles_per_file
+        self.paths: List[str] = []
+        self.pdf = None
+        self.in_volume = 0
+
+    def _volume_path(self, volume: int) -> str:
+        if volume == 0:
+            return self.filepath
+        root, ext = os.path.splitext(self.filepath)
+        return f"{root}_{volume + 1}{ext}"
+
+    def _open_volume(self):
+        self.pdf = FPDF()
+        self.pdf.add_page()
+        self.pdf.add_font(PDF_FONT_FAMILY, '', self.font_path)
+        if self.bold_font_path:
+            self.pdf.add_font(PDF_FONT_FAMILY, 'B', self.bold_font_path)
+        self.in_volume = 0
+
+    def _save_volume(self):
+        path = self._volume_path(len(self.paths))
+        self.pdf.output(path)
+        self.paths.append(path)
+        self.pdf = None
+
+    def _lines(self, text: str, size: float, bold: bool = False):
+        pdf = self.pdf
+        pdf.set_font(PDF_FONT_FAMILY, 'B' if bold and self.bold_font_path else '', size)
+        metrics = self.bold_metrics if bold else self.metrics
+        # Same text position (cell margin, baseline) as multi_cell with this line height.
+        baseline = PDF_LINE_HEIGHT / 2 + 0.3 * pdf.font_size
+        for line in metrics.wrap(text, (pdf.epw - 2 * pdf.c_margin) * pdf.k / size):
+            if pdf.will_page_break(PDF_LINE_HEIGHT):
+                pdf.add_page()
+            if line:
+                pdf.text(pdf.l_margin + pdf.c_margin, pdf.y + baseline, line)
+            pdf.set_y(pdf.y + PDF_LINE_HEIGHT)
+
+    def write(self, article: Dict[str, Any]):
+        if self.pdf is None or self.in_volume == self.articles_per_file:
+            if self.pdf is not None:
+                self._save_volume()
+            self._open_volume()
+        self._lines(article.get('title', 'N/A'), 14, bold=True)
+        self._lines(f"Category: {article.get('category', 'N/A')}", 10)
+        self._lines(f"Keywords: {', '.join(article.get('keywords', []))}", 10)
+        self._lines(f"URL: {article.get('url', 'N/A')}", 10)
+        self._lines(article.get('summary', 'N/A'), 12)
+        self.pdf.ln(PDF_LINE_HEIGHT)
+        self.in_volume += 1
+        self.count += 1
+
+    def close(self):
+        if self.pdf is None and not self.paths:
+            self._open_volume()  # an empty export still produces a (blank) file
+        if self.pdf is not None:
+            self._save_volume()
+            if len(self.paths) > 1:
+                logging.info(f"PDF export split into {len(self.paths)} files: {', '.join(self.paths)}")
+
+    def discard(self):
+        self.pdf = None
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
 
 class Exporters:
+    WRITERS = {'csv': CsvWriter, 'txt': TxtWriter, 'jsonl': JsonlWriter, 'parquet': ParquetWriter, 'pdf': PdfWriter}
+
+    @staticmethod
+    def open_writer(file_format: str, filepath: str, append: bool = False, **options) -> ArticleWriter:
+        # options go to the writer, e.g. articles_per_file for PDF
+        return Exporters.WRITERS[file_format](filepath, append=append, **options)
+
     @staticmethod
-    def to_csv(articles, filepath):
+    def export(articles: Iterable[Dict[str, Any]], filepath: str, file_format: str, append: bool = False,
+               progress: Callable[[int], None] | None = None, cancel: threading.Event | None = None,
+               **options) -> int:
+        """Consumes any iterable lazily; returns the number of articles written.
+
+        Safe to run on a worker thread: `progress(count)` is called from that
+        thread every PROGRESS_EVERY articles, and setting `cancel` stops the
+        export, removes the partial file and returns 0. Other keyword
+        arguments are passed to the writer (see open_writer).
+        """
         try:
-            with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Category', 'Title', 'Keywords', 'Summary', 'URL'])
+            with METRICS.span('export', labels={'format': file_format}), \
+                    Exporters.open_writer(file_format, filepath, append, **options) as writer:
                 for article in articles:
-                    writer.writerow([
-                        article.get('category', 'N/A'),
-                        article.get('title', 'N/A'),
-                        ', '.join(article.get('keywords', [])),
-                        article.get('summary', 'N/A'),
-                        article.get('url', 'N/A')
-                    ])
-            logging.info(f"Exported to CSV: {filepath}")
+                    if cancel is not None and cancel.is_set():
+                        raise ExportCancelled
+                    writer.write(article)
+                    if progress is not None and writer.count % PROGRESS_EVERY == 0:
+                        progress(writer.count)
+            METRICS.inc('exported_articles_total', writer.count, {'format': file_format})
+            logging.info(f"Exported {writer.count} articles to {file_format.upper()}: {filepath}")
+            return writer.count
+        except ExportCancelled:
+            logging.info(f"{file_format.upper()} export to {filepath} cancelled")
+            return 0
         except Exception as e:
-            logging.error(f"Failed to export to CSV: {e}")
+            logging.error(f"Failed to export to {file_format.upper()}: {e}")
+            return 0
 
     @staticmethod
-    def to_txt(articles, filepath):
+    async def export_async(articles: AsyncIterable[Dict[str, Any]], filepath: str, file_format: str,
+                           append: bool = False, flush_every: int = 100) -> int:
+        # For results that arrive over time: each article is written (and periodically flushed) as it comes.
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                for article in articles:
-                    f.write(f"## {article.get('title', 'N/A')}\n")
-                    f.write(f"- Category: {article.get('category', 'N/A')}\n")
-                    f.write(f"- Keywords: {', '.join(article.get('keywords', []))}\n")
-                    f.write(f"- URL: {article.get('url', 'N/A')}\n\n")
-                    f.write(f"{article.get('summary', 'N/A')}\n")
-                    f.write("-" * 20 + "\n\n")
-            logging.info(f"Exported to TXT: {filepath}")
+            # Only time spent writing counts as export time, not waiting for the next article.
+            writing = 0.0
+            with Exporters.open_writer(file_format, filepath, append) as writer:
+                async for article in articles:
+                    start = time.perf_counter()
+                    writer.write(article)
+                    if writer.count % flush_every == 0:
+                        writer.flush()
+                    writing += time.perf_counter() - start
+            METRICS.observe('export_seconds', writing, {'format': file_format})
+            METRICS.inc('exported_articles_total', writer.count, {'format': file_format})
+            logging.info(f"Exported {writer.count} articles to {file_format.upper()}: {filepath}")
+            return writer.count
         except Exception as e:
-            logging.error(f"Failed to export to TXT: {e}")
+            logging.error(f"Failed to export to {file_format.upper()}: {e}")
+            return 0
 
     @staticmethod
-    def to_pdf(articles, filepath):
-        # IMPORTANT: This requires a Korean-supporting TTF font file.
-        # Download from https://hangeul.naver.com/font and place it in the 'fonts' directory.
-        font_path = './fonts/NanumGothic.ttf'
+    def to_csv(articles, filepath, append=False):
+        Exporters.export(articles, filepath, 'csv', append)
 
-        if not os.path.exists(font_path):
-            logging.error(f"Font file not found at {font_path}. Cannot export PDF with Korean characters.")
-            # Fallback or error message could be implemented here.
-            return
-        
-        try:
-            pdf = FPDF()
-            pdf.add_page()
-            
-            # Add and set the Korean font
-            pdf.add_font('NanumGothic', '', font_path, uni=True)
-            pdf.set_font('NanumGothic', '', 12)
-
-            for article in articles:
-                pdf.set_font('NanumGothic', 'B', 14) # Title in Bold
-                pdf.multi_cell(0, 10, article.get('title', 'N/A'))
-                
-                pdf.set_font('NanumGothic', '', 10)
-                pdf.cell(0, 10, f"Category: {article.get('category', 'N/A')}", ln=1)
-                pdf.cell(0, 10, f"Keywords: {', '.join(article.get('keywords', []))}", ln=1)
-                pdf.cell(0, 10, f"URL: {article.get('url', 'N/A')}", ln=1)
-                
-                pdf.set_font('NanumGothic', '', 12)
-                pdf.multi_cell(0, 10, article.get('summary', 'N/A'))
-                pdf.ln(10) # Add some space
-
-            pdf.output(filepath)
-            logging.info(f"Exported to PDF: {filepath}")
-        except Exception as e:
-            logging.error(f"Failed to export to PDF: {e}")
+    @staticmethod
+    def to_txt(articles, filepath, append=False):
+        Exporters.export(articles, filepath, 'txt', append)
+
+    @staticmethod
+    def to_jsonl(articles, filepath, append=False):
+        Exporters.export(articles, filepath, 'jsonl', append)
+
+    @staticmethod
+    def to_parquet(articles, filepath):
+        Exporters.export(articles, filepath, 'parquet')
+
+    @staticmethod
+    def to_pdf(articles, filepath):
+        # IMPORTANT: This requires a Korean-supporting TTF font file (see PDF_FONT_PATH).
+        Exporters.export(articles, filepath, 'pdf')
@@ -0,0 +1,307 @@
+"""Headless crawler daemon: polls each site on its own interval without Qt.
+
+    python headless.py --sink jsonl:news.jsonl            # run until SIGTERM
+    python headless.py --once --sink csv:news.csv         # one cycle, e.g. from cron
+    python headless.py --sink trends --sink log           # also feed the GUI's Trending view
+    python headless.py --metrics-port 9108                 # Prometheus metrics at :9108/metrics
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from aiohttp import web
+
+from exporters import Exporters
+from http_cache import HttpCache
+from metrics import METRICS
+from near_dup import DEFAULT_INDEX_PATH, NearDupIndex
+from news_crawler import NewsCrawler, SITE_CONFIG
+from trends import TrendStore
+from url_store import UrlStore
+
+if TYPE_CHECKING:
+    from llm_handler import LLMHandler
+
+DEFAULT_CHECKPOINT_PATH = os.path.join('.cache', 'headless_checkpoint.json')
+DEFAULT_POLL_INTERVAL = 600
+METRICS_DUMP_INTERVAL = 30
+
+
+class Sink(ABC):
+    # Receives every analyzed article; implementations must not block for long.
+    @abstractmethod
+    async def write(self, articles: List[Dict[str, Any]]):
+        ...
+
+    def close(self):
+        pass
+
+
+class LogSink(Sink):
+    async def write(self, articles: List[Dict[str, Any]]):
+        for article in articles:
+            logging.info(f"[{article.get('category', 'N/A')}] {article.get('title')} - {article.get('url')}")
+
+
+class ExporterSink(Sink):
+    # Appends to a CSV/TXT/JSONL file and flushes after every batch.
+    def __init__(self, file_format: str, filepath: str):
+        self.file_format = file_format
+        self.writer = Exporters.open_writer(file_format, filepath, append=True)
+
+    async def write(self, articles: List[Dict[str, Any]]):
+        with METRICS.span('export', labels={'format': self.file_format}):
+            for article in articles:
+                self.writer.write(article)
+            self.writer.flush()
+        METRICS.inc('exported_articles_total', len(articles), {'format': self.file_format})
+
+    def close(self):
+        self.writer.close()
+
+
+class TrendSink(Sink):
+    # Adds keyword/category counts to the trend store the GUI's Trending view reads.
+    def __init__(self, store: TrendStore):
+        self.store = store
+
+    async def write(self, articles: List[Dict[str, Any]]):
+        self.store.add(articles)
+
+    def close(self):
+        self.store.close()
+
+
+def make_sink(spec: str) -> Sink:
+    # "log", "trends[:<path>]" or "<format>:<path>", e.g. "jsonl:out/news.jsonl"
+    if spec == 'log':
+        return LogSink()
+    file_format, _, filepath = spec.partition(':')
+    if file_format == 'trends':
+        return TrendSink(TrendStore(filepath) if filepath else TrendStore())
+    if not filepath:
+        raise ValueError(f"Sink spec must be 'log', 'trends[:<path>]' or '<format>:<path>', got '{spec}'")
+    return ExporterSink(file_format.lower(), filepath)
+
+
+class HeadlessRunner:
+    """Polls every site on its own interval and pushes new articles through analysis to sinks.
+
+    URLs already in the crawler's UrlStore are skipped before any fetch, so a
+    cycle's cost tracks the number of new articles. Articles that were
+    crawled but not yet delivered are kept in a checkpoint file across
+    shutdowns and retried first on the next start.
+    """
+
+    def __init__(self, crawler: NewsCrawler, llm_handler: 'LLMHandler | None', sinks: List[Sink],
+                 sites: Dict[str, Dict] | None = None, checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+                 shutdown_grace: float = 10.0):
+        self.crawler = crawler
+        self.llm_handler = llm_handler
+        self.sinks = sinks
+        self.sites = sites or SITE_CONFIG
+        self.checkpoint_path = checkpoint_path
+        self.shutdown_grace = shutdown_grace
+        self.pending: Dict[str, Dict[str, Any]] = self._load_checkpoint()
+        self._stop = asyncio.Event()
+
+    def _load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                pending = json.load(f)
+            logging.info(f"Resuming {len(pending)} checkpointed articles")
+            return pending
+        except (OSError, ValueError) as e:
+            logging.error(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return {}
+
+    def _save_checkpoint(self):
+        if os.path.dirname(self.checkpoint_path):
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({url: dict(article) for url, article in self.pending.items()}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def request_stop(self):
+        logging.info("Shutdown requested; finishing in-flight work")
+        self._stop.set()
+
+    async def crawl(self, session, site_url: str, config: Dict) -> List[Dict[str, Any]]:
+        # New articles from one site, already in pending and the checkpoint. Their URLs (and those of
+        # dropped near-duplicates) are marked fetched only then, so a cancel or crash can't lose them.
+        articles = await self.crawler.crawl_site(session, site_url, config)
+        new_articles = self.crawler.near_dup.dedup(articles)
+        self._add_pending(new_articles)
+        for article in articles:
+            self.crawler.mark_fetched(article['url'])
+        return new_articles
+
+    def _add_pending(self, articles: List[Dict[str, Any]]):
+        if not articles:
+            return
+        for article in articles:
+            self.pending[article['url']] = article
+        self._save_checkpoint()
+
+    async def process(self, articles: List[Dict[str, Any]]):
+        if not articles:
+            return
+        self._add_pending(articles)
+        if self.llm_handler is None:
+            await self._deliver(articles)
+            return
+        async for article, analysis in self.llm_handler.analyze_stream(articles):
+            article.update(analysis)
+            await self._deliver([article])
+
+    async def _deliver(self, articles: List[Dict[str, Any]]):
+        for sink in self.sinks:
+            await sink.write(articles)
+        for article in articles:
+            self.pending.pop(article['url'], None)
+
+    async def poll_site(self, session, site_url: str, config: Dict):
+        interval = config.get('poll_interval', DEFAULT_POLL_INTERVAL)
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                new_articles = await self.crawl(session, site_url, config)
+                logging.info(f"{site_url}: {len(new_articles)} new articles")
+                await self.process(new_articles)
+            except Exception:
+                # One bad cycle must not end this site's polling; whatever wasn't delivered stays pending.
+                METRICS.inc('poll_errors_total', labels={'site': site_url})
+                logging.exception(f"{site_url}: poll cycle failed; retrying in {interval}s")
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=max(0.0, interval - (time.monotonic() - started)))
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self):
+        # One cycle, raced against request_stop: after a stop it gets shutdown_grace to finish, then is cancelled.
+        async with self.crawler.scheduler.make_session() as session:
+            cycle = asyncio.create_task(self._cycle_once(session))
+            stop = asyncio.create_task(self._stop.wait())
+            await asyncio.wait([cycle, stop], return_when=asyncio.FIRST_COMPLETED)
+            stop.cancel()
+            if not cycle.done():
+                done, _ = await asyncio.wait([cycle], timeout=self.shutdown_grace)
+                if not done:
+                    logging.warning(f"Cycle still running after {self.shutdown_grace}s; cancelling")
+                    cycle.cancel()
+                    await asyncio.gather(cycle, return_exceptions=True)
+                    return
+            await cycle
+
+    async def _cycle_once(self, session):
+        await self.process(list(self.pending.values()))
+        await asyncio.gather(*(self._crawl_once(session, site, config) for site, config in self.sites.items()))
+
+    async def _crawl_once(self, session, site_url: str, config: Dict):
+        await self.process(await self.crawl(session, site_url, config))
+
+    async def run(self):
+        async with self.crawler.scheduler.make_session() as session:
+            await self.process(list(self.pending.values()))
+            tasks = [asyncio.create_task(self.poll_site(session, site, config)) for site, config in self.sites.items()]
+            await self._stop.wait()
+            _, still_running = await asyncio.wait(tasks, timeout=self.shutdown_grace)
+            for task in still_running:
+                task.cancel()
+            await asyncio.gather(*still_running, return_exceptions=True)
+
+    def close(self):
+        # Whatever was not delivered stays in the checkpoint for the next start.
+        self._save_checkpoint()
+        for sink in self.sinks:
+            sink.close()
+        self.crawler.parser.close()
+
+
+async def start_metrics_server(port: int, host: str = '127.0.0.1') -> web.AppRunner:
+    async def handle(request):
+        return web.Response(text=METRICS.render_prometheus(), content_type='text/plain',
+                            headers={'X-Prometheus-Format': '0.0.4'})
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
+
+
+async def dump_metrics(path: str, interval: float = METRICS_DUMP_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        METRICS.dump(path)
+
+
+async def main(args):
+    if args.metrics_port or args.metrics_file:
+        METRICS.enable()
+    crawler = NewsCrawler(url_store=UrlStore(), http_cache=HttpCache(),
+                          revisit_after_hours=args.revisit_after_hours,
+                          near_dup=NearDupIndex(DEFAULT_INDEX_PATH))
+    llm_handler = None
+    if not args.no_llm:
+        # Imported here so --no-llm runs without openai installed.
+        from classifier import load_classifier
+        from llm_cache import LLMCache
+        from llm_handler import LLMHandler
+        try:
+            llm_handler = LLMHandler(cache=LLMCache(), max_concurrency=args.llm_concurrency,
+                                     classifier=load_classifier())
+        except ValueError as e:
+            logging.error(f"LLM 초기화 실패: {e} (use --no-llm to crawl without analysis)")
+            return
+    sinks = [make_sink(spec) for spec in args.sink or ['log']]
+    runner = HeadlessRunner(crawler, llm_handler, sinks, checkpoint_path=args.checkpoint)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, runner.request_stop)
+        except NotImplementedError:  # Windows
+            pass
+    metrics_server = await start_metrics_server(args.metrics_port, args.metrics_host) if args.metrics_port else None
+    dumper = asyncio.create_task(dump_metrics(args.metrics_file)) if args.metrics_file else None
+    try:
+        if args.once:
+            await runner.run_once()
+        else:
+            await runner.run()
+    finally:
+        runner.close()
+        if dumper:
+            dumper.cancel()
+            METRICS.dump(args.metrics_file)
+        if metrics_server:
+            await metrics_server.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the news crawler without the GUI.")
+    parser.add_argument('--once', action='store_true', help="run a single crawl cycle and exit")
+    parser.add_argument('--sink', action='append',
+                        help="'log', 'trends[:<path>]' or '<csv|txt|jsonl>:<path>'; repeatable")
+    parser.add_argument('--no-llm', action='store_true', help="deliver crawled articles without analysis")
+    parser.add_argument('--llm-concurrency', type=int, default=8)
+    parser.add_argument('--revisit-after-hours', type=float, default=None)
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH)
+    parser.add_argument('--metrics-port', type=int, default=None, help="serve Prometheus metrics on this port")
+    parser.add_argument('--metrics-host', default='127.0.0.1')
+    parser.add_argument('--metrics-file', default=None,
+                        help=f"write metrics every {METRICS_DUMP_INTERVAL}s and on exit (*.json adds per-article traces)")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+import gzip
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Mapping, Tuple
+
+from metrics import METRICS
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is used instead
+    zstandard = None
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'http_cache.db')
+
+
+def _compress(body: bytes) -> Tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(body), 'zstd'
+    return gzip.compress(body, compresslevel=6), 'gzip'
+
+
+def _decompress(blob: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("cache entry is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+class HttpCache:
+    """Validator + compressed-body cache used for conditional GETs.
+
+    Entries are evicted least-recently-used once the compressed bodies exceed
+    `max_bytes`.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 200 * 1024 * 1024):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, encoding TEXT,"
+            " codec TEXT NOT NULL, body BLOB NOT NULL, raw_size INTEGER NOT NULL,"
+            " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        row = self.conn.execute("SELECT etag, last_modified FROM responses WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return {}
+        headers = {}
+        if row[0]:
+            headers['If-None-Match'] = row[0]
+        if row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def load(self, url: str) -> Tuple[bytes, str | None] | None:
+        # Called on a 304: the cached body stands in for the one not sent.
+        row = self.conn.execute("SELECT codec, body, encoding FROM responses WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        body = _decompress(row[1], row[0])
+        self.conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+        self.conn.commit()
+        self.hits += 1
+        self.bytes_saved += len(body)
+        METRICS.inc('cache_hits_total', labels={'cache': 'http'})
+        return body, row[2]
+
+    def store(self, url: str, headers: Mapping[str, str], body: bytes, encoding: str | None):
+        self.misses += 1
+        METRICS.inc('cache_misses_total', labels={'cache': 'http'})
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not (etag or last_modified) or 'no-store' in headers.get('Cache-Control', ''):
+            return
+        blob, codec = _compress(body)
+        old = self.conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, encoding, codec, blob, len(body), len(blob), time.time()),
+        )
+        self.total_bytes += len(blob) - (old[0] if old else 0)
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            row = self.conn.execute("SELECT url, size FROM responses ORDER BY last_access LIMIT 1").fetchone()
+            if not row:
+                self.total_bytes = 0
+                break
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (row[0],))
+            self.total_bytes -= row[1]
+            logging.debug(f"Evicted {row[0]} from HTTP cache")
+
+    @property
+    def stats(self) -> Dict[str, int | float]:
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / requests if requests else 0.0,
+            'bytes_saved': self.bytes_saved,
+            'stored_bytes': self.total_bytes,
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from typing import Any, Dict, List, Tuple
+
+from metrics import METRICS
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'llm_cache.db')
+
+
+def normalize_content(text: str) -> str:
+    # Syndicated copies differ in whitespace and Unicode composition more often than in wording.
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+class LLMCache:
+    """Persistent LLM results keyed by hash(task, model, prompt version, normalized content).
+
+    Entries expire after `ttl_seconds`; beyond `max_entries` the least
+    recently used ones are evicted. Categories the LLM assigns are also kept,
+    with the text they were given for, in a separate `labels` table that
+    never expires: it is the training set for the local classifier.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = 7 * 24 * 3600,
+                 max_entries: int = 200_000):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, tokens INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL) WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS results_lru ON results (last_access)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS labels ("
+            " key TEXT PRIMARY KEY, text TEXT NOT NULL, label TEXT NOT NULL, created_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self.entries = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def make_key(task: str, model: str, prompt_version: int, text: str) -> str:
+        payload = f"{task}\0{model}\0{prompt_version}\0{normalize_content(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value, tokens, created_at FROM results WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row and now - row[2] > self.ttl_seconds:
+            self.conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self.conn.commit()
+            self.entries -= 1
+            row = None
+        if not row:
+            self.misses += 1
+            METRICS.inc('cache_misses_total', labels={'cache': 'llm'})
+            return default
+        self.conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits += 1
+        self.tokens_saved += row[1]
+        METRICS.inc('cache_hits_total', labels={'cache': 'llm'})
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any, tokens: int = 0):
+        now = time.time()
+        exists = self.conn.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), tokens, now, now),
+        )
+        if not exists:
+            self.entries += 1
+        if self.entries > self.max_entries:
+            excess = self.entries - self.max_entries
+            self.conn.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_access LIMIT ?)", (excess,)
+            )
+            self.entries -= excess
+        self.conn.commit()
+
+    def put_label(self, text: str, label: str):
+        key = hashlib.sha256(normalize_content(text).encode('utf-8')).hexdigest()
+        self.conn.execute("INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)", (key, text, label, time.time()))
+        self.conn.commit()
+
+    def labels(self) -> List[Tuple[str, str]]:
+        return self.conn.execute("SELECT text, label FROM labels ORDER BY created_at").fetchall()
+
+    @property
+    def stats(self) -> Dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'tokens_saved': self.tokens_saved,
+            'entries': self.entries,
+        }
+
+    def close(self):
+        self.conn.close()
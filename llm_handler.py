@@ -1,60 +1,353 @@
 import os
+import json
+import random
 import openai
 import logging
 import asyncio
-from typing import List
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+from classifier import DEFAULT_THRESHOLD, CategoryClassifier
+from llm_cache import LLMCache
+from metrics import METRICS, TOKEN_BUCKETS
+from scheduler import TokenBucket
+from text_budget import TASK_BUDGETS, count_tokens, estimate_tokens, prepare_text
+
+CATEGORIES = ["기술", "경제", "정치", "비즈니스", "사회", "국제", "문화"]
+DEFAULT_MODEL = "gpt-3.5-turbo"
+# Part of every cache key: bump whenever a prompt or its parsing changes.
+PROMPT_VERSION = 3
+# Reserved per request against the TPM budget for the completion itself.
+COMPLETION_TOKEN_ALLOWANCE = 300
+
+
+def _retry_after(error: openai.APIStatusError) -> float | None:
+    headers = error.response.headers if error.response is not None else {}
+    for name, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        try:
+            return float(headers[name]) * scale
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
 
 class LLMHandler:
-    def __init__(self):
+    def __init__(self, model: str = DEFAULT_MODEL, base_url: str | None = None,
+                 max_concurrency: int = 8, requests_per_minute: float = 500,
+                 tokens_per_minute: float = 160_000, max_retries: int = 5,
+                 cache: LLMCache | None = None, token_budgets: Dict[str, int | None] | None = None,
+                 classifier: CategoryClassifier | None = None, classifier_threshold: float = DEFAULT_THRESHOLD):
         self.api_key = os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set.")
-        # V1.0+ 에서는 클라이언트를 초기화합니다.
-        self.client = openai.OpenAI(api_key=self.api_key)
-
-    async def _run_blocking_openai(self, model, messages, **kwargs):
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            None,  # 기본 스레드 풀 사용
-            # V1.0+ 구문으로 변경: self.client.chat.completions.create
-            lambda: self.client.chat.completions.create(model=model, messages=messages, **kwargs)
+        self.model = model
+        self.cache = cache
+        # Per-task input budgets (see text_budget.TASK_BUDGETS); None disables fitting for a task.
+        self.token_budgets = {**TASK_BUDGETS, **(token_budgets or {})}
+        # Categories come from the classifier when it is at least this confident; see classifier.py.
+        self.classifier = classifier
+        self.classifier_threshold = classifier_threshold
+        # Retries are handled in _chat_with_retries so they respect our own budgets and Retry-After.
+        self.client = openai.AsyncOpenAI(api_key=self.api_key, base_url=base_url, max_retries=0)
+        self.max_retries = max_retries
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # Burst of about one second's worth so we don't trip the server's own limiter.
+        self._rpm = TokenBucket(requests_per_minute / 60)
+        self._tpm = TokenBucket(tokens_per_minute / 60)
+        self.usage = {'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'rate_limited': 0}
+
+    async def _chat(self, model, messages, task: str = 'chat', **kwargs):
+        # llm_seconds includes rate-limiter waits and retries; llm_request_seconds is the API call alone.
+        with METRICS.span('llm', labels={'task': task}):
+            try:
+                return await self._chat_with_retries(model, messages, task, **kwargs)
+            except Exception:
+                METRICS.inc('llm_errors_total', labels={'task': task})
+                raise
+
+    async def _chat_with_retries(self, model, messages, task: str, **kwargs):
+        prompt_tokens = sum(count_tokens(m['content'], model) for m in messages)
+        for attempt in range(self.max_retries + 1):
+            await self._rpm.acquire()
+            await self._tpm.acquire(prompt_tokens + COMPLETION_TOKEN_ALLOWANCE)
+            try:
+                async with self._slots:
+                    with METRICS.span('llm_request', labels={'task': task}):
+                        response = await self.client.chat.completions.create(model=model, messages=messages, **kwargs)
+            except (openai.APIStatusError, openai.APIConnectionError) as e:
+                # Retried: 429, 5xx, and connection errors (APITimeoutError is one); other 4xx are final.
+                status = getattr(e, 'status_code', None)
+                if status is not None and status != 429 and status < 500:
+                    raise
+                if status == 429:
+                    self.usage['rate_limited'] += 1
+                    METRICS.inc('llm_rate_limited_total', labels={'task': task})
+                if attempt == self.max_retries:
+                    raise
+                delay = (_retry_after(e) if status else None) or random.uniform(0, min(60.0, 2 ** attempt))
+                logging.warning(f"LLM request failed ({status or type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            self.usage['requests'] += 1
+            if getattr(response, 'usage', None):
+                self.usage['prompt_tokens'] += response.usage.prompt_tokens
+                self.usage['completion_tokens'] += response.usage.completion_tokens
+                METRICS.observe('llm_prompt_tokens', response.usage.prompt_tokens, {'task': task}, TOKEN_BUCKETS)
+                METRICS.inc('llm_tokens_total', response.usage.prompt_tokens, {'task': task, 'kind': 'prompt'})
+                METRICS.inc('llm_tokens_total', response.usage.completion_tokens, {'task': task, 'kind': 'completion'})
+            return response
+
+    async def _cached_chat(self, task: str, text: str, prompt: str, parse: Callable[[str], Any], **kwargs) -> Any:
+        # Cache hits return before _chat, so they never wait on the rate limiter or the network.
+        key = self.cache.make_key(task, self.model, PROMPT_VERSION, text) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        response = await self._chat(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            task=task,
+            **kwargs
         )
+        # parse raises on a reply it can't validate, so only good results reach the cache.
+        result = parse(response.choices[0].message.content)
+        if key:
+            usage = getattr(response, 'usage', None)
+            self.cache.put(key, result, usage.total_tokens if usage else 0)
+            self._record_label(task, text, result)
+        return result
+
+    def _record_label(self, task: str, text: str, result: Any):
+        # Every category the LLM assigns becomes training data for the local classifier.
+        category = result if task == 'category' else result.get('category') if task == 'analysis' else None
+        if category in CATEGORIES:
+            self.cache.put_label(text, category)
+
+    def prepare(self, task: str, text: str) -> str:
+        return prepare_text(text, self.token_budgets.get(task), self.model)
+
+    # Reply parsers for _cached_chat: each raises ValueError instead of returning a placeholder.
+    @staticmethod
+    def _parse_summary(content: str) -> str:
+        if not content or not content.strip():
+            raise ValueError("empty summary")
+        return content.strip()
+
+    @staticmethod
+    def _parse_keywords(content: str) -> List[str]:
+        keywords = [k.strip() for k in (content or '').split(',') if k.strip()]
+        if not keywords:
+            raise ValueError("no keywords")
+        return keywords
+
+    @staticmethod
+    def _parse_category(content: str) -> str:
+        category = (content or '').strip()
+        if category not in CATEGORIES:
+            raise ValueError(f"invalid category {category!r}")
+        return category
 
     async def summarize_text(self, text: str) -> str:
+        text = self.prepare('summary', text)
         prompt = f"Please summarize the following news article in 3-4 sentences in Korean:\n\n{text}"
         try:
-            response = await self._run_blocking_openai(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.choices[0].message.content.strip()
+            return await self._cached_chat('summary', text, prompt, self._parse_summary)
         except Exception as e:
             logging.error(f"Error summarizing text: {e}")
             return "Summary not available."
 
     async def extract_keywords(self, text: str) -> List[str]:
+        text = self.prepare('keywords', text)
         prompt = f"Extract 3 to 5 most important keywords from the following text as a comma-separated list (e.g., keyword1, keyword2, keyword3) in Korean:\n\n{text}"
         try:
-            response = await self._run_blocking_openai(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            keywords = response.choices[0].message.content.strip().split(',')
-            return [k.strip() for k in keywords]
+            return await self._cached_chat('keywords', text, prompt, self._parse_keywords)
         except Exception as e:
             logging.error(f"Error extracting keywords: {e}")
             return ["N/A"]
 
     async def classify_category(self, text: str) -> str:
-        categories = ["기술", "경제", "정치", "비즈니스", "사회", "국제", "문화"]
-        prompt = f"Classify the following article into one of these categories: {', '.join(categories)}. Respond with only the category name.\n\n{text}"
+        return (await self.classify_batch([text]))[0]
+
+    async def classify_batch(self, texts: List[str]) -> List[str]:
+        """Categories for several articles.
+
+        The local classifier labels the whole batch in one vectorized pass;
+        only articles below the confidence threshold go to the LLM.
+        """
+        texts = [self.prepare('category', text) for text in texts]
+        labels: List[str | None] = [None] * len(texts)
+        if self.classifier is not None:
+            for i, (label, confidence) in enumerate(self.classifier.predict(texts)):
+                if confidence >= self.classifier_threshold:
+                    labels[i] = label
+        escalated = [i for i, label in enumerate(labels) if label is None]
+        METRICS.inc('category_predictions_total', len(texts) - len(escalated), {'source': 'local'})
+        METRICS.inc('category_predictions_total', len(escalated), {'source': 'llm'})
+        for i, label in zip(escalated, await asyncio.gather(*(self._classify_with_llm(texts[i]) for i in escalated))):
+            labels[i] = label
+        return labels
+
+    async def _classify_with_llm(self, text: str) -> str:
+        prompt = f"Classify the following article into one of these categories: {', '.join(CATEGORIES)}. Respond with only the category name.\n\n{text}"
         try:
-            response = await self._run_blocking_openai(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            category = response.choices[0].message.content.strip()
-            return category if category in categories else "기타"
+            return await self._cached_chat('category', text, prompt, self._parse_category)
         except Exception as e:
             logging.error(f"Error classifying category: {e}")
             return "기타"
+
+    @staticmethod
+    def _validate_analysis(data: Any, with_category: bool = True) -> Dict[str, Any]:
+        # Raises ValueError on a missing or invalid field, so a bad reply is never cached.
+        if not isinstance(data, dict):
+            raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+        summary = data.get('summary')
+        if not isinstance(summary, str) or not summary.strip():
+            raise ValueError("missing summary")
+        keywords = data.get('keywords')
+        if isinstance(keywords, str):
+            keywords = keywords.split(',')
+        keywords = [str(k).strip() for k in keywords or [] if str(k).strip()]
+        if not keywords:
+            raise ValueError("missing keywords")
+        result = {'summary': summary.strip(), 'keywords': keywords}
+        if with_category:
+            category = str(data.get('category', '')).strip()
+            if category not in CATEGORIES:
+                raise ValueError(f"invalid category {category!r}")
+            result['category'] = category
+        return result
+
+    @staticmethod
+    def _fallback_analysis() -> Dict[str, Any]:
+        # Returned when analysis fails; never cached.
+        return {'summary': "Summary not available.", 'keywords': ["N/A"], 'category': "기타"}
+
+    def _local_category(self, text: str) -> str | None:
+        # The classifier's label when it is confident enough, else None (ask the LLM).
+        if self.classifier is None:
+            return None
+        label, confidence = self.classifier.predict([text])[0]
+        source = 'local' if confidence >= self.classifier_threshold else 'llm'
+        METRICS.inc('category_predictions_total', labels={'source': source})
+        return label if source == 'local' else None
+
+    async def analyze_article(self, text: str) -> Dict[str, Any]:
+        """Summary, keywords and category in one round-trip instead of three.
+
+        When the local classifier is confident the category is not asked
+        for at all; the prompt (and its cache entry) covers only summary
+        and keywords.
+        """
+        text = self.prepare('analysis', text)
+        category = self._local_category(text)
+        if category is not None:
+            prompt = (
+                "Analyze the following news article and respond with a JSON object with exactly these keys:\n"
+                '"summary": a 3-4 sentence summary in Korean,\n'
+                f'"keywords": a list of the 3 to 5 most important keywords in Korean.\n\n{text}'
+            )
+            task = 'analysis_no_category'
+        else:
+            prompt = (
+                "Analyze the following news article and respond with a JSON object with exactly these keys:\n"
+                '"summary": a 3-4 sentence summary in Korean,\n'
+                '"keywords": a list of the 3 to 5 most important keywords in Korean,\n'
+                f'"category": one of {", ".join(CATEGORIES)}.\n\n{text}'
+            )
+            task = 'analysis'
+        try:
+            result = await self._cached_chat(
+                task, text, prompt,
+                lambda content: self._validate_analysis(json.loads(content), with_category=category is None),
+                response_format={"type": "json_object"}
+            )
+        except Exception as e:
+            logging.error(f"Error analyzing article: {e}")
+            result = self._fallback_analysis()
+        return {**result, 'category': category} if category is not None else result
+
+    @staticmethod
+    def pack_batches(texts: List[str], token_budget: int) -> List[List[int]]:
+        # Greedy packing of article indices into batches whose estimated prompt fits the budget.
+        batches, current, used = [], [], 0
+        for i, text in enumerate(texts):
+            cost = estimate_tokens(text)
+            if current and used + cost > token_budget:
+                batches.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    async def analyze_batch(self, texts: List[str], token_budget: int = 3000) -> List[Dict[str, Any]]:
+        """Analyze several articles per request, packed within `token_budget` input tokens.
+
+        Articles too long to share a request (or missing from a batch reply)
+        go through analyze_article individually.
+        """
+        texts = [self.prepare('analysis', text) for text in texts]
+        results: List[Dict[str, Any] | None] = [None] * len(texts)
+        keys = [self.cache.make_key('analysis', self.model, PROMPT_VERSION, text) if self.cache else None
+                for text in texts]
+        if self.cache:
+            for i, key in enumerate(keys):
+                results[i] = self.cache.get(key)
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        async def run(packed: List[int]):
+            batch = [pending[j] for j in packed]
+            if len(batch) == 1:
+                results[batch[0]] = await self.analyze_article(texts[batch[0]])
+                return
+            articles = '\n\n'.join(f"### Article {n}\n{texts[i]}" for n, i in enumerate(batch))
+            prompt = (
+                "Analyze each of the following news articles. Respond with a JSON object "
+                '{"results": [...]} containing one object per article with the keys '
+                '"id" (the article number), "summary" (3-4 sentences in Korean), '
+                '"keywords" (3 to 5 keywords in Korean) and '
+                f'"category" (one of {", ".join(CATEGORIES)}).\n\n{articles}'
+            )
+            try:
+                response = await self._chat(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    task='analysis_batch',
+                    response_format={"type": "json_object"}
+                )
+                usage = getattr(response, 'usage', None)
+                tokens = usage.total_tokens // len(batch) if usage else 0
+                for item in json.loads(response.choices[0].message.content).get('results', []):
+                    n = item.get('id') if isinstance(item, dict) else None
+                    if isinstance(n, int) and 0 <= n < len(batch):
+                        try:
+                            results[batch[n]] = self._validate_analysis(item)
+                        except ValueError as e:
+                            logging.warning(f"Invalid analysis for batch article {n}: {e}")
+                            continue
+                        if self.cache:
+                            self.cache.put(keys[batch[n]], results[batch[n]], tokens)
+                            self._record_label('analysis', texts[batch[n]], results[batch[n]])
+            except Exception as e:
+                logging.error(f"Error analyzing article batch: {e}")
+            for i in batch:
+                if results[i] is None:
+                    results[i] = await self.analyze_article(texts[i])
+
+        await asyncio.gather(*(run(packed) for packed in self.pack_batches([texts[i] for i in pending], token_budget)))
+        return results
+
+    async def analyze_stream(self, articles: List[Dict[str, Any]]) -> AsyncIterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        # Yields (article, analysis) as each one finishes; concurrency and rate are bounded in _chat.
+        async def run(article):
+            with METRICS.span('analyze', trace=article.get('url')):
+                return article, await self.analyze_article(article['content'])
+
+        tasks = [asyncio.create_task(run(article)) for article in articles]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
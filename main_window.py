@@ -1,18 +1,57 @@
+import os
 import sys
 import asyncio
+import functools
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import (
     QMainWindow, QApplication, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, 
-    QListWidget, QTextEdit, QLabel, QSplitter, QFrame, QScrollArea, QSizePolicy, 
+    QListWidget, QListWidgetItem, QListView, QLineEdit, QTextEdit, QLabel, QSplitter, QFrame, QScrollArea, QSizePolicy, 
     QFileDialog, QComboBox, QProgressBar, QMessageBox
 )
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QPalette, QColor
 from qasync import QEventLoop, asyncSlot
 
-from crawler.news_crawler import NewsCrawler
+from crawler.news_crawler import NewsCrawler, SITE_CONFIG
 from llm.llm_handler import LLMHandler
-from utils.exporters import Exporters
+from utils.exporters import PDF_ARTICLES_PER_FILE, Exporters
+from url_store import UrlStore
+from http_cache import HttpCache
+from llm_cache import LLMCache
+from classifier import load_classifier
+from near_dup import DEFAULT_INDEX_PATH, NearDupIndex
+from article_store import ArticleStore
+from article_model import ArticleListModel
+from pipeline import Pipeline
+from metrics import METRICS
+from trends import TrendStore
+
+def format_stats() -> str:
+    # One line per stage for the stats panel; per-host/per-task breakdowns stay in the Prometheus output.
+    def latency(name):
+        h = METRICS.merged(name)
+        if not h or not h.count:
+            return "-"
+        return f"{h.count} × {h.sum / h.count * 1000:.0f}ms avg, p95≤{h.quantile(0.95) * 1000:.0f}ms"
+
+    hits, misses = METRICS.counters.get('cache_hits_total', {}), METRICS.counters.get('cache_misses_total', {})
+    cache = ', '.join(f"{dict(key)['cache']} {value:g}/{value + misses.get(key, 0):g}" for key, value in hits.items())
+    queues = ', '.join(f"{dict(key)['stage']} {value:g}"
+                       for key, value in METRICS.gauges.get('pipeline_queue_depth', {}).items())
+    tokens = METRICS.total('llm_tokens_total')
+    return '\n'.join([
+        f"fetch   {latency('fetch_seconds')}",
+        f"        {METRICS.total('fetch_bytes_total') / 1e6:.1f} MB, {METRICS.total('fetch_errors_total'):g} errors",
+        f"parse   {latency('parse_seconds')}",
+        f"llm     {latency('llm_seconds')}",
+        f"        {tokens:g} tokens, {METRICS.total('llm_rate_limited_total'):g} rate limited",
+        f"export  {latency('export_seconds')}",
+        f"cache   {cache or '-'}",
+        f"queues  {queues or '-'}",
+    ])
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -20,11 +59,15 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("EIDOS News Aggregator")
         self.setGeometry(100, 100, 1200, 800)
 
-        self.crawler = NewsCrawler()
+        # Fetched URLs, cached section pages and near-duplicate signatures all persist
+        # across runs, so a restart doesn't re-download or re-analyze what it has seen.
+        self.crawler = NewsCrawler(url_store=UrlStore(), http_cache=HttpCache(),
+                                   near_dup=NearDupIndex(DEFAULT_INDEX_PATH))
         
         # [!!! 수정 시작 !!!]
         try:
-            self.llm_handler = LLMHandler()
+            # Results are cached by content hash, so re-runs and syndicated copies skip the API.
+            self.llm_handler = LLMHandler(cache=LLMCache(), classifier=load_classifier())
             self.llm_ready = True
         except ValueError as e:
             # API 키가 없을 때 발생하는 오류를 잡습니다.
@@ -38,8 +81,15 @@ class MainWindow(QMainWindow):
                 "API 키를 설정한 후 프로그램을 다시 시작하세요.")
         # [!!! 수정 끝 !!!]
             
-        self.articles = [] 
+        self.store = ArticleStore()
+        # Keyword/category counts per hour, kept across runs for the Trending view.
+        self.trends = TrendStore()
+        # Exports run one at a time off the GUI thread; laying out thousands of PDF pages takes seconds.
+        self.export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='export')
+        self.export_cancel: threading.Event | None = None
         self.current_theme = 'dark'
+        # Cheap enough to leave on: a few dict updates per fetched page or LLM call.
+        METRICS.enable()
 
         self.init_ui()
         self.apply_stylesheet('dark')
@@ -81,13 +131,43 @@ class MainWindow(QMainWindow):
         self.category_list = QListWidget()
         self.category_list.itemClicked.connect(self.filter_by_category)
         left_layout.addWidget(self.category_list)
+        left_layout.addWidget(QLabel("Trending"))
+        self.trending_list = QListWidget()
+        self.trending_list.setToolTip("Keywords rising over the last 3 hours against the day before")
+        self.trending_list.itemClicked.connect(self.filter_by_trend)
+        left_layout.addWidget(self.trending_list)
+        left_layout.addWidget(QLabel("Pipeline stats"))
+        self.stats_view = QTextEdit()
+        self.stats_view.setReadOnly(True)
+        self.stats_view.setFont(QFont("Monospace", 8))
+        left_layout.addWidget(self.stats_view)
         splitter.addWidget(left_panel)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.refresh_stats)
+        self.stats_timer.start(1000)
+        # Also picks up counts a headless.py --sink trends process adds while the GUI is open.
+        self.trends_timer = QTimer(self)
+        self.trends_timer.timeout.connect(self.update_trending)
+        self.trends_timer.start(60_000)
+        self.update_trending()
 
         # Right panel (Articles and details)
         right_panel = QSplitter(Qt.Vertical)
         
-        self.article_list = QListWidget()
-        self.article_list.itemClicked.connect(self.display_article_details)
+        article_panel = QWidget()
+        article_layout = QVBoxLayout(article_panel)
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search titles, summaries and keywords")
+        self.search_box.textChanged.connect(self.filter_by_text)
+        # Model/view: only visible rows are rendered, however many articles are loaded.
+        self.article_model = ArticleListModel(self.store, self)
+        self.article_list = QListView()
+        self.article_list.setUniformItemSizes(True)
+        self.article_list.setLayoutMode(QListView.Batched)
+        self.article_list.setModel(self.article_model)
+        self.article_list.clicked.connect(self.display_article_details)
+        article_layout.addWidget(self.search_box)
+        article_layout.addWidget(self.article_list)
         
         detail_widget = QWidget()
         detail_layout = QVBoxLayout(detail_widget)
@@ -105,15 +185,18 @@ class MainWindow(QMainWindow):
         # Export section
         export_layout = QHBoxLayout()
         self.export_combo = QComboBox()
-        self.export_combo.addItems(["CSV", "TXT", "PDF"])
+        self.export_combo.addItems(["CSV", "TXT", "JSONL", "Parquet", "PDF"])
         self.export_button = QPushButton("Export")
         self.export_button.clicked.connect(self.export_data)
         export_layout.addWidget(QLabel("Export as:"))
         export_layout.addWidget(self.export_combo)
         export_layout.addWidget(self.export_button)
+        self.export_progress = QProgressBar()
+        self.export_progress.setVisible(False)
+        export_layout.addWidget(self.export_progress)
         detail_layout.addLayout(export_layout)
 
-        right_panel.addWidget(self.article_list)
+        right_panel.addWidget(article_panel)
         right_panel.addWidget(detail_widget)
         right_panel.setSizes([400, 400])
 
@@ -158,23 +241,26 @@ class MainWindow(QMainWindow):
         self.progress_bar.setRange(0, 0) # Indeterminate progress
         
         try:
-            crawled_articles = await self.crawler.crawl()
-            if not crawled_articles:
+            # Crawling and analysis overlap: each article shows up as soon as it has been analyzed.
+            pipeline = Pipeline(self.crawler, SITE_CONFIG, llm_handler=self.llm_handler)
+            received = 0
+            analyzed = []
+            async for article in pipeline.run():
+                if not received:
+                    # Keep the previous results on screen until something new arrives.
+                    self.store.clear()
+                    self.article_model.set_ids([])
+                received += 1
+                self.article_model.append_id(self.store.add(article))
+                analyzed.append(article)
+                self.fetch_button.setText(f"Analyzing... {received}")
+
+            if not received:
                 logging.warning("No articles were crawled.")
                 return
-
-            self.progress_bar.setRange(0, len(crawled_articles))
-            processed_articles = []
-            for i, article in enumerate(crawled_articles):
-                self.fetch_button.setText(f"Analyzing {i+1}/{len(crawled_articles)}")
-                article['summary'] = await self.llm_handler.summarize_text(article['content'])
-                article['keywords'] = await self.llm_handler.extract_keywords(article['content'])
-                article['category'] = await self.llm_handler.classify_category(article['content'])
-                processed_articles.append(article)
-                self.progress_bar.setValue(i + 1)
-
-            self.articles = processed_articles
-            self.update_ui_with_articles(self.articles)
+            self.update_categories()
+            self.trends.add(analyzed)
+            self.update_trending()
         except Exception as e:
             logging.error(f"An error occurred during fetch and update: {e}")
         finally:
@@ -182,24 +268,31 @@ class MainWindow(QMainWindow):
             self.fetch_button.setText("뉴스 가져오기")
             self.progress_bar.setVisible(False)
 
-    def update_ui_with_articles(self, articles_to_display):
-        self.update_article_list(articles_to_display)
-        self.update_categories(self.articles) # Always update categories based on the full list
-
-    def update_article_list(self, articles):
-        self.article_list.clear()
-        for article in articles:
-            self.article_list.addItem(article['title'])
+    def refresh_stats(self):
+        text = format_stats()
+        if text != self.stats_view.toPlainText():
+            self.stats_view.setPlainText(text)
 
-    def update_categories(self, articles):
+    def update_categories(self):
+        # Always based on the full store, not the current filter.
         self.category_list.clear()
         self.category_list.addItem("All")
-        categories = sorted(list(set(article['category'] for article in articles)))
-        self.category_list.addItems(categories)
+        self.category_list.addItems(self.store.categories())
 
-    def display_article_details(self, item):
-        title = item.text()
-        article = next((a for a in self.articles if a['title'] == title), None)
+    def update_trending(self):
+        self.trends.refresh()
+        trends = self.trends.trending()
+        labels = [f"{trend['term']}  {trend['count']}  (z {trend['z']:.1f})" for trend in trends]
+        if labels == [self.trending_list.item(i).text() for i in range(self.trending_list.count())]:
+            return  # unchanged; don't reset the user's selection every minute
+        self.trending_list.clear()
+        for trend, label in zip(trends, labels):
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, trend['term'])
+            self.trending_list.addItem(item)
+
+    def display_article_details(self, index):
+        article = self.article_model.article_at(index.row())
         if article:
             self.article_title.setText(article['title'])
             self.article_summary.setText(article['summary'])
@@ -215,38 +308,64 @@ class MainWindow(QMainWindow):
     def filter_by_category(self, item):
         category = item.text()
         if category == "All":
-            self.update_article_list(self.articles)
+            self.article_model.set_ids(self.store.ids())
         else:
-            filtered = [a for a in self.articles if a['category'] == category]
-            self.update_article_list(filtered)
+            self.article_model.set_ids(self.store.by_category(category))
 
     def filter_by_keyword(self, keyword):
-        filtered = [a for a in self.articles if keyword in a.get('keywords', [])]
-        self.update_article_list(filtered)
+        self.article_model.set_ids(self.store.by_keyword(keyword))
         # DO NOT update categories here to maintain UX consistency.
 
-    def export_data(self):
+    def filter_by_trend(self, item):
+        # Trend terms are normalized (lowercased), so fall back to text search when the exact keyword misses.
+        term = item.data(Qt.UserRole)
+        self.article_model.set_ids(self.store.by_keyword(term) or self.store.search(term))
+
+    def filter_by_text(self, text):
+        self.article_model.set_ids(self.store.search(text))
+
+    @asyncSlot()
+    async def export_data(self):
+        if self.export_cancel is not None:
+            # While an export runs the button cancels it.
+            self.export_cancel.set()
+            return
         file_format = self.export_combo.currentText().lower()
         default_filename = f"news_export.{file_format}"
         filepath, _ = QFileDialog.getSaveFileName(self, "Save File", default_filename, f"{file_format.upper()} Files (*.{file_format});;All Files (*)")
 
-        if filepath:
-            current_articles_on_display = []
-            for i in range(self.article_list.count()):
-                title = self.article_list.item(i).text()
-                article = next((a for a in self.articles if a['title'] == title), None)
-                if article:
-                    current_articles_on_display.append(article)
-            
-            if not current_articles_on_display:
-                return
+        if not filepath or not self.article_model.rowCount():
+            return
+        # References to the records on display, taken now so a fetch or filter during the export can't change it.
+        articles = list(self.article_model.articles())
+        loop = asyncio.get_running_loop()
+        cancel = self.export_cancel = threading.Event()
+        self.export_button.setText("Cancel export")
+        self.export_progress.setRange(0, len(articles))
+        self.export_progress.setValue(0)
+        self.export_progress.setVisible(True)
 
-            if file_format == 'csv':
-                Exporters.to_csv(current_articles_on_display, filepath)
-            elif file_format == 'txt':
-                Exporters.to_txt(current_articles_on_display, filepath)
-            elif file_format == 'pdf':
-                Exporters.to_pdf(current_articles_on_display, filepath)
+        def progress(count):
+            # Called on the export thread.
+            loop.call_soon_threadsafe(self.export_progress.setValue, count)
+
+        # Large PDFs are split into volumes so the export never holds one huge document in memory.
+        options = {'articles_per_file': PDF_ARTICLES_PER_FILE} if file_format == 'pdf' else {}
+        try:
+            exported = await loop.run_in_executor(self.export_executor, functools.partial(
+                Exporters.export, articles, filepath, file_format, progress=progress, cancel=cancel, **options))
+        finally:
+            self.export_cancel = None
+            self.export_button.setText("Export")
+            self.export_progress.setVisible(False)
+        if not exported and not cancel.is_set():
+            QMessageBox.warning(self, "Export failed", f"Could not export to {filepath}; see the log for details.")
+        elif file_format == 'pdf' and exported > PDF_ARTICLES_PER_FILE:
+            root, ext = os.path.splitext(filepath)
+            volumes = -(-exported // PDF_ARTICLES_PER_FILE)
+            QMessageBox.information(self, "Export finished",
+                                    f"{exported} articles were saved in {volumes} files of up to "
+                                    f"{PDF_ARTICLES_PER_FILE}: {filepath}, {root}_2{ext}, ...")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,214 @@
+import bisect
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6, 1e7)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 1500, 2000, 4000, 8000, 16000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str] | None) -> LabelKey:
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_labels(key: LabelKey, extra: str = '') -> str:
+    parts = [f'{name}="{value}"' for name, value in key]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation (Prometheus-style estimate).
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'trace', 'labels', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str, trace: str | None, labels: Dict[str, str] | None):
+        self.metrics, self.name, self.trace, self.labels = metrics, name, trace, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record_span(self.name, self.start, time.perf_counter() - self.start, self.trace, self.labels)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """Counters, gauges, histograms and per-article trace spans for one process.
+
+    Disabled by default: every recording method returns on its first line
+    and span() hands back a shared no-op context manager, so instrumented
+    code costs one attribute check per call. The GUI and the headless
+    daemon (with --metrics-port/--metrics-file) call enable().
+    """
+
+    def __init__(self, enabled: bool = False, max_traces: int = 1000):
+        self.enabled = enabled
+        self.max_traces = max_traces
+        self.started = time.time()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        # trace id (article URL) -> [(span name, start offset s, duration s)], oldest evicted first.
+        self.traces: 'OrderedDict[str, List[Tuple[str, float, float]]]' = OrderedDict()
+        self._trace_starts: Dict[str, float] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def reset(self):
+        self.counters.clear()
+        self.gauges.clear()
+        self.histograms.clear()
+        self.traces.clear()
+        self._trace_starts.clear()
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, labels: Dict[str, str] | None = None):
+        if not self.enabled:
+            return
+        series = self.counters.setdefault(name, {})
+        key = _label_key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: Dict[str, str] | None = None):
+        if not self.enabled:
+            return
+        self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, labels: Dict[str, str] | None = None, buckets=LATENCY_BUCKETS):
+        if not self.enabled:
+            return
+        series = self.histograms.setdefault(name, {})
+        key = _label_key(labels)
+        if key not in series:
+            series[key] = Histogram(buckets)
+        series[key].observe(value)
+
+    def span(self, name: str, trace: str | None = None, labels: Dict[str, str] | None = None):
+        # with METRICS.span('fetch', trace=url, labels={'host': host}): ...
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, trace, labels)
+
+    def record_span(self, name: str, start: float, duration: float, trace: str | None = None,
+                    labels: Dict[str, str] | None = None):
+        self.observe(f'{name}_seconds', duration, labels)
+        if trace is None:
+            return
+        if trace not in self.traces:
+            self.traces[trace] = []
+            self._trace_starts[trace] = start
+            if len(self.traces) > self.max_traces:
+                evicted, _ = self.traces.popitem(last=False)
+                self._trace_starts.pop(evicted, None)
+        else:
+            self.traces.move_to_end(trace)
+        self.traces[trace].append((name, start - self._trace_starts[trace], duration))
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for name, series in sorted(self.counters.items()):
+            lines.append(f'# TYPE {name} counter')
+            lines.extend(f'{name}{_format_labels(key)} {value:g}' for key, value in series.items())
+        for name, series in sorted(self.gauges.items()):
+            lines.append(f'# TYPE {name} gauge')
+            lines.extend(f'{name}{_format_labels(key)} {value:g}' for key, value in series.items())
+        for name, series in sorted(self.histograms.items()):
+            lines.append(f'# TYPE {name} histogram')
+            for key, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float('inf') else f'le="{bound:g}"'
+                    lines.append(f'{name}_bucket{_format_labels(key, le)} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(key)} {histogram.sum:g}')
+                lines.append(f'{name}_count{_format_labels(key)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict:
+        def series(metric):
+            return [{'labels': dict(key), 'value': value} for key, value in metric.items()]
+
+        return {
+            'started': self.started,
+            'counters': {name: series(values) for name, values in self.counters.items()},
+            'gauges': {name: series(values) for name, values in self.gauges.items()},
+            'histograms': {name: [{'labels': dict(key), 'count': h.count, 'sum': h.sum,
+                                   'p50': h.quantile(0.5), 'p95': h.quantile(0.95)} for key, h in values.items()]
+                           for name, values in self.histograms.items()},
+            'traces': {trace: [{'span': name, 'offset': offset, 'duration': duration}
+                               for name, offset, duration in spans] for trace, spans in self.traces.items()},
+        }
+
+    def dump(self, path: str):
+        # *.json gets the full snapshot with traces; anything else the Prometheus text format
+        # (e.g. for node_exporter's textfile collector). Replaced atomically so readers never see half a file.
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=1)
+            else:
+                f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def total(self, name: str) -> float:
+        return sum(self.counters.get(name, {}).values())
+
+    def merged(self, name: str) -> Histogram | None:
+        # All label sets of one histogram folded together, e.g. fetch latency over every host.
+        series = self.histograms.get(name)
+        if not series:
+            return None
+        histograms = list(series.values())
+        merged = Histogram(histograms[0].buckets)
+        for histogram in histograms:
+            merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            merged.count += histogram.count
+            merged.sum += histogram.sum
+        return merged
+
+
+# Process-wide instance used by all instrumented modules.
+METRICS = Metrics()
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+DEFAULT_INDEX_PATH = os.path.join('.cache', 'near_dup.db')
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+
+def shingle_hashes(text: str, k: int = 5) -> np.ndarray:
+    # Hashes of character k-grams (these work for Korean, where word boundaries shift
+    # with particles), computed as a vectorized polynomial hash over code points.
+    text = re.sub(r'\s+', ' ', text).strip()
+    codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if not len(codepoints):
+        return codepoints  # no shingles, so signature() returns None instead of one shared hash
+    k = min(k, len(codepoints))
+    n = len(codepoints) - k + 1
+    hashes = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        hashes = hashes * _SHINGLE_BASE + codepoints[j:j + n]  # wraps mod 2^64
+    return np.unique(hashes)
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Multiply-shift hashing: ((a * x + b) mod 2^64) >> 32 with odd a, no modulo needed.
+        self.a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray | None:
+        hashes = shingle_hashes(text, self.shingle_size)
+        if not len(hashes):
+            return None
+        # In place: one (num_perm x shingles) buffer instead of three temporaries.
+        permuted = np.multiply.outer(self.a, hashes)
+        permuted += self.b[:, None]
+        permuted >>= np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    # Fraction of equal MinHash slots estimates the Jaccard similarity of the shingle sets.
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+class NearDupIndex:
+    """Persistent MinHash/LSH index for clustering near-duplicate articles.
+
+    Signatures are split into `bands` bands; articles sharing any band bucket
+    become candidates and are confirmed by estimated Jaccard >= `threshold`.
+    With the defaults (16 bands x 8 rows) pairs above ~0.7 similarity are
+    almost always caught while unrelated pairs are rarely compared.
+    """
+
+    def __init__(self, path: str = ':memory:', threshold: float = 0.8, num_perm: int = 128,
+                 bands: int = 16, max_age_days: float = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.hasher = MinHasher(num_perm)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_age_days = max_age_days
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS signatures ("
+            " id INTEGER PRIMARY KEY, url TEXT NOT NULL, sig BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL,"
+            " sig_id INTEGER NOT NULL, PRIMARY KEY (band, bucket, sig_id)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self.prune()
+
+    def _band_keys(self, sig: np.ndarray) -> List[Tuple[int, int]]:
+        keys = []
+        for band in range(self.bands):
+            chunk = sig[band * self.rows:(band + 1) * self.rows].tobytes()
+            keys.append((band, int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'little', signed=True)))
+        return keys
+
+    def query(self, sig: np.ndarray) -> Tuple[int, str, float] | None:
+        # Best match at or above the threshold, as (id, url, similarity).
+        candidates = set()
+        for band, bucket in self._band_keys(sig):
+            candidates.update(row[0] for row in self.conn.execute(
+                "SELECT sig_id FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+        best = None
+        for sig_id in candidates:
+            url, blob = self.conn.execute("SELECT url, sig FROM signatures WHERE id = ?", (sig_id,)).fetchone()
+            score = similarity(sig, np.frombuffer(blob, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best[2]):
+                best = (sig_id, url, score)
+        return best
+
+    def add(self, url: str, sig: np.ndarray) -> int:
+        sig_id = self.conn.execute(
+            "INSERT INTO signatures (url, sig, created_at) VALUES (?, ?, ?)", (url, sig.tobytes(), time.time())
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)",
+            [(band, bucket, sig_id) for band, bucket in self._band_keys(sig)],
+        )
+        return sig_id
+
+    def dedup(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep one representative per near-duplicate cluster.
+
+        Duplicates of an article in this batch are folded into its
+        'duplicate_urls'; duplicates of articles indexed by earlier runs are
+        dropped, since those were already analyzed.
+        """
+        representatives: Dict[int, Dict[str, Any]] = {}
+        unique = [article for article in articles if self.check(article, representatives)]
+        self.conn.commit()
+        return unique
+
+    def check(self, article: Dict[str, Any], representatives: Dict[int, Dict[str, Any]]) -> bool:
+        # One step of dedup() for streaming callers: True if the article is new and should be kept.
+        # `representatives` maps signature IDs to the articles kept so far in the same run.
+        sig = self.hasher.signature(article.get('content', ''))
+        if sig is None:
+            return True
+        match = self.query(sig)
+        if match is None:
+            representatives[self.add(article['url'], sig)] = article
+            return True
+        if match[1] == article['url']:
+            # Its own entry: the URL is refetched only on a revisit or after a run stopped before delivering it.
+            representatives[match[0]] = article
+            return True
+        if match[0] in representatives:
+            representatives[match[0]].setdefault('duplicate_urls', []).append(article['url'])
+        else:
+            logging.info(f"Skipping {article['url']}: near-duplicate of previously seen {match[1]}")
+        return False
+
+    def commit(self):
+        self.conn.commit()
+
+    def prune(self):
+        cutoff = time.time() - self.max_age_days * 86400
+        self.conn.execute("DELETE FROM buckets WHERE sig_id IN (SELECT id FROM signatures WHERE created_at < ?)", (cutoff,))
+        self.conn.execute("DELETE FROM signatures WHERE created_at < ?", (cutoff,))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
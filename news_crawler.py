@@ -1,103 +1,222 @@
 import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Tuple
+from urllib.parse import urlsplit
 import aiohttp
-from bs4 import BeautifulSoup
+
+from article_record import ArticleRecord
+from http_cache import HttpCache
+from metrics import BYTES_BUCKETS, METRICS
+from near_dup import NearDupIndex
+from parsing import ParserPool, detect_encoding, extract_article
+from pipeline import Pipeline
+from scheduler import CrawlScheduler
+from url_store import UrlStore, canonicalize_url
 
 # NOTE: CSS selectors are placeholders and must be adapted for each target website.
 # This is a simplified example.
+# poll_interval (seconds) is only used by the headless daemon.
+# 'feeds' (optional): RSS/Atom or sitemap URLs. When set, links come from the feeds instead of
+# scraping the section page, which is much cheaper. Article extraction rules live in site_adapters.json.
 SITE_CONFIG = {
     'https://news.naver.com/': {
-        'article_link_selector': 'a.sa_item_title'
+        'article_link_selector': 'a.sa_item_title',
+        'poll_interval': 300
     },
     'https://www.etnews.com/': {
-        'article_link_selector': 'a.list_news'
+        'article_link_selector': 'a.list_news',
+        'poll_interval': 600
     }
 }
 
+# Bodies are read in chunks and abandoned past max_body_bytes, so one huge page can't balloon memory.
+DEFAULT_MAX_BODY_BYTES = 5 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+# Anything else (PDFs, images, video) linked from a section page is skipped unread.
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+FEED_CONTENT_TYPES = ('application/rss+xml', 'application/atom+xml', 'application/xml', 'text/xml')
+
 class NewsCrawler:
-    def __init__(self):
-        self.processed_urls = set()
+    def __init__(self, scheduler: CrawlScheduler | None = None, url_store: UrlStore | None = None,
+                 revisit_after_hours: float | None = None, http_cache: HttpCache | None = None,
+                 parser: ParserPool | None = None, near_dup: NearDupIndex | None = None,
+                 max_body_bytes: int | None = DEFAULT_MAX_BODY_BYTES):
+        self.scheduler = scheduler or CrawlScheduler()
+        self.http_cache = http_cache
+        self.parser = parser or ParserPool()
+        self.near_dup = near_dup or NearDupIndex()
+        # Persistent dedup across runs; revisit_after_hours=None never refetches a stored URL.
+        self.url_store = url_store
+        # In-memory dedup only without a store; with one, the store (Bloom filter + SQLite) is the record.
+        self.processed_urls = set() if url_store is None else None
+        self.revisit_after_hours = revisit_after_hours
+        self.max_body_bytes = max_body_bytes  # None reads bodies of any size
 
-    async def fetch_page(self, session: aiohttp.ClientSession, url: str) -> str | None:
+    def _skip(self, url: str, reason: str, detail: str):
+        METRICS.inc('fetch_skipped_total', labels={'reason': reason})
+        logging.info(f"Skipping {url}: {detail}")
+
+    async def _read_body(self, url: str, response: aiohttp.ClientResponse,
+                         content_types: Tuple[str, ...]) -> Tuple[bytes, str] | None:
+        METRICS.inc('fetch_responses_total', labels={'status': str(response.status)})
+        if response.status == 304 and self.http_cache:
+            cached = self.http_cache.load(url)
+            if cached is None:
+                logging.warning(f"Got 304 for {url} but the cache entry is gone")
+                return None
+            return cached[0], detect_encoding(*cached)
+        response.raise_for_status()
+        if 'Content-Type' in response.headers and response.content_type not in content_types:
+            self._skip(url, 'content_type', f"unexpected content type {response.content_type}")
+            return None
+        limit = self.max_body_bytes
+        if limit is not None and (response.content_length or 0) > limit:
+            self._skip(url, 'too_large', f"Content-Length {response.content_length} exceeds {limit} bytes")
+            return None
+        chunks, size = [], 0
+        async for chunk in response.content.iter_chunked(READ_CHUNK_BYTES):
+            size += len(chunk)
+            if limit is not None and size > limit:
+                # Unsized or lying Content-Length: stop reading; the connection is dropped, not reused.
+                self._skip(url, 'too_large', f"body exceeds {limit} bytes")
+                return None
+            chunks.append(chunk)
+        body = b''.join(chunks)
+        del chunks
+        METRICS.observe('fetch_bytes', len(body), {'host': response.url.host or ''}, BYTES_BUCKETS)
+        METRICS.inc('fetch_bytes_total', len(body))
+        # Resolved here (header charset, else <meta charset>) so parsers never guess.
+        encoding = detect_encoding(body, response.charset)
+        if self.http_cache:
+            self.http_cache.store(url, response.headers, body, encoding)
+        return body, encoding
+
+    async def fetch_raw(self, session: aiohttp.ClientSession, url: str,
+                        content_types: Tuple[str, ...] = HTML_CONTENT_TYPES) -> Tuple[bytes, str] | None:
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        if self.http_cache:
+            headers.update(self.http_cache.conditional_headers(url))
+        host = urlsplit(url).hostname or ''
         try:
-            async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}) as response:
-                response.raise_for_status()
-                return await response.text()
-        except aiohttp.ClientError as e:
+            with METRICS.span('fetch', trace=url, labels={'host': host}):
+                return await self.scheduler.fetch(
+                    session, url, lambda response: self._read_body(url, response, content_types), headers=headers
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            METRICS.inc('fetch_errors_total', labels={'host': host})
             logging.error(f"Error fetching {url}: {e}")
             return None
 
+    async def fetch_page(self, session: aiohttp.ClientSession, url: str) -> str | None:
+        raw = await self.fetch_raw(session, url)
+        if raw is None:
+            return None
+        body, encoding = raw
+        return body.decode(encoding, errors='replace')
+
     def parse_article(self, html: str, url: str) -> Dict[str, Any] | None:
-        # This is a placeholder parsing logic. Real implementation needs specific selectors for each site.
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-            title = soup.find('h1') or soup.find('h2') or soup.find('h3')
-            content_body = soup.find('article') or soup.find('div', id='articleBodyContents') or soup.find('div', class_='article_body')
-            
-            if not title or not content_body:
-                logging.warning(f"Could not parse title/content for {url}")
-                return None
+        # Synchronous, in-process parse; the crawl itself goes through self.parser.
+        return extract_article(html.encode('utf-8'), url, self.parser.backend, 'utf-8')
 
-            title_text = title.get_text(strip=True)
-            content_text = '\n'.join(p.get_text(strip=True) for p in content_body.find_all('p'))
+    def needs_fetch(self, url: str) -> bool:
+        key = canonicalize_url(url)
+        if self.url_store is None:
+            return key not in self.processed_urls
+        return not self.url_store.is_fresh(key, self.revisit_after_hours)
 
-            return {
-                'title': title_text,
-                'content': content_text,
-                'url': url
-            }
-        except Exception as e:
-            logging.error(f"Error parsing article at {url}: {e}")
+    async def parse_raw(self, url: str, raw: Tuple[bytes, str]) -> ArticleRecord | None:
+        with METRICS.span('parse', trace=url):
+            article = await self.parser.extract_article(raw[0], url, raw[1])
+        if not article:
+            METRICS.inc('parse_failures_total')
+            logging.warning(f"Could not parse title/content for {url}")
             return None
+        return ArticleRecord.from_dict(article)
+
+    def mark_fetched(self, url: str):
+        # Called by whoever owns the article once it is delivered or checkpointed, not at parse time:
+        # a URL recorded before then would be lost for good if the run stopped in between.
+        key = canonicalize_url(url)
+        if self.url_store is None:
+            self.processed_urls.add(key)
+        else:
+            self.url_store.mark_fetched(key)
 
-    async def process_article_url(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any] | None:
-        if url in self.processed_urls:
+    async def process_article_url(self, session: aiohttp.ClientSession, url: str) -> ArticleRecord | None:
+        if not self.needs_fetch(url):
             return None
-        html = await self.fetch_page(session, url)
-        if html:
-            article = self.parse_article(html, url)
-            if article:
-                self.processed_urls.add(url)
-                return article
-        return None
-
-    async def crawl_site(self, session: aiohttp.ClientSession, site_url: str, config: Dict) -> List[Dict[str, Any]]:
-        logging.info(f"Crawling main page: {site_url}")
-        main_html = await self.fetch_page(session, site_url)
-        if not main_html:
-            return []
+        raw = await self.fetch_raw(session, url)
+        return await self.parse_raw(url, raw) if raw else None
+
+    async def discover_feed_links(self, session: aiohttp.ClientSession, feeds: List[str]) -> List[str]:
+        async def read_feed(feed_url: str, follow_nested: bool) -> List[str]:
+            raw = await self.fetch_raw(session, feed_url, FEED_CONTENT_TYPES)
+            if not raw:
+                return []
+            try:
+                links, nested = await self.parser.extract_feed_links(raw[0])
+            except Exception as e:
+                logging.error(f"Error reading feed {feed_url}: {e}")
+                return []
+            if nested and follow_nested:
+                # Sitemap index: one level of child sitemaps.
+                for result in await asyncio.gather(*(read_feed(url, False) for url in nested)):
+                    links.extend(result)
+            return links
+
+        results = await asyncio.gather(*(read_feed(feed_url, True) for feed_url in feeds))
+        return [link for result in results for link in result]
 
-        soup = BeautifulSoup(main_html, 'html.parser')
-        article_links = set()
-        for link in soup.select(config['article_link_selector']):
-            href = link.get('href')
-            if href and href.startswith('http'):
-                article_links.add(href)
-            elif href:
-                from urllib.parse import urljoin
-                article_links.add(urljoin(site_url, href))
+    async def discover_links(self, session: aiohttp.ClientSession, site_url: str, config: Dict) -> List[str]:
+        if config.get('feeds'):
+            logging.info(f"Reading feeds for {site_url}")
+            links = await self.discover_feed_links(session, config['feeds'])
+        else:
+            logging.info(f"Crawling main page: {site_url}")
+            raw = await self.fetch_raw(session, site_url)
+            if not raw:
+                return []
 
+            try:
+                links = await self.parser.extract_links(raw[0], config['article_link_selector'], site_url, raw[1])
+            except Exception as e:
+                logging.error(f"Error extracting links from {site_url}: {e}")
+                return []
+        article_links = {}
+        for href in links:
+            try:
+                key = canonicalize_url(href)
+            except ValueError as e:
+                # e.g. a non-numeric or out-of-range port, or a broken IPv6 host
+                self._skip(href, 'bad_url', str(e))
+                continue
+            article_links.setdefault(key, href)
+
+        if not article_links:
+            logging.warning(f"No article links found for {site_url}")
+        return list(article_links.values())
+
+    async def crawl_site(self, session: aiohttp.ClientSession, site_url: str, config: Dict) -> List[ArticleRecord]:
+        # The caller marks the returned articles fetched once it has kept them somewhere safe.
+        article_links = await self.discover_links(session, site_url, config)
         if not article_links:
-            logging.warning(f"No article links found on {site_url} with selector '{config['article_link_selector']}'")
             return []
         
         logging.info(f"Found {len(article_links)} article links. Processing in parallel...")
         
+        # Concurrency is bounded by the scheduler, not by the number of tasks.
         tasks = [self.process_article_url(session, url) for url in article_links]
         results = await asyncio.gather(*tasks)
         
         return [article for article in results if article]
 
-    async def crawl(self) -> List[Dict[str, Any]]:
-        all_articles = []
-        async with aiohttp.ClientSession() as session:
-            tasks = [self.crawl_site(session, site, config) for site, config in SITE_CONFIG.items()]
-            site_results = await asyncio.gather(*tasks)
-            for result in site_results:
-                all_articles.extend(result)
-        
-        # Simple duplication check based on title
-        unique_articles = {article['title']: article for article in all_articles}.values()
+    def crawl_stream(self, sites: Dict[str, Dict] | None = None,
+                     session: aiohttp.ClientSession | None = None) -> AsyncIterator[ArticleRecord]:
+        # Yields each unique article as soon as it is parsed, instead of after every site has finished.
+        return Pipeline(self, sites or SITE_CONFIG).run(session)
+
+    async def crawl(self) -> List[ArticleRecord]:
+        # Near-duplicate clustering on content; syndicated copies ride along as 'duplicate_urls'.
+        unique_articles = [article async for article in self.crawl_stream()]
         logging.info(f"Crawling finished. Found {len(unique_articles)} unique articles.")
-        return list(unique_articles)
+        return unique_articles
@@ -0,0 +1,357 @@
+import asyncio
+import codecs
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urljoin
+from xml.etree import ElementTree
+from bs4 import BeautifulSoup
+
+from site_adapters import DEFAULT_ADAPTERS_PATH, Rule, SiteAdapter, load_registry
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:  # optional, faster backend
+    SelectolaxParser = None
+
+try:
+    import lxml.html
+    import lxml.etree
+except ImportError:  # optional, faster backend
+    lxml = None
+
+try:
+    from lxml.cssselect import CSSSelector
+except ImportError:  # lxml without cssselect: selectors go through BeautifulSoup's lxml builder
+    CSSSelector = None
+
+# Fastest first; html.parser ships with Python and is always available.
+BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+# Generic extractor tuning.
+NON_CONTENT_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form']
+BLOCK_TAGS = ['p', 'div']
+MIN_BLOCK_CHARS = 25
+TITLE_SITE_SUFFIX = re.compile(r'\s+[-|:]\s+[^-|:]+$')
+AUTHOR_SUFFIX = re.compile(r'\s*(기자|특파원|통신원)$')
+EMAIL = re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+')
+
+# Where a <meta charset> / http-equiv declaration must appear per the HTML spec.
+META_SNIFF_BYTES = 1024
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+# Labels browsers decode with a superset codec; Korean portals that say euc-kr often send cp949 characters.
+ENCODING_ALIASES = {'euc-kr': 'cp949', 'ks_c_5601-1987': 'cp949', 'iso-8859-1': 'cp1252', 'us-ascii': 'cp1252'}
+
+
+def _normalize_encoding(label: str | None) -> str | None:
+    if not label:
+        return None
+    label = label.strip().lower()
+    label = ENCODING_ALIASES.get(label, label)
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def detect_encoding(body: bytes, declared: str | None = None) -> str:
+    """Encoding to decode `body` with: BOM, then the Content-Type charset, then <meta charset>, then UTF-8.
+
+    Resolved once per response, so parsers never run their own (slower and
+    occasionally wrong) detection and cached bodies decode the same way.
+    """
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding
+    encoding = _normalize_encoding(declared)
+    if encoding:
+        return encoding
+    match = META_CHARSET.search(body, 0, META_SNIFF_BYTES)
+    if match:
+        encoding = _normalize_encoding(match.group(1).decode('ascii', 'ignore'))
+    return encoding or 'utf-8'
+
+
+def available_backends() -> List[str]:
+    available = []
+    if SelectolaxParser is not None:
+        available.append('selectolax')
+    if lxml is not None:
+        available.append('lxml')
+    available.append('html.parser')
+    return available
+
+
+def resolve_backend(backend: str | None = None) -> str:
+    available = available_backends()
+    if backend is None:
+        return available[0]
+    if backend not in available:
+        logging.warning(f"Parser backend '{backend}' is not installed, falling back to html.parser")
+        return 'html.parser'
+    return backend
+
+
+@lru_cache(maxsize=128)
+def _css(selector: str):
+    return CSSSelector(selector)
+
+
+def _lxml_doc(html: bytes, encoding: str | None):
+    parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+    return lxml.html.document_fromstring(html, parser=parser)
+
+
+def _stripped_text(strings) -> str:
+    # Same result as BeautifulSoup's get_text(strip=True).
+    return ''.join(s.strip() for s in strings if s and s.strip())
+
+
+def extract_links(html: bytes, selector: str, base_url: str, backend: str = 'html.parser',
+                  encoding: str | None = None) -> List[str]:
+    if backend == 'selectolax':
+        tree = SelectolaxParser(html.decode(encoding, errors='replace')) if encoding else SelectolaxParser(html)
+        hrefs = [node.attributes.get('href') for node in tree.css(selector)]
+    elif backend == 'lxml' and CSSSelector is not None:
+        hrefs = [node.get('href') for node in _css(selector)(_lxml_doc(html, encoding))]
+    else:
+        builder = 'lxml' if backend == 'lxml' else 'html.parser'
+        soup = BeautifulSoup(html, builder, from_encoding=encoding)
+        hrefs = [link.get('href') for link in soup.select(selector)]
+    return [href if href.startswith('http') else urljoin(base_url, href) for href in hrefs if href]
+
+
+def _parse(html: bytes, backend: str, encoding: str | None):
+    # (kind, root) for the requested backend; lxml without cssselect goes through BeautifulSoup.
+    if backend == 'selectolax':
+        return 'selectolax', SelectolaxParser(html.decode(encoding, errors='replace')) if encoding else SelectolaxParser(html)
+    if backend == 'lxml' and CSSSelector is not None:
+        return 'lxml', _lxml_doc(html, encoding)
+    return 'soup', BeautifulSoup(html, 'lxml' if backend == 'lxml' else 'html.parser', from_encoding=encoding)
+
+
+def _select(kind: str, node, selector: str) -> list:
+    if kind == 'selectolax':
+        return node.css(selector)
+    if kind == 'lxml':
+        return _css(selector)(node)
+    return node.select(selector)
+
+
+def _text(kind: str, node) -> str:
+    if kind == 'selectolax':
+        return node.text(strip=True)
+    if kind == 'lxml':
+        return _stripped_text(node.itertext())
+    return node.get_text(strip=True)
+
+
+def _text_lines(kind: str, node) -> List[str]:
+    # Each text node on its own line, e.g. the lines of a <br>-separated body.
+    if kind == 'selectolax':
+        return [line for line in node.text(separator='\n', strip=True).split('\n') if line]
+    strings = node.itertext() if kind == 'lxml' else node.stripped_strings
+    return [text.strip() for text in strings if text.strip()]
+
+
+def _attr(kind: str, node, name: str) -> str | None:
+    return node.attributes.get(name) if kind == 'selectolax' else node.get(name)
+
+
+def _first_value(kind: str, root, rules: List[Rule]) -> str | None:
+    for selector, attr in rules:
+        for node in _select(kind, root, selector):
+            value = _attr(kind, node, attr) if attr else _text(kind, node)
+            if value and value.strip():
+                return value.strip()
+    return None
+
+
+def _clean_author(author: str | None) -> str | None:
+    if not author:
+        return None
+    return AUTHOR_SUFFIX.sub('', EMAIL.sub('', author)).strip() or None
+
+
+def extract_with_adapter(html: bytes, url: str, adapter: SiteAdapter, backend: str = 'html.parser',
+                         encoding: str | None = None) -> Dict[str, Any] | None:
+    kind, root = _parse(html, backend, encoding)
+    title = _first_value(kind, root, adapter.rules['title'])
+    body = next((nodes[0] for nodes in (_select(kind, root, selector) for selector, _ in adapter.rules['body']) if nodes), None)
+    if not title or body is None:
+        return None
+    paragraphs = [text for text in (_text(kind, p) for selector, _ in adapter.rules['paragraphs']
+                                    for p in _select(kind, body, selector)) if text]
+    if not paragraphs:
+        # e.g. a <br>-separated body with no <p>s; with no text at all the generic extractor gets a try
+        paragraphs = _text_lines(kind, body)
+        if not paragraphs:
+            return None
+    return {
+        'title': title,
+        'content': '\n'.join(paragraphs),
+        'url': url,
+        'date': _first_value(kind, root, adapter.rules['date']),
+        'author': _clean_author(_first_value(kind, root, adapter.rules['author'])),
+    }
+
+
+def _best_container(blocks, text_of, link_text_of, parent_of):
+    # Scores leaf text blocks and returns the parent collecting the most non-link text.
+    scores: Dict[int, float] = {}
+    containers: Dict[int, Any] = {}
+    for block in blocks:
+        text = text_of(block)
+        score = len(text) - 2 * link_text_of(block)
+        if len(text) < MIN_BLOCK_CHARS or score <= 0:
+            continue
+        parent = parent_of(block)
+        scores[id(parent)] = scores.get(id(parent), 0) + score
+        containers[id(parent)] = parent
+    return containers[max(scores, key=scores.get)] if scores else None
+
+
+def extract_generic(html: bytes, url: str, encoding: str | None = None) -> Dict[str, Any] | None:
+    """Readability-style fallback for sites without an adapter.
+
+    Every leaf text block (a <p> or <div> with no block children) scores its
+    text length minus link text, credited to its parent; the parent with the
+    highest total is taken as the article body. Navigation, sidebars and
+    footers lose because they are mostly links or short lines. Uses lxml when
+    installed, BeautifulSoup otherwise.
+    """
+    if lxml is not None:
+        doc = _lxml_doc(html, encoding)
+        for node in doc.xpath(' | '.join(f'//{tag}' for tag in NON_CONTENT_TAGS)):
+            node.drop_tree()
+        leaves = [n for n in doc.iter(*BLOCK_TAGS) if not any(True for _ in n.iterdescendants(*BLOCK_TAGS))]
+        body = _best_container(leaves, lambda n: _stripped_text(n.itertext()),
+                               lambda n: sum(len(_stripped_text(a.itertext())) for a in n.iter('a')),
+                               lambda n: n.getparent())
+        if body is None:
+            return None
+        paragraphs = [_stripped_text(n.itertext()) for n in leaves if n.getparent() is body]
+        meta = lambda attr, value: next(iter(doc.xpath(f'//meta[@{attr}="{value}"]/@content')), None)
+        headings = [_stripped_text(n.itertext()) for n in doc.xpath('//h1 | //h2 | //h3')]
+        page_title = doc.findtext('.//title')
+        time_attr = next(iter(doc.xpath('//time/@datetime')), None)
+    else:
+        soup = BeautifulSoup(html, 'html.parser', from_encoding=encoding)
+        for tag in soup(NON_CONTENT_TAGS):
+            tag.decompose()
+        leaves = [n for n in soup.find_all(BLOCK_TAGS) if not n.find(BLOCK_TAGS)]
+        body = _best_container(leaves, lambda n: n.get_text(strip=True),
+                               lambda n: sum(len(a.get_text(strip=True)) for a in n.find_all('a')),
+                               lambda n: n.parent)
+        if body is None:
+            return None
+        paragraphs = [n.get_text(strip=True) for n in leaves if n.parent is body]
+        meta = lambda attr, value: (soup.find('meta', attrs={attr: value}) or {}).get('content')
+        headings = [n.get_text(strip=True) for n in soup.find_all(['h1', 'h2', 'h3'])]
+        page_title = soup.title.string if soup.title else None
+        time_attr = (soup.find('time', datetime=True) or {}).get('datetime')
+
+    title = (meta('property', 'og:title') or next(filter(None, headings), None)
+             or TITLE_SITE_SUFFIX.sub('', (page_title or '').strip()))
+    if not title:
+        return None
+    return {
+        'title': title.strip(),
+        'content': '\n'.join(p for p in paragraphs if p),
+        'url': url,
+        'date': meta('property', 'article:published_time') or time_attr,
+        'author': _clean_author(meta('name', 'author') or meta('property', 'article:author')),
+    }
+
+
+def extract_article(html: bytes, url: str, backend: str = 'html.parser', encoding: str | None = None,
+                    adapters_path: str = DEFAULT_ADAPTERS_PATH) -> Dict[str, Any] | None:
+    # The site's adapter when there is one; the generic extractor for unknown sites or when the rules miss.
+    try:
+        adapter = load_registry(adapters_path).for_url(url)
+        if adapter:
+            article = extract_with_adapter(html, url, adapter, backend, encoding)
+            if article:
+                return article
+            logging.warning(f"Site adapter '{adapter.name}' did not match {url}; trying the generic extractor")
+        return extract_generic(html, url, encoding)
+    except Exception as e:
+        logging.error(f"Error parsing article at {url}: {e}")
+        return None
+
+
+def extract_feed_links(xml: bytes) -> Tuple[List[str], List[str]]:
+    """Links from an RSS/Atom feed or an XML sitemap, as (article_links, nested_feeds).
+
+    Sitemap indexes list further sitemaps rather than articles; those come
+    back in nested_feeds. Feeds come off the network, so entities are never
+    expanded and nothing external is loaded: lxml is told not to, and the
+    ElementTree fallback refuses documents that declare entities at all.
+    """
+    if lxml is not None:
+        parser = lxml.etree.XMLParser(resolve_entities=False, no_network=True, load_dtd=False, huge_tree=False)
+        root = lxml.etree.fromstring(xml, parser)
+    else:
+        if b'<!ENTITY' in xml:
+            raise ValueError("XML declaring entities is not accepted")
+        root = ElementTree.fromstring(xml)
+    links, nested = [], []
+    for node in root.iter():
+        if not isinstance(node.tag, str):
+            continue  # lxml comments, processing instructions and unexpanded entities
+        tag = node.tag.rsplit('}', 1)[-1]
+        if tag in ('item', 'url', 'sitemap'):
+            child = next((c for c in node if isinstance(c.tag, str) and c.tag.rsplit('}', 1)[-1] in ('link', 'loc')),
+                         None)
+            if child is not None and child.text and child.text.strip():
+                (nested if tag == 'sitemap' else links).append(child.text.strip())
+        elif tag == 'entry':
+            # Atom: <link rel="alternate" href="..."/>, rel defaults to alternate.
+            for child in node:
+                if not isinstance(child.tag, str) or child.tag.rsplit('}', 1)[-1] != 'link':
+                    continue
+                if child.get('rel', 'alternate') == 'alternate' and child.get('href'):
+                    links.append(child.get('href'))
+                    break
+    return links, nested
+
+
+class ParserPool:
+    """Runs HTML parsing in worker processes so it never blocks the event loop.
+
+    Only the raw body bytes go in and a small dict (or list of links) comes
+    back. `workers=0` parses inline, which is mostly useful for benchmarks.
+    """
+
+    def __init__(self, workers: int | None = None, backend: str | None = None,
+                 adapters_path: str = DEFAULT_ADAPTERS_PATH):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.backend = resolve_backend(backend)
+        self.adapters_path = adapters_path
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def _run(self, func, *args):
+        if self.workers == 0:
+            return func(*args)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def extract_links(self, html: bytes, selector: str, base_url: str, encoding: str | None = None) -> List[str]:
+        return await self._run(extract_links, html, selector, base_url, self.backend, encoding)
+
+    async def extract_article(self, html: bytes, url: str, encoding: str | None = None) -> Dict[str, Any] | None:
+        return await self._run(extract_article, html, url, self.backend, encoding, self.adapters_path)
+
+    async def extract_feed_links(self, xml: bytes) -> Tuple[List[str], List[str]]:
+        return await self._run(extract_feed_links, xml)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
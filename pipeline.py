@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict
+
+import aiohttp
+
+from article_record import ArticleRecord
+from metrics import METRICS
+from url_store import canonicalize_url
+
+if TYPE_CHECKING:
+    from llm_handler import LLMHandler
+    from news_crawler import NewsCrawler
+
+# End-of-input marker; upstream sends one per downstream worker.
+DONE = object()
+
+
+class Pipeline:
+    """Streaming crawl: discovery -> fetch -> parse -> dedup -> LLM -> output.
+
+    Stages are connected by bounded queues, so a slow stage holds back the
+    ones before it instead of letting pages pile up in memory, and the first
+    analyzed article comes out while other links are still being fetched.
+    Dedup runs in a single worker because the index is stateful; a near-duplicate
+    that arrives after its representative was yielded is still appended to
+    that article's 'duplicate_urls'.
+    """
+
+    def __init__(self, crawler: 'NewsCrawler', sites: Dict[str, Dict], llm_handler: 'LLMHandler | None' = None,
+                 fetch_workers: int = 32, parse_workers: int | None = None, llm_workers: int = 8,
+                 queue_size: int = 64, keep_content: bool = False):
+        self.crawler = crawler
+        self.sites = sites
+        self.llm_handler = llm_handler
+        # Fetch concurrency is still capped per host by the crawler's scheduler.
+        self.fetch_workers = fetch_workers
+        # One parse in flight per pool process keeps them all busy without queueing HTML in the pool.
+        self.parse_workers = parse_workers or max(1, crawler.parser.workers)
+        self.llm_workers = llm_workers
+        self.queue_size = queue_size
+        # Analyzed articles drop their full text unless asked to keep it; nothing downstream reads it.
+        self.keep_content = keep_content
+
+    async def _stage(self, name: str, inbox: asyncio.Queue, outbox: asyncio.Queue,
+                     handler: Callable[[Any], Awaitable[Any]], workers: int, downstream_workers: int):
+        async def worker():
+            while True:
+                item = await inbox.get()
+                # Sampled per item: a full inbox means this stage is the bottleneck.
+                METRICS.set_gauge('pipeline_queue_depth', 0 if item is DONE else inbox.qsize(), {'stage': name})
+                if item is DONE:
+                    return
+                try:
+                    result = await handler(item)
+                except Exception as e:
+                    logging.error(f"Pipeline {name} stage failed: {e}")
+                    continue
+                METRICS.inc('pipeline_items_total',
+                            labels={'stage': name, 'result': 'passed' if result is not None else 'dropped'})
+                if result is not None:
+                    await outbox.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        for _ in range(downstream_workers):
+            await outbox.put(DONE)
+
+    async def _discover(self, session: aiohttp.ClientSession, outbox: asyncio.Queue):
+        seen = set()
+
+        async def discover_site(site_url: str, config: Dict):
+            links = await self.crawler.discover_links(session, site_url, config)
+            logging.info(f"Found {len(links)} article links on {site_url}")
+            for url in links:
+                key = canonicalize_url(url)
+                # Sites may link the same story; only the first link is fetched.
+                if key not in seen and self.crawler.needs_fetch(url):
+                    seen.add(key)
+                    await outbox.put(url)
+
+        results = await asyncio.gather(*(discover_site(site, config) for site, config in self.sites.items()),
+                                       return_exceptions=True)
+        for site_url, result in zip(self.sites, results):
+            if isinstance(result, Exception):
+                logging.error(f"Link discovery failed for {site_url}: {result}")
+        for _ in range(self.fetch_workers):
+            await outbox.put(DONE)
+
+    async def run(self, session: aiohttp.ClientSession | None = None) -> AsyncIterator[ArticleRecord]:
+        # Not a nested generator: on an early break everything below must be torn down together.
+        own_session = session is None
+        if own_session:
+            session = self.crawler.scheduler.make_session()
+        urls, pages, parsed, unique, results = (asyncio.Queue(self.queue_size) for _ in range(5))
+        representatives: Dict[int, ArticleRecord] = {}
+
+        async def fetch(url):
+            raw = await self.crawler.fetch_raw(session, url)
+            return (url, raw) if raw else None
+
+        async def parse(item):
+            return await self.crawler.parse_raw(*item)
+
+        async def dedup(article):
+            with METRICS.span('dedup', trace=article['url']):
+                if self.crawler.near_dup.check(article, representatives):
+                    return article
+            # A dropped near-duplicate is done with; kept articles are marked fetched when yielded.
+            self.crawler.mark_fetched(article['url'])
+            return None
+
+        async def analyze(article):
+            with METRICS.span('analyze', trace=article['url']):
+                article.update(await self.llm_handler.analyze_article(article['content']))
+            if not self.keep_content:
+                article.release_content()
+            return article
+
+        stages = [
+            self._discover(session, urls),
+            self._stage('fetch', urls, pages, fetch, self.fetch_workers, self.parse_workers),
+            self._stage('parse', pages, parsed, parse, self.parse_workers, 1),
+        ]
+        if self.llm_handler is None:
+            stages.append(self._stage('dedup', parsed, results, dedup, 1, 1))
+        else:
+            stages.append(self._stage('dedup', parsed, unique, dedup, 1, self.llm_workers))
+            stages.append(self._stage('llm', unique, results, analyze, self.llm_workers, 1))
+
+        tasks = [asyncio.create_task(stage) for stage in stages]
+        try:
+            while True:
+                article = await results.get()
+                if article is DONE:
+                    break
+                # Not at parse time: a URL marked before its article is handed over would be lost if the run stopped.
+                self.crawler.mark_fetched(article['url'])
+                yield article
+        finally:
+            # Also reached when the consumer stops early: tear down every stage.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.crawler.near_dup.commit()
+            if own_session:
+                await session.close()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+from urllib.parse import urlsplit
+import aiohttp
+
+# Responses worth retrying: throttling and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        # rate = tokens per second; capacity = burst size
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        # A request larger than the burst size waits for a full bucket instead of forever.
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class CrawlScheduler:
+    """Bounds how hard the crawler hits the network.
+
+    Every fetch takes a per-host slot, a per-host token and then a global
+    slot before it goes out. 429/5xx responses and connection errors are retried
+    with jittered exponential backoff, honouring Retry-After when present.
+    """
+
+    def __init__(self, max_concurrency: int = 20, per_host_concurrency: int = 4,
+                 per_host_rate: float = 5.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 timeout: float = 20.0):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate  # requests/sec per host, 0 disables
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_buckets: Dict[str, TokenBucket] = {}
+
+    def make_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host_concurrency,
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+            enable_cleanup_closed=True,
+        )
+
+    def make_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            connector=self.make_connector(),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = (urlsplit(url).hostname or '').lower()
+        host_slot = self._host_slots.get(host)
+        if host_slot is None:
+            host_slot = self._host_slots[host] = asyncio.Semaphore(self.per_host_concurrency)
+            if self.per_host_rate > 0:
+                self._host_buckets[host] = TokenBucket(self.per_host_rate)
+        # Host slot and rate token first: a request queued behind a busy host must not hold a global slot
+        # that another host's request could be using.
+        async with host_slot:
+            bucket = self._host_buckets.get(host)
+            if bucket:
+                await bucket.acquire()
+            async with self._global:
+                yield
+
+    def backoff_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        # "Full jitter": uniform over [0, base * 2^attempt], capped.
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+            except ValueError:
+                pass  # HTTP-date form; the jittered delay is good enough
+        return delay
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str,
+                    handler: Callable[[aiohttp.ClientResponse], Awaitable[Any]], **kwargs) -> Any:
+        """GET `url` under the scheduler's limits and return `await handler(response)`.
+
+        The final attempt's response is always passed to the handler, so a
+        persistent 429/5xx surfaces through the handler's own status check.
+        """
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            async with self.slot(url):
+                try:
+                    async with session.get(url, **kwargs) as response:
+                        if response.status not in RETRY_STATUSES or last_attempt:
+                            return await handler(response)
+                        delay = self.backoff_delay(attempt, response.headers.get('Retry-After'))
+                        logging.warning(f"{url} returned {response.status}, retrying in {delay:.2f}s")
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if last_attempt:
+                        raise
+                    delay = self.backoff_delay(attempt)
+                    logging.warning(f"{url} failed ({e!r}), retrying in {delay:.2f}s")
+            # Sleep outside the slot so a backing-off request doesn't hold capacity.
+            await asyncio.sleep(delay)
@@ -0,0 +1,75 @@
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+try:
+    from cssselect import GenericTranslator, SelectorError
+except ImportError:  # optional; selectors are then only checked when first used
+    GenericTranslator = None
+
+DEFAULT_ADAPTERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'site_adapters.json')
+FIELDS = ('title', 'body', 'paragraphs', 'date', 'author')
+
+# A rule is a CSS selector, optionally followed by "@attribute" to read an attribute instead
+# of the text, e.g. "time@datetime". A field may list several rules; the first match wins.
+Rule = Tuple[str, str | None]
+
+
+def parse_rule(rule: str) -> Rule:
+    selector, _, attr = rule.rpartition('@') if '@' in rule else (rule, '', '')
+    return selector.strip(), attr.strip() or None
+
+
+class SiteAdapter:
+    """Extraction rules for one site, matched to article URLs by domain.
+
+    Rules are parsed (and, with cssselect installed, validated) once when
+    the config is loaded, so a typo fails at startup instead of silently on
+    every page.
+    """
+
+    def __init__(self, name: str, domains: List[str], title, body, paragraphs='p', date=None, author=None):
+        self.name = name
+        self.domains = [domain.lower() for domain in domains]
+        self.rules: Dict[str, List[Rule]] = {}
+        for field, value in zip(FIELDS, (title, body, paragraphs, date, author)):
+            rules = [value] if isinstance(value, str) else list(value or [])
+            self.rules[field] = [parse_rule(rule) for rule in rules]
+            for selector, _ in self.rules[field]:
+                if GenericTranslator is not None:
+                    try:
+                        GenericTranslator().css_to_xpath(selector)
+                    except SelectorError as e:
+                        raise ValueError(f"Site adapter '{name}': invalid {field} selector '{selector}': {e}")
+        if not self.rules['title'] or not self.rules['body']:
+            raise ValueError(f"Site adapter '{name}' needs at least a title and a body rule")
+
+    def matches(self, host: str) -> bool:
+        return any(host == domain or host.endswith('.' + domain) for domain in self.domains)
+
+
+class SiteAdapterRegistry:
+    def __init__(self, adapters: List[SiteAdapter] | None = None):
+        self.adapters = adapters or []
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_ADAPTERS_PATH) -> 'SiteAdapterRegistry':
+        if not os.path.exists(path):
+            logging.warning(f"Site adapter config {path} not found; every site uses the generic extractor")
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        return cls([SiteAdapter(name, **rules) for name, rules in config.items()])
+
+    def for_url(self, url: str) -> SiteAdapter | None:
+        host = (urlsplit(url).hostname or '').lower()
+        return next((adapter for adapter in self.adapters if adapter.matches(host)), None)
+
+
+@lru_cache(maxsize=8)
+def load_registry(path: str = DEFAULT_ADAPTERS_PATH) -> SiteAdapterRegistry:
+    # Cached per process, so parser pool workers read the config once rather than per page.
+    return SiteAdapterRegistry.load(path)
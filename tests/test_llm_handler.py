@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import openai
+
+from llm_cache import LLMCache
+from llm_handler import CATEGORIES, LLMHandler
+
+ARTICLE = "정부는 오늘 반도체 산업 지원 방안을 발표했다. " * 5
+
+
+class FakeClassifier:
+    def __init__(self, label: str, confidence: float):
+        self.label = label
+        self.confidence = confidence
+
+    def predict(self, texts):
+        return [(self.label, self.confidence) for _ in texts]
+
+
+class FakeCompletions:
+    # Records every prompt and answers like the model would for the keys it was asked for,
+    # after raising each of `failures` and sending each of `replies` in turn.
+    def __init__(self, failures=(), replies=()):
+        self.prompts = []
+        self.failures = list(failures)
+        self.replies = list(replies)
+
+    async def create(self, model, messages, **kwargs):
+        prompt = messages[0]['content']
+        self.prompts.append(prompt)
+        if self.failures:
+            raise self.failures.pop(0)
+        if self.replies:
+            content = self.replies.pop(0)
+        else:
+            reply = {'summary': "요약입니다.", 'keywords': ["반도체", "정부"]}
+            if '"category"' in prompt:
+                reply['category'] = CATEGORIES[2]
+            content = json.dumps(reply, ensure_ascii=False)
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def api_error(cls, **attrs) -> openai.OpenAIError:
+    # Built without __init__, which wants the SDK's HTTP request/response objects.
+    error = cls.__new__(cls)
+    error.__dict__.update(attrs)
+    return error
+
+
+def status_error(status: int) -> openai.APIStatusError:
+    return api_error(openai.APIStatusError, status_code=status, response=None)
+
+
+class HandlerTestCase(unittest.IsolatedAsyncioTestCase):
+    def make_handler(self, classifier=None, failures=(), replies=(), cache=None) -> LLMHandler:
+        os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+        handler = LLMHandler(classifier=classifier, cache=cache)
+        self.completions = FakeCompletions(failures, replies)
+        handler.client = SimpleNamespace(chat=SimpleNamespace(completions=self.completions))
+        return handler
+
+
+class AnalyzeArticleTest(HandlerTestCase):
+    async def test_confident_classifier_skips_category_request(self):
+        handler = self.make_handler(FakeClassifier(CATEGORIES[0], 0.95))
+        result = await handler.analyze_article(ARTICLE)
+        self.assertEqual(result['category'], CATEGORIES[0])
+        self.assertEqual(result['keywords'], ["반도체", "정부"])
+        self.assertEqual(len(self.completions.prompts), 1)
+        self.assertNotIn('"category"', self.completions.prompts[0])
+
+    async def test_unsure_classifier_escalates_to_llm(self):
+        handler = self.make_handler(FakeClassifier(CATEGORIES[0], 0.3))
+        result = await handler.analyze_article(ARTICLE)
+        self.assertEqual(result['category'], CATEGORIES[2])
+        self.assertIn('"category"', self.completions.prompts[0])
+
+    async def test_without_classifier_llm_decides(self):
+        handler = self.make_handler()
+        result = await handler.analyze_article(ARTICLE)
+        self.assertEqual(result['category'], CATEGORIES[2])
+        self.assertIn('"category"', self.completions.prompts[0])
+
+
+class CacheTest(HandlerTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LLMCache(os.path.join(self.tmp.name, 'llm_cache.db'))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    async def test_valid_analysis_is_cached(self):
+        handler = self.make_handler(cache=self.cache)
+        first = await handler.analyze_article(ARTICLE)
+        second = await handler.analyze_article(ARTICLE)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.completions.prompts), 1)
+
+    async def test_invalid_reply_is_not_cached(self):
+        handler = self.make_handler(cache=self.cache, replies=['{"summary": ""}'])
+        result = await handler.analyze_article(ARTICLE)
+        self.assertEqual(result['summary'], "Summary not available.")
+        result = await handler.analyze_article(ARTICLE)
+        self.assertEqual(result['summary'], "요약입니다.")
+        self.assertEqual(len(self.completions.prompts), 2)
+
+    async def test_unknown_category_is_not_cached(self):
+        handler = self.make_handler(cache=self.cache, replies=["스포츠", CATEGORIES[1]])
+        self.assertEqual(await handler.classify_category(ARTICLE), "기타")
+        self.assertEqual(await handler.classify_category(ARTICLE), CATEGORIES[1])
+        self.assertEqual(len(self.completions.prompts), 2)
+
+
+@mock.patch('llm_handler.random.uniform', return_value=0.0)
+class RetryTest(HandlerTestCase):
+    async def test_server_errors_and_timeouts_are_retried(self, _):
+        handler = self.make_handler(failures=[status_error(500), api_error(openai.APITimeoutError),
+                                              api_error(openai.APIConnectionError)])
+        result = await handler.analyze_article(ARTICLE)
+        self.assertEqual(result['category'], CATEGORIES[2])
+        self.assertEqual(len(self.completions.prompts), 4)
+
+    async def test_client_errors_are_not_retried(self, _):
+        handler = self.make_handler(failures=[status_error(400)])
+        result = await handler.analyze_article(ARTICLE)
+        self.assertEqual(result['summary'], "Summary not available.")
+        self.assertEqual(len(self.completions.prompts), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
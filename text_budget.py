@@ -0,0 +1,123 @@
+import functools
+import re
+from collections import Counter
+from typing import Dict, List
+
+try:
+    import tiktoken
+except ImportError:  # optional, exact counts for OpenAI models; estimate_tokens otherwise
+    tiktoken = None
+
+# Input token budget per LLM task. Category and keywords only need the gist,
+# so they get far less text than a summary.
+TASK_BUDGETS: Dict[str, int] = {'summary': 1500, 'analysis': 1500, 'keywords': 500, 'category': 250}
+LEAD_SENTENCES = 3
+
+SENTENCE_END = re.compile(r'(?<=[.!?。])\s+')
+WORD = re.compile(r'\w{2,}')
+# Only short paragraphs are tested, so body text that merely mentions e.g. "관련" is kept.
+BOILERPLATE_MAX_CHARS = 200
+# "김철수 기자 = 정부는 ..." opens the lead paragraph: only the byline is dropped, not the lead.
+BYLINE_PREFIX = re.compile(r'^\S{2,5}\s?(기자|특파원|통신원)\s*=\s*')
+BOILERPLATE_PATTERNS = [
+    re.compile(r'^\S{2,5}\s?(기자|특파원|통신원)$'),                        # byline on its own line
+    # Whole-line e-mail footers ("hong@news.com", "홍길동 기자 (hong@news.com)"), not a paragraph quoting one.
+    re.compile(r'^[(\[<]?\s*(\S{2,5}\s?(기자|특파원|통신원)\s*[(\[<]?\s*)?'
+               r'[\w.+-]+@[\w-]+\.[\w.]+\s*[)\]>]*$'),
+    # Copyright footers start with the notice or end with the reservation ("<저작권자 ⓒ 연합뉴스, 무단 전재 금지>").
+    re.compile(r'^[(\[<]?\s*(copyright\b|ⓒ|©|\(c\)\s)', re.IGNORECASE),
+    re.compile(r'(all rights reserved|무단\s*전재.*금지|재배포\s*금지)[\s.>)\]]*$', re.IGNORECASE),
+    re.compile(r'^(관련\s*기사|많이\s*본\s*뉴스|함께\s*볼\s*만한|추천\s*기사|\[관련|▶|☞|■\s*관련)'),
+    re.compile(r'^\[?(사진|그래픽|영상)\s*[=:]'),                             # photo/graphic credits
+]
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough cl100k estimate: ~4 ASCII chars per token, ~1 token per Hangul/CJK char.
+    ascii_chars = sum(1 for c in text if c.isascii())
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str | None):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding('cl100k_base')
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception:  # the BPE files are downloaded on first use and may be unavailable offline
+        return None
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    encoding = _encoding(model)
+    return len(encoding.encode(text)) if encoding else estimate_tokens(text)
+
+
+def truncate_tokens(text: str, budget: int, model: str | None = None) -> str:
+    encoding = _encoding(model)
+    if encoding:
+        return encoding.decode(encoding.encode(text)[:budget])
+    # estimate_tokens grows with the prefix length, so binary search the longest prefix that fits.
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def strip_boilerplate(text: str) -> str:
+    # Drops bylines, copyright lines, related-article lists and photo credits, paragraph by paragraph.
+    kept = []
+    for paragraph in text.split('\n'):
+        paragraph = BYLINE_PREFIX.sub('', paragraph.strip())
+        if not paragraph:
+            continue
+        if len(paragraph) <= BOILERPLATE_MAX_CHARS and any(p.search(paragraph) for p in BOILERPLATE_PATTERNS):
+            continue
+        kept.append(paragraph)
+    return '\n'.join(kept)
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_END.split(text.replace('\n', ' ')) if s.strip()]
+
+
+def fit_to_budget(text: str, budget: int, model: str | None = None, lead_sentences: int = LEAD_SENTENCES) -> str:
+    """Lead-plus-salient extraction: shrink `text` to at most `budget` tokens.
+
+    The first `lead_sentences` are kept (news puts the key facts up front),
+    then the remaining sentences are added in order of salience (average
+    article-wide frequency of their words) while they fit. Exact repeats are
+    dropped and the chosen sentences keep their original order.
+    """
+    if count_tokens(text, model) <= budget:
+        return text
+    sentences = list(dict.fromkeys(split_sentences(text)))
+    if not sentences:
+        return truncate_tokens(text, budget, model)
+    words = [WORD.findall(sentence.lower()) for sentence in sentences]
+    frequency = Counter(word for sentence_words in words for word in set(sentence_words))
+    salience = [sum(frequency[w] for w in ws) / len(ws) if ws else 0.0 for ws in words]
+
+    lead = list(range(min(lead_sentences, len(sentences))))
+    rest = sorted(range(len(lead), len(sentences)), key=lambda i: salience[i], reverse=True)
+    chosen, used = [], 0
+    for i in lead + rest:
+        cost = count_tokens(sentences[i], model) + 1
+        if used + cost <= budget:
+            chosen.append(i)
+            used += cost
+    if not chosen:
+        return truncate_tokens(sentences[0], budget, model)
+    return ' '.join(sentences[i] for i in sorted(chosen))
+
+
+def prepare_text(text: str, budget: int | None, model: str | None = None) -> str:
+    # What actually goes into a prompt: boilerplate removed, then fitted to the task's budget.
+    text = strip_boilerplate(text)
+    return fit_to_budget(text, budget, model) if budget else text
@@ -0,0 +1,186 @@
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+DEFAULT_TRENDS_PATH = os.path.join('.cache', 'trends.db')
+KINDS = ('keyword', 'category')
+INITIAL_TERMS = 1024
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_term(term: str) -> str:
+    return _WHITESPACE.sub(' ', str(term)).strip().lower()
+
+
+class TrendStore:
+    """Keyword and category counts per time window, persisted in SQLite.
+
+    The last `horizon_windows` windows are also kept in a NumPy ring buffer
+    (window x term), updated as articles are added. Rolling counts and burst
+    scores are reductions over that fixed-size block, so a query costs the
+    same after a week or a year of history. The database is read on startup
+    to fill the buffer and by refresh(), which picks up counts another
+    process (headless.py --sink trends) added since. Terms with no count
+    left in the horizon are compacted away instead of growing the buffer
+    forever. Queries count back from the current window, so a burst stops
+    trending once it is over, whether or not new data arrives.
+    """
+
+    def __init__(self, path: str = DEFAULT_TRENDS_PATH, window_seconds: int = 3600, horizon_windows: int = 24 * 7):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.window_seconds = window_seconds
+        self.horizon = horizon_windows
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS counts ("
+            " window INTEGER NOT NULL, kind TEXT NOT NULL, term TEXT NOT NULL, count INTEGER NOT NULL,"
+            " PRIMARY KEY (window, kind, term)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self.counts = np.zeros((self.horizon, INITIAL_TERMS), dtype=np.int32)
+        self.kind_codes = np.zeros(INITIAL_TERMS, dtype=np.int8)
+        self.terms: List[Tuple[str, str]] = []
+        self.columns: Dict[Tuple[str, str], int] = {}
+        self.latest: int | None = None  # newest window in the buffer
+        self.synced: int | None = None  # newest window read from the database
+        self.refresh()
+
+    def refresh(self):
+        # Re-reads every buffered window from the last one read onwards; older windows don't change.
+        newest = self.conn.execute("SELECT MAX(window) FROM counts").fetchone()[0]
+        if newest is None:
+            return
+        self._advance(newest)
+        first = self.latest - self.horizon + 1
+        if self.synced is not None:
+            first = max(first, self.synced)
+        self.counts[np.arange(first, self.latest + 1) % self.horizon] = 0
+        for window, kind, term, count in self.conn.execute(
+                "SELECT window, kind, term, count FROM counts WHERE window >= ? AND window <= ?", (first, self.latest)):
+            column = self._column(kind, term)
+            self.counts[window % self.horizon, column] += count
+        self.synced = newest
+
+    def window_of(self, timestamp: float) -> int:
+        return int(timestamp // self.window_seconds)
+
+    def _advance(self, window: int):
+        # Rows of windows that fell out of the horizon are reused for the new ones.
+        if self.latest is not None and window <= self.latest:
+            return
+        first = window - self.horizon + 1 if self.latest is None else max(self.latest + 1, window - self.horizon + 1)
+        self.counts[np.arange(first, window + 1) % self.horizon] = 0
+        self.latest = window
+
+    def _column(self, kind: str, term: str) -> int:
+        column = self.columns.get((kind, term))
+        if column is None:
+            if len(self.terms) == self.counts.shape[1]:
+                self._make_room()
+            column = len(self.terms)
+            self.terms.append((kind, term))
+            self.columns[(kind, term)] = column
+            self.kind_codes[column] = KINDS.index(kind)
+        return column
+
+    def _make_room(self):
+        active = np.flatnonzero(self.counts.any(axis=0))
+        if len(active) < 0.75 * len(self.terms):
+            # Compact: drop terms that no longer appear anywhere in the horizon.
+            self.counts[:, :len(active)] = self.counts[:, active]
+            self.counts[:, len(active):] = 0
+            self.kind_codes[:len(active)] = self.kind_codes[active]
+            self.terms = [self.terms[i] for i in active]
+            self.columns = {term: i for i, term in enumerate(self.terms)}
+            return
+        capacity = self.counts.shape[1] * 2
+        counts = np.zeros((self.horizon, capacity), dtype=np.int32)
+        counts[:, :self.counts.shape[1]] = self.counts
+        kind_codes = np.zeros(capacity, dtype=np.int8)
+        kind_codes[:len(self.kind_codes)] = self.kind_codes
+        self.counts, self.kind_codes = counts, kind_codes
+
+    def add(self, articles: Iterable[Dict[str, Any]], timestamp: float | None = None):
+        """Count the keywords and category of analyzed articles in the window of `timestamp` (default: now)."""
+        window = self.window_of(time.time() if timestamp is None else timestamp)
+        counter = Counter()
+        for article in articles:
+            if article.get('category'):
+                counter[('category', article['category'])] += 1
+            for keyword in dict.fromkeys(normalize_term(k) for k in article.get('keywords', [])):
+                if keyword and keyword != 'n/a':
+                    counter[('keyword', keyword)] += 1
+        if not counter:
+            return
+        self.conn.executemany(
+            "INSERT INTO counts VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (window, kind, term) DO UPDATE SET count = count + excluded.count",
+            [(window, kind, term, count) for (kind, term), count in counter.items()],
+        )
+        self.conn.commit()
+        if self.latest is not None and window <= self.latest - self.horizon:
+            return  # older than the in-memory horizon: stored only
+        self._advance(window)
+        row = window % self.horizon
+        for (kind, term), count in counter.items():
+            # One term at a time, so a compaction inside _column never drops a count added here;
+            # the column is resolved first because _column may replace self.counts.
+            column = self._column(kind, term)
+            self.counts[row, column] += count
+
+    def _block(self, windows: int, now: float | None) -> np.ndarray:
+        # (windows, terms) counts for the `windows` windows up to the one containing `now` (default: now),
+        # oldest first; fewer if they reach back past the buffer.
+        end = self.window_of(time.time() if now is None else now)
+        self._advance(end)
+        windows = max(0, min(windows, self.horizon - (self.latest - end)))
+        rows = np.arange(end - windows + 1, end + 1) % self.horizon
+        return self.counts[rows, :len(self.terms)]
+
+    def _kind_mask(self, kind: str) -> np.ndarray:
+        return self.kind_codes[:len(self.terms)] == KINDS.index(kind)
+
+    def series(self, kind: str, term: str, windows: int = 24, now: float | None = None) -> np.ndarray:
+        column = self.columns.get((kind, normalize_term(term) if kind == 'keyword' else term))
+        if column is None:
+            return np.zeros(min(windows, self.horizon), dtype=np.int32)
+        return self._block(windows, now)[:, column]
+
+    def top(self, kind: str = 'keyword', windows: int = 24, limit: int = 20,
+            now: float | None = None) -> List[Tuple[str, int]]:
+        totals = np.where(self._kind_mask(kind), self._block(windows, now).sum(axis=0), 0)
+        best = np.argsort(totals)[::-1][:limit]
+        return [(self.terms[i][1], int(totals[i])) for i in best if totals[i] > 0]
+
+    def trending(self, kind: str = 'keyword', recent: int = 3, baseline: int = 24, min_count: int = 3,
+                 limit: int = 20, now: float | None = None) -> List[Dict[str, Any]]:
+        """Terms whose count over the last `recent` windows is unusually high against the `baseline` before them.
+
+        The score is a z-score of the recent per-window rate against the
+        baseline mean and standard deviation; the +1 in the denominator keeps
+        brand-new terms from scoring infinity, so they rank by volume.
+        """
+        recent = min(recent, self.horizon - 1)
+        block = self._block(recent + baseline, now).astype(np.float64)
+        if len(block) <= recent:
+            return []
+        past, now = block[:-recent], block[-recent:]
+        mean, std = past.mean(axis=0), past.std(axis=0)
+        totals = now.sum(axis=0)
+        scores = (totals / recent - mean) / (std + 1)
+        candidates = np.flatnonzero(self._kind_mask(kind) & (totals >= min_count) & (scores > 0))
+        best = candidates[np.argsort(scores[candidates])[::-1][:limit]]
+        return [{'term': self.terms[i][1], 'count': int(totals[i]), 'baseline': float(mean[i]), 'z': float(scores[i])}
+                for i in best]
+
+    def close(self):
+        self.conn.close()
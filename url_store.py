@@ -0,0 +1,106 @@
+import hashlib
+import math
+import os
+import sqlite3
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_DB_PATH = os.path.join('.cache', 'urls.db')
+
+# Query parameters that identify a campaign/referrer rather than a document.
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'referer', 'referrer', 'from', 'cmpid', 'spm',
+}
+TRACKING_PREFIXES = ('utm_',)
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    # Raises ValueError for URLs urlsplit can't take apart (bad port, unbalanced IPv6 brackets).
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+class BloomFilter:
+    def __init__(self, capacity: int = 5_000_000, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class UrlStore:
+    """Persistent record of fetched article URLs, keyed by canonical URL.
+
+    A Bloom filter in front of the SQLite index answers "never seen" without
+    touching disk, so memory stays bounded (~6 MB per 5M URLs at 1% FPR).
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, capacity: int = 5_000_000, error_rate: float = 0.01):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, fetched_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self.bloom = BloomFilter(capacity, error_rate)
+        for (url,) in self.conn.execute("SELECT url FROM urls"):
+            self.bloom.add(url)
+
+    def last_fetched(self, url: str) -> float | None:
+        key = canonicalize_url(url)
+        if key not in self.bloom:
+            return None
+        row = self.conn.execute("SELECT fetched_at FROM urls WHERE url = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def seen(self, url: str) -> bool:
+        return self.last_fetched(url) is not None
+
+    def is_fresh(self, url: str, revisit_after_hours: float | None = None) -> bool:
+        # None means "never revisit": any previously fetched URL counts as fresh.
+        fetched_at = self.last_fetched(url)
+        if fetched_at is None:
+            return False
+        if revisit_after_hours is None:
+            return True
+        return time.time() - fetched_at < revisit_after_hours * 3600
+
+    def mark_fetched(self, url: str, fetched_at: float | None = None):
+        key = canonicalize_url(url)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO urls (url, fetched_at) VALUES (?, ?)",
+            (key, fetched_at if fetched_at is not None else time.time()),
+        )
+        self.conn.commit()
+        self.bloom.add(key)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+    def close(self):
+        self.conn.close()